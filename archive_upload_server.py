@@ -4,18 +4,33 @@ Simple Archive Upload Server
 Provides /upload-archive endpoint for the Lighthouse UI
 """
 
+import os
+import sys
 import asyncio
 import json
 import base64
 import logging
+import shutil
+import uuid
 from datetime import datetime
+from pathlib import Path
 from typing import List, Dict, Any, Optional
-from fastapi import FastAPI, UploadFile, File, Form, BackgroundTasks, HTTPException, Request
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 from simple_archive_processor import SimpleArchiveProcessor, process_uploaded_archive
 from hierarchical_chunker import process_content_hierarchically
+from vector_writes import write_metrics
+from embedding_jobs import EmbeddingRun
+from upload_spool import (UploadSession, UploadError, ARCHIVE_CONTENT_TYPES, UPLOAD_SPOOL_DIR,
+                          receive_archive, receive_multipart)
+
+sys.path.append(str(Path(__file__).parent / "humanizer_api" / "src"))
+from job_queue import JobQueue, JobWorker, Job
+from archive_statistics import StatisticsCache, compute_statistics
+from activity_scan import load_json_file
 
 # Pydantic models for request/response
 class EmbeddingsRequest(BaseModel):
@@ -39,25 +54,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger("archive_import")
 
-# Create FastAPI app with increased file limits
+# Create FastAPI app; uploads are streamed to disk, so no multipart limits apply
 app = FastAPI(
     title="Archive Upload API",
     description="Large-scale archive upload and processing service",
     version="2.0.0"
 )
 
-# Configure large upload limits
-from starlette.middleware import Middleware
-from starlette.config import Config
-from starlette.applications import Starlette
-
-# Set environment variables for large uploads
-import os
-os.environ["STARLETTE_MAX_UPLOAD_SIZE"] = str(10 * 1024 * 1024 * 1024)  # 10GB max upload
-os.environ["STARLETTE_MAX_FILES"] = "50000"  # Allow up to 50,000 files for Node Archive Browser
-
-# Configure multipart form limits (handled in middleware)
-
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -67,47 +70,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add custom middleware for large uploads
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request as StarletteRequest
-from starlette.responses import Response
-
-class LargeUploadMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: StarletteRequest, call_next):
-        # Increase limits for multipart uploads
-        if request.method == "POST" and "multipart/form-data" in request.headers.get("content-type", ""):
-            # Override multipart limits for large archives
-            import starlette.formparsers
-            
-            # Store original parser class
-            original_multipart_parser = starlette.formparsers.MultiPartParser
-            
-            class HighLimitMultiPartParser(original_multipart_parser):
-                def __init__(self, headers, stream, **kwargs):
-                    # Force override the default limits with logging
-                    logger.info(f"🔧 Creating parser with limits: files={kwargs.get('max_files', 'default')}, fields={kwargs.get('max_fields', 'default')}")
-                    kwargs['max_files'] = 10000  # Try 10,000 instead of 50,000
-                    kwargs['max_fields'] = 10000  # Try 10,000 instead of 50,000 
-                    kwargs['max_part_size'] = 100 * 1024 * 1024  # 100MB per part
-                    logger.info(f"🔧 Forcing parser limits to: files={kwargs['max_files']}, fields={kwargs['max_fields']}")
-                    super().__init__(headers, stream, **kwargs)
-            
-            # Replace the parser class globally
-            starlette.formparsers.MultiPartParser = HighLimitMultiPartParser
-            logger.info("🔧 Replaced MultiPartParser with high-limit version")
-        
-        response = await call_next(request)
-        
-        # Don't restore - keep the high limit parser active
-        # This ensures it stays active for all requests
-        
-        return response
-
-app.add_middleware(LargeUploadMiddleware)
-
 # Global storage for processing sessions
 processing_sessions: Dict[str, SimpleArchiveProcessor] = {}
 
+# Uploads still receiving files, and the processing task consuming each one
+upload_sessions: Dict[str, UploadSession] = {}
+_upload_tasks: Dict[str, asyncio.Task] = {}
+
+async def _connect_archive():
+    import asyncpg
+    return await asyncpg.connect(host="localhost", database="humanizer_archive", user="tem")
+
+async def _compute_archive_statistics():
+    conn = await _connect_archive()
+    try:
+        return await compute_statistics(conn)
+    finally:
+        await conn.close()
+
+# Dashboard counters; imports and embedding runs invalidate the snapshot when they finish
+statistics_cache = StatisticsCache(_compute_archive_statistics)
+
+# Durable background work. Folder imports and embedding runs use the worker
+# embedded here; "transform" jobs wait for a worker that registers a
+# transformation handler.
+job_queue = JobQueue()
+TRANSFORMATION_PRIORITY = {"high": 8, "normal": 5, "low": 2}
+LEGACY_TRANSFORMATION_QUEUE = Path("/Users/tem/humanizer-lighthouse/transformation_queue.json")
+
 
 @app.get("/health")
 async def health_check():
@@ -119,106 +109,180 @@ async def health_check():
     }
 
 
-@app.post("/upload-archive")
-async def upload_archive(request: Request, background_tasks: BackgroundTasks):
-    """Upload and process archive files"""
+def _open_upload(session_id: Optional[str] = None) -> UploadSession:
+    """Create (or, after a restart, reopen) an upload and process its files as they land"""
+    processor = SimpleArchiveProcessor()
+    if session_id:
+        upload = UploadSession.resume(session_id)
+        processor.session_id = processor.progress["session_id"] = session_id
+    else:
+        upload = UploadSession(processor.session_id)
+    
+    processing_sessions[upload.session_id] = processor
+    upload_sessions[upload.session_id] = upload
+    _upload_tasks[upload.session_id] = asyncio.create_task(
+        run_real_archive_processing(upload.session_id, upload)
+    )
+    return upload
+
+
+def _get_upload(session_id: str) -> UploadSession:
+    """
+    An upload still in progress, reopened from its spool directory if the
+    server restarted before it was processed
+    """
     try:
-        logger.info("=== ARCHIVE UPLOAD STARTED ===")
-        
-        # Get form data to handle dynamic file fields from frontend
+        uuid.UUID(session_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    
+    upload = upload_sessions.get(session_id)
+    if upload is None:
+        if session_id in processing_sessions:
+            raise HTTPException(status_code=409, detail="Upload already completed")
         try:
-            form = await request.form()
-        except Exception as form_error:
-            if "Too many files" in str(form_error):
-                logger.error(f"Upload has too many files: {form_error}")
-                # Suggest folder-by-folder processing for Node Archive Browser exports
-                raise HTTPException(
-                    status_code=413, 
-                    detail="Archive has too many files (Node Archive Browser format detected). Please use the 'Process Local Folder' option below instead of uploading files. This will process conversation folders one at a time to avoid file limits."
-                )
-            else:
-                logger.error(f"Form parsing error: {form_error}")
-                raise HTTPException(status_code=400, detail=f"Upload error: {form_error}")
-        
-        files_uploaded = []
-        archive_info = {
-            "files": [],
-            "total_size": 0,
-            "has_conversations_json": False
-        }
-        
-        logger.info(f"Processing form with {len(form)} fields")
-        
-        # Process uploaded files
-        file_count = 0
-        for key, value in form.items():
-            if key.startswith('file_'):
-                file_index = key.split('_')[1]
-                path_key = f"path_{file_index}"
-                file_path = form.get(path_key, "unknown")
-                
-                if hasattr(value, 'filename') and hasattr(value, 'read'):
-                    # It's a file upload
-                    content = await value.read()
-                    files_uploaded.append({
-                        "filename": value.filename,
-                        "path": file_path,
-                        "size": len(content),
-                        "content": content
-                    })
-                    archive_info["total_size"] += len(content)
-                    file_count += 1
-                    
-                    if value.filename == "conversations.json":
-                        archive_info["has_conversations_json"] = True
-                        logger.info(f"Found conversations.json file: {len(content)} bytes")
-                    
-                    if file_count <= 10:  # Only log first 10 files to avoid spam
-                        logger.info(f"Uploaded file: {value.filename} ({len(content)} bytes)")
-                    elif file_count % 100 == 0:  # Log every 100th file
-                        logger.info(f"Processed {file_count} files so far...")
-        
-        if not files_uploaded:
-            logger.error("No files were uploaded")
-            raise HTTPException(status_code=400, detail="No files uploaded")
-        
-        logger.info(f"Total files uploaded: {len(files_uploaded)}")
-        logger.info(f"Total size: {archive_info['total_size'] / (1024*1024):.2f} MB")
-        logger.info(f"Has conversations.json: {archive_info['has_conversations_json']}")
-        
-        # Create processor and start real processing
-        processor = SimpleArchiveProcessor()
-        processing_sessions[processor.session_id] = processor
-        
-        # Start background processing with real data
-        background_tasks.add_task(
-            run_real_archive_processing,
-            processor.session_id,
-            files_uploaded,
-            archive_info
+            upload = _open_upload(session_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        except UploadError:
+            raise HTTPException(status_code=409, detail="Upload already completed")
+    return upload
+
+
+def _abort_upload(upload: UploadSession, error: str):
+    task = _upload_tasks.pop(upload.session_id, None)
+    if task:
+        task.cancel()
+    upload_sessions.pop(upload.session_id, None)
+    upload.cleanup()
+    
+    processor = processing_sessions.get(upload.session_id)
+    if processor:
+        processor.progress["status"] = "failed"
+        processor.progress["error"] = error
+
+
+@app.post("/upload-archive")
+async def upload_archive(request: Request, format: Optional[str] = None):
+    """
+    Upload and process archive files.
+    
+    Accepts the UI's multipart form (file_N / path_N fields) or a tar or zip
+    body (by Content-Type, or ?format=tar|zip). Files are spooled to disk as
+    they arrive and processing starts with the first of them.
+    """
+    content_type = request.headers.get("content-type", "")
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    archive_format = format or ARCHIVE_CONTENT_TYPES.get(media_type)
+    if media_type != "multipart/form-data" and not archive_format:
+        raise HTTPException(
+            status_code=415,
+            detail="Send multipart/form-data, or a tar or zip archive body"
         )
-        
-        return {
-            "status": "started",
-            "archive_path": f"/tmp/archive_{processor.session_id}",
-            "session_id": processor.session_id,
-            "files_uploaded": len(files_uploaded),
-            "total_size_mb": round(archive_info["total_size"] / (1024 * 1024), 2),
-            "progress_url": f"/progress/{processor.session_id}",
-            "message": "Archive upload started - processing in background"
-        }
-        
+    
+    logger.info("=== ARCHIVE UPLOAD STARTED ===")
+    upload = _open_upload()
+    
+    try:
+        if archive_format:
+            await receive_archive(request.stream(), archive_format, upload)
+        else:
+            await receive_multipart(request.stream(), content_type, upload)
+    except UploadError as e:
+        logger.error(f"Upload rejected: {e}")
+        _abort_upload(upload, str(e))
+        raise HTTPException(status_code=400, detail=f"Upload error: {e}")
     except Exception as e:
         logger.error(f"Upload failed: {str(e)}")
+        _abort_upload(upload, str(e))
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if not upload.files_received:
+        logger.error("No files were uploaded")
+        _abort_upload(upload, "No files uploaded")
+        raise HTTPException(status_code=400, detail="No files uploaded")
+    
+    upload.finish()
+    logger.info(f"Total files uploaded: {upload.files_received}")
+    logger.info(f"Total size: {upload.bytes_received / (1024*1024):.2f} MB")
+    
+    return {
+        "status": "started",
+        "archive_path": str(upload.files_dir),
+        "session_id": upload.session_id,
+        "files_uploaded": upload.files_received,
+        "total_size_mb": round(upload.bytes_received / (1024 * 1024), 2),
+        "progress_url": f"/progress/{upload.session_id}",
+        "message": "Archive upload started - processing in background"
+    }
+
+
+@app.post("/uploads")
+async def create_upload():
+    """Start a resumable upload; send files with PUT /uploads/{session_id}/files/{path}"""
+    upload = _open_upload()
+    return {
+        "status": "created",
+        "session_id": upload.session_id,
+        "progress_url": f"/progress/{upload.session_id}"
+    }
 
 
-async def run_real_archive_processing(
+@app.get("/uploads/{session_id}")
+async def get_upload(session_id: str):
+    """Bytes received per file, for resuming an interrupted upload"""
+    upload = _get_upload(session_id)
+    return {
+        "session_id": session_id,
+        "finished": upload.finished,
+        "files": upload.chunked_status()
+    }
+
+
+@app.put("/uploads/{session_id}/files/{file_path:path}")
+async def upload_file_chunk(
     session_id: str,
-    files_uploaded: List[Dict],
-    archive_info: Dict
+    file_path: str,
+    request: Request,
+    offset: int = 0,
+    final: bool = False
 ):
-    """Run real archive processing with logging"""
+    """
+    Append a chunk to a file at `offset` (the bytes already received).
+    
+    A mismatched offset is rejected with 409; GET /uploads/{session_id}
+    tells the client where to resume. `final` completes the file and hands
+    it to processing.
+    """
+    upload = _get_upload(session_id)
+    if upload.finished:
+        raise HTTPException(status_code=409, detail="Upload already completed")
+    
+    try:
+        received = await upload.write_chunk(file_path, offset, request.stream(), final)
+    except UploadError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    return {"path": file_path, "received": received, "complete": final}
+
+
+@app.post("/uploads/{session_id}/complete")
+async def complete_upload(session_id: str):
+    """Mark a resumable upload finished; processing completes once its files are done"""
+    upload = _get_upload(session_id)
+    upload.finish()
+    return {
+        "status": "started",
+        "archive_path": str(upload.files_dir),
+        "session_id": session_id,
+        "files_uploaded": upload.files_received,
+        "total_size_mb": round(upload.bytes_received / (1024 * 1024), 2),
+        "progress_url": f"/progress/{session_id}"
+    }
+
+
+async def run_real_archive_processing(session_id: str, upload: UploadSession):
+    """Run real archive processing with logging, consuming files as the upload spools them"""
     processor = processing_sessions.get(session_id)
     if not processor:
         logger.error(f"Processor not found for session {session_id}")
@@ -235,14 +299,14 @@ async def run_real_archive_processing(
         conversations_found = 0
         conversations_data = None
         
-        # Look for conversations.json and parse it
-        for file_info in files_uploaded:
-            if file_info["filename"] == "conversations.json":
+        # Look for conversations.json and parse it as soon as it lands; the
+        # rest of the upload keeps streaming to disk meanwhile
+        files = upload.completed_files()
+        async for path in files:
+            if path.name == "conversations.json":
                 try:
-                    content = file_info["content"]
-                    if isinstance(content, bytes):
-                        content = content.decode('utf-8')
-                    conversations_data = json.loads(content)
+                    logger.info(f"Found conversations.json file: {path.stat().st_size} bytes")
+                    conversations_data = await asyncio.to_thread(load_json_file, path)
                     
                     if isinstance(conversations_data, list):
                         conversations_found = len(conversations_data)
@@ -413,6 +477,11 @@ async def run_real_archive_processing(
                     import gc
                     gc.collect()
         
+        # Wait for the rest of the upload
+        async for _ in files:
+            processor.progress["stats"]["files_received"] = upload.files_received
+        processor.progress["stats"]["files_received"] = upload.files_received
+        
         processor.progress["steps"]["import"]["status"] = "completed"
         processor.progress["steps"]["import"]["progress"] = 1.0
         logger.info(f"Import complete: {processed} conversations, {total_messages:,} total messages, {total_media_files:,} media files, {failed} failed")
@@ -433,13 +502,17 @@ async def run_real_archive_processing(
             "total_messages": total_messages,
             "total_media_files": total_media_files,
             "large_messages": large_messages,
-            "files_uploaded": len(files_uploaded),
+            "files_uploaded": upload.files_received,
+            "bytes_uploaded": upload.bytes_received,
             "processing_time": processor.calculate_processing_time(),
             "archive_scale": "large" if processed > 1000 else "medium" if processed > 100 else "small"
         }
         
         processor.progress["final_results"] = final_results
         
+        # A restarted server must not reopen this spool and import it again
+        upload.mark_processed()
+        
         logger.info(f"=== PROCESSING COMPLETE ===")
         logger.info(f"Session: {session_id}")
         logger.info(f"Results: {final_results}")
@@ -448,6 +521,10 @@ async def run_real_archive_processing(
         logger.error(f"Processing failed for session {session_id}: {str(e)}")
         processor.progress["status"] = "failed"
         processor.progress["error"] = str(e)
+    finally:
+        upload_sessions.pop(session_id, None)
+        _upload_tasks.pop(session_id, None)
+        statistics_cache.invalidate()
 
 
 @app.get("/progress/sessions")
@@ -489,6 +566,10 @@ async def cleanup_session(session_id: str):
     """Clean up a processing session"""
     if session_id in processing_sessions:
         del processing_sessions[session_id]
+        upload = upload_sessions.get(session_id)
+        if upload:
+            _abort_upload(upload, "Session cleaned up")
+        shutil.rmtree(UPLOAD_SPOOL_DIR / session_id, ignore_errors=True)
         return {
             "status": "success",
             "message": f"Session {session_id} cleaned up"
@@ -524,39 +605,22 @@ async def start_smart_processing(
 
 @app.get("/embeddings/statistics")
 async def get_embedding_statistics():
-    """Get embedding statistics from PostgreSQL"""
+    """Get embedding statistics from the cached archive snapshot"""
     try:
-        import asyncpg
-        
-        conn = await asyncpg.connect(
-            host="localhost", 
-            database="humanizer_archive",
-            user="tem"
-        )
-        
-        # Get statistics from PostgreSQL
-        stats = await conn.fetchrow("""
-        SELECT 
-            COUNT(*) as total_content,
-            COUNT(*) FILTER (WHERE content_type = 'conversation') as conversations,
-            COUNT(*) FILTER (WHERE content_type = 'message') as messages,
-            COUNT(*) FILTER (WHERE semantic_vector IS NOT NULL) as embeddings,
-            AVG(content_quality_score) as avg_quality
-        FROM archived_content
-        """)
-        
-        await conn.close()
+        stats = await statistics_cache.get()
         
         return {
             "status": "success",
-            "total_chunks": stats["total_content"],
-            "total_embeddings": stats["embeddings"],
+            "total_chunks": stats["total_chunks"] or stats["total_content"],
+            "total_embeddings": stats["total_embeddings"],
+            "embedded_chunks": stats["embedded_chunks"],
             "vector_dimension": 768,
             "embedding_model": "nomic-embed-text (via Ollama)",
             "embedding_provider": "ollama", 
-            "conversations_count": stats["conversations"],
-            "messages_count": stats["messages"],
-            "average_quality": float(stats["avg_quality"]) if stats["avg_quality"] else 0,
+            "conversations_count": stats["by_content_type"].get("conversation", 0),
+            "messages_count": stats["by_content_type"].get("message", 0),
+            "average_quality": stats["average_quality"],
+            "snapshot_age_seconds": round(statistics_cache.age or 0.0, 1),
             "model_info": {
                 "name": "nomic-embed-text",
                 "dimensions": 768,
@@ -578,6 +642,15 @@ async def get_embedding_statistics():
         }
 
 
+@app.get("/embeddings/write-metrics")
+async def get_vector_write_metrics():
+    """Throughput of vector writes since the server started"""
+    return {
+        "status": "success",
+        "metrics": write_metrics.snapshot()
+    }
+
+
 @app.post("/search")
 async def search_archive(
     query: str = "",
@@ -722,6 +795,56 @@ async def get_import_logs(lines: int = 50):
         }
 
 
+# Conversation stats table, its maintenance triggers and the backfill of
+# conversations without a row are set up once per process; the triggers keep
+# rows current for every writer after that
+_conversation_stats_ready = False
+
+async def _ensure_conversation_stats(conn):
+    global _conversation_stats_ready
+    if not _conversation_stats_ready:
+        from conversation_stats import ensure_conversation_stats
+        await ensure_conversation_stats(conn)
+        _conversation_stats_ready = True
+
+def _encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Opaque keyset cursor for the row a page ended on."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([sort_value, row_id]).encode()).decode()
+
+def _decode_cursor(cursor: str, value_type: str = "text"):
+    """(sort value, id) from a cursor; value_type 'timestamp' or 'int' restores the column type."""
+    sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if sort_value is not None:
+        if value_type == "timestamp":
+            sort_value = datetime.fromisoformat(sort_value)
+        elif value_type == "int":
+            sort_value = int(sort_value)
+    return sort_value, int(row_id)
+
+def _keyset_condition(sort_expr: str, id_expr: str, descending: bool,
+                      sort_value: Any, value_param: Optional[int], id_param: int,
+                      nullable: bool = True) -> str:
+    """
+    WHERE clause selecting rows after (sort_value, id) in
+    ORDER BY sort_expr [DESC] NULLS LAST, id_expr [DESC].
+
+    A NULL sort_value is matched with IS NULL and takes no value parameter:
+    pass value_param=None and leave it out of the query arguments, since
+    Postgres cannot infer the type of a parameter the SQL never references.
+    For NOT NULL sort columns pass nullable=False to leave out the trailing
+    NULL group, so the condition stays a plain range over the column's index.
+    """
+    op = "<" if descending else ">"
+    if sort_value is None:
+        # Cursor is inside the trailing NULL group
+        return f"({sort_expr} IS NULL AND {id_expr} {op} ${id_param})"
+    condition = f"{sort_expr} {op} ${value_param} OR ({sort_expr} = ${value_param} AND {id_expr} {op} ${id_param})"
+    if nullable:
+        condition += f" OR {sort_expr} IS NULL"
+    return f"({condition})"
+
 @app.get("/conversations")
 async def get_conversations(
     page: int = 1,
@@ -735,7 +858,8 @@ async def get_conversations(
     max_messages: int = None,  # Maximum message count filter
     date_from: str = None,  # Date range filter (ISO format)
     date_to: str = None,  # Date range filter (ISO format)
-    author: str = None  # Author filter
+    author: str = None,  # Author filter
+    cursor: str = None  # Keyset cursor from a previous page's next_cursor (replaces page)
 ):
     """Get paginated list of conversations with stats"""
     try:
@@ -746,19 +870,23 @@ async def get_conversations(
             database="humanizer_archive", 
             user="tem"
         )
+        await _ensure_conversation_stats(conn)
         
-        # Build ORDER BY clause
-        order_direction = "DESC" if order.lower() == "desc" else "ASC"
+        # Sort expression, tie-breaking id and cursor value type for each sort option.
+        # Every conversation has a stats row, so the count sorts use the bare NOT NULL
+        # columns (and the stats key as tie-breaker) that the stats indexes cover.
+        descending = order.lower() == "desc"
+        order_direction = "DESC" if descending else "ASC"
         if sort_by == "message_count":
-            order_clause = f"message_count {order_direction}"
+            sort_expr, id_expr, sort_type, nullable = "s.message_count", "s.conversation_id", "int", False
         elif sort_by == "title":
-            order_clause = f"title {order_direction}"
+            sort_expr, id_expr, sort_type, nullable = "c.title", "c.id", "text", True
         elif sort_by == "word_count":
-            order_clause = f"total_word_count {order_direction}"
-        elif sort_by == "create_time":
-            order_clause = f"c.timestamp {order_direction}"  # Using timestamp as create time
-        else:  # default to timestamp
-            order_clause = f"c.timestamp {order_direction}"
+            sort_expr, id_expr, sort_type, nullable = "s.total_word_count", "s.conversation_id", "int", False
+        else:  # "timestamp" and "create_time" (using timestamp as create time)
+            sort_expr, id_expr, sort_type, nullable = "c.timestamp", "c.id", "timestamp", True
+        nulls = " NULLS LAST" if nullable else ""
+        order_clause = f"{sort_expr} {order_direction}{nulls}, {id_expr} {order_direction}"
         
         # Build WHERE clause with all filters
         where_conditions = ["c.content_type = 'conversation'"]
@@ -788,40 +916,53 @@ async def get_conversations(
             where_conditions.append(f"c.timestamp <= ${param_count}")
             params.append(date_to)
         
-        where_clause = " AND ".join(where_conditions)
-        
-        # Build HAVING clause for aggregate filters (message count, word count)
-        having_conditions = []
-        
+        # Message and word count filters read the materialized stats
         if min_messages is not None:
             param_count += 1
-            having_conditions.append(f"COUNT(m.id) >= ${param_count}")
+            where_conditions.append(f"s.message_count >= ${param_count}")
             params.append(min_messages)
         
         if max_messages is not None:
             param_count += 1
-            having_conditions.append(f"COUNT(m.id) <= ${param_count}")
+            where_conditions.append(f"s.message_count <= ${param_count}")
             params.append(max_messages)
         
         if min_words is not None:
             param_count += 1
-            having_conditions.append(f"COALESCE(SUM(m.word_count), c.word_count, 0) >= ${param_count}")
+            where_conditions.append(f"s.total_word_count >= ${param_count}")
             params.append(min_words)
         
         if max_words is not None:
             param_count += 1
-            having_conditions.append(f"COALESCE(SUM(m.word_count), c.word_count, 0) <= ${param_count}")
+            where_conditions.append(f"s.total_word_count <= ${param_count}")
             params.append(max_words)
         
-        having_clause = " AND ".join(having_conditions) if having_conditions else ""
+        where_clause = " AND ".join(where_conditions)
+        from_clause = """
+            FROM archived_content c
+            JOIN conversation_stats s ON s.conversation_id = c.id
+        """
         
-        # Get conversations with message counts
-        offset = (page - 1) * limit
-        param_count += 1
-        limit_param = param_count
-        param_count += 1
-        offset_param = param_count
-        params.extend([limit, offset])
+        # Total count with all filters (no cursor)
+        total_count = await conn.fetchval(f"SELECT COUNT(*) {from_clause} WHERE {where_clause}", *params)
+        
+        # Keyset pagination when a cursor is given, OFFSET for numbered pages
+        page_conditions = list(where_conditions)
+        page_params = list(params)
+        if cursor:
+            cursor_value, cursor_id = _decode_cursor(cursor, sort_type)
+            value_param = None
+            if cursor_value is not None:
+                page_params.append(cursor_value)
+                value_param = len(page_params)
+            page_params.append(cursor_id)
+            page_conditions.append(_keyset_condition(
+                sort_expr, id_expr, descending, cursor_value, value_param, len(page_params), nullable
+            ))
+            offset = 0
+        else:
+            offset = (page - 1) * limit
+        page_params.extend([limit, offset])
         
         query = f"""
             SELECT 
@@ -831,33 +972,18 @@ async def get_conversations(
                 c.timestamp,
                 c.author,
                 c.word_count as conversation_word_count,
-                COUNT(m.id) as message_count,
-                COALESCE(SUM(m.word_count), c.word_count, 0) as total_word_count,
+                s.message_count,
+                s.total_word_count,
+                s.has_media,
+                {sort_expr} as sort_key,
                 c.source_metadata
-            FROM archived_content c
-            LEFT JOIN archived_content m ON c.id = m.parent_id
-            WHERE {where_clause}
-            GROUP BY c.id, c.title, c.source_id, c.timestamp, c.author, c.word_count, c.source_metadata
-            {f'HAVING {having_clause}' if having_clause else ''}
+            {from_clause}
+            WHERE {" AND ".join(page_conditions)}
             ORDER BY {order_clause}
-            LIMIT ${limit_param} OFFSET ${offset_param}
+            LIMIT ${len(page_params) - 1} OFFSET ${len(page_params)}
         """
         
-        rows = await conn.fetch(query, *params)
-        
-        # Get total count with all filters
-        count_params = params[:-2]  # Remove limit and offset
-        count_query = f"""
-            SELECT COUNT(*) FROM (
-                SELECT c.id
-                FROM archived_content c
-                LEFT JOIN archived_content m ON c.id = m.parent_id
-                WHERE {where_clause}
-                GROUP BY c.id, c.title, c.source_id, c.timestamp, c.author, c.word_count, c.source_metadata
-                {f'HAVING {having_clause}' if having_clause else ''}
-            ) AS filtered_conversations
-        """
-        total_count = await conn.fetchval(count_query, *count_params)
+        rows = await conn.fetch(query, *page_params)
         
         await conn.close()
         
@@ -878,12 +1004,16 @@ async def get_conversations(
                 "author": row["author"],
                 "message_count": row["message_count"],
                 "total_word_count": row["total_word_count"] or 0,
-                "has_media": False,  # TODO: Implement media detection
+                "has_media": row["has_media"],
                 "folder_name": metadata.get("folder_name", ""),
                 "create_time": metadata.get("create_time"),
                 "update_time": metadata.get("update_time")
             })
         
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = _encode_cursor(rows[-1]["sort_key"], rows[-1]["id"])
+        
         return {
             "status": "success",
             "conversations": conversations,
@@ -891,7 +1021,8 @@ async def get_conversations(
                 "page": page,
                 "limit": limit,
                 "total": total_count,
-                "pages": (total_count + limit - 1) // limit
+                "pages": (total_count + limit - 1) // limit,
+                "next_cursor": next_cursor
             }
         }
         
@@ -905,7 +1036,14 @@ async def get_conversations(
 
 
 @app.get("/conversations/{conversation_id}/messages")
-async def get_conversation_messages(conversation_id: int, page: int = 1, limit: int = 100):
+async def get_conversation_messages(
+    conversation_id: int,
+    page: int = 1,
+    limit: int = 100,
+    cursor: str = None,  # Keyset cursor from a previous page's next_cursor (replaces page)
+    include_body: bool = True,  # False returns metadata only; fetch bodies from /messages/{id}/body
+    max_body_chars: int = None  # Truncate bodies to this many characters
+):
     """Get messages for a specific conversation"""
     try:
         import asyncpg
@@ -915,56 +1053,88 @@ async def get_conversation_messages(conversation_id: int, page: int = 1, limit:
             database="humanizer_archive",
             user="tem"
         )
+        await _ensure_conversation_stats(conn)
         
-        # Get conversation info
+        # Get conversation info and materialized message count
         conversation = await conn.fetchrow("""
-            SELECT id, title, source_id, timestamp, source_metadata
-            FROM archived_content 
-            WHERE id = $1 AND content_type = 'conversation'
+            SELECT c.id, c.title, c.source_id, c.timestamp, c.source_metadata, s.message_count
+            FROM archived_content c
+            LEFT JOIN conversation_stats s ON s.conversation_id = c.id
+            WHERE c.id = $1 AND c.content_type = 'conversation'
         """, conversation_id)
         
         if not conversation:
             await conn.close()
             return {"status": "error", "message": "Conversation not found"}
         
-        # Get messages with pagination
-        offset = (page - 1) * limit
-        messages = await conn.fetch("""
-            SELECT id, source_id, body_text, author, timestamp, word_count, source_metadata
+        # Project only the fields the viewer shows; role and create_time are
+        # extracted from source_metadata by Postgres instead of shipping the document
+        params = [conversation_id]
+        if not include_body:
+            body_column = "NULL::text AS body_text, FALSE AS body_truncated"
+        elif max_body_chars:
+            params.append(max_body_chars)
+            body_column = (f"substr(body_text, 1, ${len(params)}) AS body_text, "
+                           f"char_length(body_text) > ${len(params)} AS body_truncated")
+        else:
+            body_column = "body_text, FALSE AS body_truncated"
+        
+        # Keyset pagination on (timestamp, id) when a cursor is given, OFFSET for numbered pages
+        conditions = ["parent_id = $1", "content_type = 'message'"]
+        if cursor:
+            cursor_value, cursor_id = _decode_cursor(cursor, "timestamp")
+            value_param = None
+            if cursor_value is not None:
+                params.append(cursor_value)
+                value_param = len(params)
+            params.append(cursor_id)
+            conditions.append(_keyset_condition(
+                "timestamp", "id", False, cursor_value, value_param, len(params)
+            ))
+            offset = 0
+        else:
+            offset = (page - 1) * limit
+        params.extend([limit, offset])
+        
+        messages = await conn.fetch(f"""
+            SELECT id, source_id, {body_column}, author, timestamp, word_count,
+                   COALESCE(source_metadata->>'role', author) AS role,
+                   CASE WHEN jsonb_typeof(source_metadata->'create_time') = 'number'
+                        THEN (source_metadata->>'create_time')::float8 END AS create_time
             FROM archived_content
-            WHERE parent_id = $1 AND content_type = 'message'
-            ORDER BY timestamp ASC
-            LIMIT $2 OFFSET $3
-        """, conversation_id, limit, offset)
-        
-        # Get total message count
-        total_messages = await conn.fetchval("""
-            SELECT COUNT(*) FROM archived_content 
-            WHERE parent_id = $1 AND content_type = 'message'
-        """, conversation_id)
+            WHERE {" AND ".join(conditions)}
+            ORDER BY timestamp ASC NULLS LAST, id ASC
+            LIMIT ${len(params) - 1} OFFSET ${len(params)}
+        """, *params)
+        
+        # Total message count, counted only for conversations without a stats row
+        total_messages = conversation["message_count"]
+        if total_messages is None:
+            total_messages = await conn.fetchval("""
+                SELECT COUNT(*) FROM archived_content 
+                WHERE parent_id = $1 AND content_type = 'message'
+            """, conversation_id)
         
         await conn.close()
         
         message_list = []
         for msg in messages:
-            # Handle source_metadata which might be JSON string or dict
-            metadata = msg["source_metadata"] or {}
-            if isinstance(metadata, str):
-                try:
-                    metadata = json.loads(metadata)
-                except (json.JSONDecodeError, TypeError):
-                    metadata = {}
             message_list.append({
                 "id": msg["id"],
                 "source_id": msg["source_id"], 
                 "body_text": msg["body_text"],
+                "body_truncated": msg["body_truncated"],
                 "author": msg["author"],
                 "timestamp": msg["timestamp"].isoformat() if msg["timestamp"] else None,
                 "word_count": msg["word_count"],
-                "role": metadata.get("role", msg["author"]),
-                "create_time": metadata.get("create_time")
+                "role": msg["role"],
+                "create_time": msg["create_time"]
             })
         
+        next_cursor = None
+        if len(messages) == limit:
+            next_cursor = _encode_cursor(messages[-1]["timestamp"], messages[-1]["id"])
+        
         # Handle conversation metadata
         conv_metadata = conversation["source_metadata"] or {}
         if isinstance(conv_metadata, str):
@@ -987,7 +1157,8 @@ async def get_conversation_messages(conversation_id: int, page: int = 1, limit:
                 "page": page,
                 "limit": limit,
                 "total": total_messages,
-                "pages": (total_messages + limit - 1) // limit
+                "pages": (total_messages + limit - 1) // limit,
+                "next_cursor": next_cursor
             }
         }
         
@@ -999,129 +1170,108 @@ async def get_conversation_messages(conversation_id: int, page: int = 1, limit:
         }
 
 
-@app.post("/generate-embeddings")
-async def generate_embeddings(request: EmbeddingsRequest):
-    """Generate embeddings for conversations using nomic-text-embed"""
+@app.get("/messages/{message_id}/body")
+async def get_message_body(message_id: int):
+    """Full body of one message, for pages fetched without bodies or truncated"""
     try:
         import asyncpg
-        import asyncio
-        from datetime import datetime
-        import json
         
         conn = await asyncpg.connect(
             host="localhost",
             database="humanizer_archive",
             user="tem"
         )
-        
-        # Get conversations to process
-        if request.conversation_ids:
-            query = """
-                SELECT id, title, body_text, word_count 
-                FROM archived_content 
-                WHERE id = ANY($1) AND content_type = 'conversation'
-                ORDER BY id
-            """
-            conversations = await conn.fetch(query, request.conversation_ids)
-        else:
-            # Get all conversations without embeddings
-            query = """
-                SELECT id, title, body_text, word_count 
-                FROM archived_content 
-                WHERE content_type = 'conversation' 
-                AND semantic_vector IS NULL
-                ORDER BY word_count DESC
-            """
-            if request.max_conversations:
-                query += f" LIMIT {request.max_conversations}"
-            conversations = await conn.fetch(query)
-        
-        if not conversations:
-            await conn.close()
-            return {
-                "status": "success",
-                "message": "No conversations need embeddings",
-                "processed": 0,
-                "total": 0
-            }
-        
-        # Process in batches
-        total_conversations = len(conversations)
-        processed = 0
-        failed = 0
-        
-        logger.info(f"Starting embedding generation for {total_conversations} conversations")
-        
-        for i in range(0, total_conversations, request.batch_size):
-            batch = conversations[i:i + request.batch_size]
-            
-            for conv in batch:
-                try:
-                    # Use the existing embedding generation logic
-                    content = conv['body_text'] or conv['title'] or ""
-                    if not content.strip():
-                        continue
-                    
-                    # Generate embedding using ollama's nomic-embed-text
-                    import requests
-                    embed_response = requests.post(
-                        "http://localhost:11434/api/embeddings",
-                        json={
-                            "model": "nomic-embed-text",
-                            "prompt": content[:8000]  # Limit content length
-                        },
-                        timeout=30
-                    )
-                    
-                    if embed_response.status_code == 200:
-                        embedding_data = embed_response.json()
-                        embedding = embedding_data.get("embedding", [])
-                        
-                        if embedding:
-                            # Store embedding in database (convert list to pgvector format)
-                            await conn.execute("""
-                                UPDATE archived_content 
-                                SET semantic_vector = $1::vector 
-                                WHERE id = $2
-                            """, str(embedding), conv['id'])
-                            
-                            processed += 1
-                            
-                            if processed % 10 == 0:
-                                logger.info(f"Generated embeddings for {processed}/{total_conversations} conversations")
-                    else:
-                        failed += 1
-                        logger.warning(f"Failed to generate embedding for conversation {conv['id']}: {embed_response.status_code}")
-                        
-                except Exception as e:
-                    failed += 1
-                    logger.error(f"Error processing conversation {conv['id']}: {str(e)}")
-                
-                # Small delay to avoid overwhelming the embedding service
-                await asyncio.sleep(0.1)
-        
+        row = await conn.fetchrow("""
+            SELECT id, body_text FROM archived_content
+            WHERE id = $1 AND content_type = 'message'
+        """, message_id)
         await conn.close()
         
-        logger.info(f"Embedding generation complete: {processed} successful, {failed} failed")
-        
-        return {
-            "status": "success",
-            "message": f"Generated embeddings for {processed} conversations",
-            "processed": processed,
-            "failed": failed,
-            "total": total_conversations
-        }
+        if not row:
+            return {"status": "error", "message": "Message not found"}
+        return {"status": "success", "id": row["id"], "body_text": row["body_text"]}
         
     except Exception as e:
-        logger.error(f"Embedding generation failed: {str(e)}")
+        logger.error(f"Get message body failed: {str(e)}")
         return {
             "status": "error",
-            "message": str(e),
-            "processed": 0,
-            "total": 0
+            "message": str(e)
         }
 
 
+@app.post("/generate-embeddings")
+async def generate_embeddings(request: EmbeddingsRequest):
+    """
+    Queue embedding generation for conversations using nomic-embed-text.
+    
+    Runs as a background job on the "embed" queue; poll progress_url or
+    subscribe to events_url for progress. An interrupted run resumes from
+    its last checkpoint.
+    """
+    job_id = job_queue.enqueue("embed", "generate_embeddings", request.dict(), priority=6, max_attempts=5)
+    logger.info(f"Queued embedding generation job {job_id}")
+    
+    return {
+        "status": "started",
+        "job_id": job_id,
+        "progress_url": f"/embeddings/jobs/{job_id}",
+        "events_url": f"/embeddings/jobs/{job_id}/events",
+        "message": "Embedding generation queued - running in background"
+    }
+
+
+def _embedding_job_status(job: Job) -> Dict[str, Any]:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.last_error
+    }
+
+
+@app.get("/embeddings/jobs/{job_id}")
+async def get_embedding_job(job_id: str):
+    """Status and progress of an embedding job"""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None or job.job_type != "generate_embeddings":
+        raise HTTPException(status_code=404, detail="Embedding job not found")
+    return _embedding_job_status(job)
+
+
+@app.get("/embeddings/jobs/{job_id}/events")
+async def stream_embedding_job(job_id: str, request: Request):
+    """Server-sent events with the job's progress each time it changes, until the job ends"""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None or job.job_type != "generate_embeddings":
+        raise HTTPException(status_code=404, detail="Embedding job not found")
+    
+    async def events():
+        last_update = None
+        while True:
+            job = await asyncio.to_thread(job_queue.get, job_id)
+            if job.updated_at != last_update:
+                last_update = job.updated_at
+                yield f"data: {json.dumps(_embedding_job_status(job), default=str)}\n\n"
+            if job.status in ("completed", "failed", "cancelled") or await request.is_disconnected():
+                return
+            await asyncio.sleep(1.0)
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+async def _run_embedding_job(job: Job):
+    async def checkpoint(progress: Dict[str, Any]) -> bool:
+        return await asyncio.to_thread(job_queue.update_progress, job.id, job.lease_owner, progress)
+    
+    try:
+        return await EmbeddingRun(job.payload, _connect_archive, checkpoint, job.progress).run()
+    finally:
+        statistics_cache.invalidate()
+
+
 @app.post("/saved-searches")
 async def save_search(
     name: str,
@@ -1205,6 +1355,42 @@ async def get_saved_searches():
         }
 
 
+def _migrate_legacy_transformation_queue():
+    """Move pending items of the old JSON queue file into the job queue (once)"""
+    if not LEGACY_TRANSFORMATION_QUEUE.exists():
+        return
+    with open(LEGACY_TRANSFORMATION_QUEUE, 'r') as f:
+        legacy = json.load(f)
+    for item in legacy.get("items", []):
+        if item["status"] == "pending":
+            job_queue.enqueue(
+                "transform", "transform",
+                {"content_id": item["content_id"], "transformation_type": item["transformation_type"]},
+                priority=TRANSFORMATION_PRIORITY.get(item["priority"], 5),
+                job_id=f"transform_legacy_{item['id']}"
+            )
+    LEGACY_TRANSFORMATION_QUEUE.rename(LEGACY_TRANSFORMATION_QUEUE.with_suffix(".json.migrated"))
+    logger.info("Migrated legacy transformation queue into the job queue")
+
+def _transformation_item(job: Job) -> Dict[str, Any]:
+    """Job in the item shape the transformation queue has always returned"""
+    def isoformat(timestamp):
+        return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+    priority = next((name for name, value in TRANSFORMATION_PRIORITY.items() if value == job.priority), "normal")
+    return {
+        "id": job.id,
+        "content_id": job.payload["content_id"],
+        "transformation_type": job.payload["transformation_type"],
+        "priority": priority,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": isoformat(job.created_at),
+        "started_at": isoformat(job.started_at),
+        "completed_at": isoformat(job.completed_at),
+        "result": job.result,
+        "error": job.last_error
+    }
+
 @app.post("/transformation-queue")
 async def add_to_transformation_queue(
     content_ids: list,
@@ -1213,40 +1399,16 @@ async def add_to_transformation_queue(
 ):
     """Add content to transformation processing queue"""
     try:
-        import json
-        from pathlib import Path
+        _migrate_legacy_transformation_queue()
         
-        queue_file = Path("/Users/tem/humanizer-lighthouse/transformation_queue.json")
-        
-        # Load existing queue
-        if queue_file.exists():
-            with open(queue_file, 'r') as f:
-                queue = json.load(f)
-        else:
-            queue = {"items": [], "next_id": 1}
-        
-        # Add items to queue
         added_items = []
         for content_id in content_ids:
-            item = {
-                "id": queue["next_id"],
-                "content_id": content_id,
-                "transformation_type": transformation_type,
-                "priority": priority,
-                "status": "pending",
-                "created_at": datetime.now().isoformat(),
-                "started_at": None,
-                "completed_at": None,
-                "result": None,
-                "error": None
-            }
-            queue["items"].append(item)
-            added_items.append(item)
-            queue["next_id"] += 1
-        
-        # Save queue
-        with open(queue_file, 'w') as f:
-            json.dump(queue, f, indent=2)
+            job_id = job_queue.enqueue(
+                "transform", "transform",
+                {"content_id": content_id, "transformation_type": transformation_type},
+                priority=TRANSFORMATION_PRIORITY.get(priority, 5)
+            )
+            added_items.append(_transformation_item(job_queue.get(job_id)))
         
         return {
             "status": "success",
@@ -1263,30 +1425,19 @@ async def add_to_transformation_queue(
 
 
 @app.get("/transformation-queue")
-async def get_transformation_queue():
+async def get_transformation_queue(status: str = None, limit: int = 500):
     """Get current transformation queue"""
     try:
-        import json
-        from pathlib import Path
+        _migrate_legacy_transformation_queue()
         
-        queue_file = Path("/Users/tem/humanizer-lighthouse/transformation_queue.json")
-        
-        if queue_file.exists():
-            with open(queue_file, 'r') as f:
-                queue = json.load(f)
-            return {
-                "status": "success",
-                "queue": queue["items"],
-                "pending_count": len([item for item in queue["items"] if item["status"] == "pending"]),
-                "total_count": len(queue["items"])
-            }
-        else:
-            return {
-                "status": "success",
-                "queue": [],
-                "pending_count": 0,
-                "total_count": 0
-            }
+        jobs = job_queue.list_jobs(queue="transform", status=status, limit=limit)
+        counts = job_queue.counts("transform").get("transform", {})
+        return {
+            "status": "success",
+            "queue": [_transformation_item(job) for job in jobs],
+            "pending_count": counts.get("pending", 0),
+            "total_count": sum(counts.values())
+        }
             
     except Exception as e:
         logger.error(f"Get transformation queue failed: {str(e)}")
@@ -1298,7 +1449,6 @@ async def get_transformation_queue():
 
 @app.post("/process-local-folder")
 async def process_local_folder(
-    background_tasks: BackgroundTasks,
     folder_path: str = "/Users/tem/nab/exploded_archive_node",
     max_conversations: Optional[int] = None
 ):
@@ -1323,17 +1473,17 @@ async def process_local_folder(
         processor = FolderByFolderProcessor(folder_path)
         processing_sessions[processor.session_id] = SimpleArchiveProcessor()  # For compatibility
         
-        # Start background processing
-        background_tasks.add_task(
-            run_folder_by_folder_processing,
-            processor.session_id,
-            folder_path,
-            max_conversations
-        )
+        # Queue the processing; the embedded job worker runs it
+        job_id = job_queue.enqueue("import", "folder_import", {
+            "session_id": processor.session_id,
+            "folder_path": folder_path,
+            "max_conversations": max_conversations
+        }, max_attempts=2)
         
         return {
             "status": "started",
             "session_id": processor.session_id,
+            "job_id": job_id,
             "folder_path": folder_path,
             "processing_approach": "folder_by_folder",
             "progress_url": f"/progress/{processor.session_id}",
@@ -1381,6 +1531,34 @@ async def run_folder_by_folder_processing(
         if session_id in processing_sessions:
             # Update session with error
             pass
+    finally:
+        statistics_cache.invalidate()
+
+
+async def _run_folder_import_job(job: Job):
+    payload = job.payload
+    await run_folder_by_folder_processing(
+        payload["session_id"], payload["folder_path"], payload["max_conversations"]
+    )
+    return {"session_id": payload["session_id"]}
+
+job_worker = JobWorker(job_queue, {
+    "folder_import": _run_folder_import_job,
+    "generate_embeddings": _run_embedding_job
+}, ["import", "embed"])
+_job_worker_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_job_worker():
+    global _job_worker_task
+    _job_worker_task = asyncio.create_task(job_worker.run())
+
+@app.on_event("shutdown")
+async def stop_job_worker():
+    """Hand running jobs back to the queue so they resume after restart"""
+    job_worker.stop()
+    if _job_worker_task:
+        await _job_worker_task
 
 
 @app.post("/generate-hierarchical-chunks")
@@ -1483,6 +1661,7 @@ async def generate_hierarchical_chunks(request: ChunkingRequest):
                 continue
         
         await conn.close()
+        statistics_cache.invalidate()
         
         logger.info(f"Hierarchical chunking complete: {processed} successful, {failed} failed")
         
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Materialized Conversation Statistics
+Per-conversation message counts, word totals, time span and media flag, kept in
+their own table so the conversation browser can list, filter and sort
+conversations without aggregating every message in the archive.
+
+Rows are maintained by triggers on archived_content, so every writer keeps
+them current: a conversation gets its row when it is inserted, inserted
+messages are added to their conversation's totals, and updated or deleted
+messages recompute the conversations they belonged to. Conversations written
+before the triggers existed are backfilled the first time the table is ensured.
+"""
+
+import logging
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+CONVERSATION_STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversation_stats (
+    conversation_id BIGINT PRIMARY KEY REFERENCES archived_content(id) ON DELETE CASCADE,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    total_word_count BIGINT NOT NULL DEFAULT 0,
+    first_message_at TIMESTAMPTZ,
+    last_message_at TIMESTAMPTZ,
+    has_media BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_stats_messages
+    ON conversation_stats(message_count, conversation_id);
+CREATE INDEX IF NOT EXISTS idx_conversation_stats_words
+    ON conversation_stats(total_word_count, conversation_id);
+
+-- Keyset pagination over conversations sorted by time or title
+CREATE INDEX IF NOT EXISTS idx_archived_conversations_timestamp
+    ON archived_content(timestamp DESC NULLS LAST, id DESC) WHERE content_type = 'conversation';
+CREATE INDEX IF NOT EXISTS idx_archived_conversations_title
+    ON archived_content(title, id) WHERE content_type = 'conversation';
+"""
+
+# Aggregates for the conversations selected by {where}; total_word_count falls
+# back to the conversation's own word_count when it has no messages
+_STATS_SELECT = """
+    SELECT
+        c.id,
+        COUNT(m.id),
+        COALESCE(SUM(m.word_count), c.word_count, 0),
+        MIN(m.timestamp),
+        MAX(m.timestamp),
+        COALESCE(BOOL_OR((m.source_metadata->>'has_media')::boolean), FALSE),
+        NOW()
+    FROM archived_content c
+    LEFT JOIN archived_content m ON m.parent_id = c.id AND m.content_type = 'message'
+    WHERE c.content_type = 'conversation' AND {where}
+    GROUP BY c.id, c.word_count
+"""
+
+_UPSERT = """
+    INSERT INTO conversation_stats
+    (conversation_id, message_count, total_word_count, first_message_at,
+     last_message_at, has_media, updated_at)
+    {select}
+    ON CONFLICT (conversation_id) DO UPDATE SET
+        message_count = EXCLUDED.message_count,
+        total_word_count = EXCLUDED.total_word_count,
+        first_message_at = EXCLUDED.first_message_at,
+        last_message_at = EXCLUDED.last_message_at,
+        has_media = EXCLUDED.has_media,
+        updated_at = EXCLUDED.updated_at
+"""
+
+_STATS_REFRESH = _UPSERT.format(select=_STATS_SELECT)
+
+# Inserted conversations start with their own word_count; inserted messages are
+# added to their conversation's row, replacing that fallback with the first batch
+_INSERT_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION conversation_stats_inserted() RETURNS trigger AS $body$
+BEGIN
+    INSERT INTO conversation_stats (conversation_id, total_word_count)
+    SELECT id, COALESCE(word_count, 0) FROM inserted_rows WHERE content_type = 'conversation'
+    ON CONFLICT (conversation_id) DO NOTHING;
+
+    UPDATE conversation_stats s SET
+        message_count = s.message_count + d.messages,
+        total_word_count = CASE WHEN s.message_count = 0 THEN 0 ELSE s.total_word_count END + d.words,
+        first_message_at = LEAST(s.first_message_at, d.first_at),
+        last_message_at = GREATEST(s.last_message_at, d.last_at),
+        has_media = s.has_media OR d.has_media,
+        updated_at = NOW()
+    FROM (
+        SELECT
+            parent_id,
+            COUNT(*) AS messages,
+            COALESCE(SUM(word_count), 0) AS words,
+            MIN(timestamp) AS first_at,
+            MAX(timestamp) AS last_at,
+            COALESCE(BOOL_OR((source_metadata->>'has_media')::boolean), FALSE) AS has_media
+        FROM inserted_rows
+        WHERE content_type = 'message' AND parent_id IS NOT NULL
+        GROUP BY parent_id
+    ) d
+    WHERE s.conversation_id = d.parent_id;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+"""
+
+_UPDATE_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION conversation_stats_updated() RETURNS trigger AS $body$
+BEGIN
+    %s;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+""" % _STATS_REFRESH.format(where="c.id IN (OLD.parent_id, NEW.parent_id, NEW.id)")
+
+_DELETE_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION conversation_stats_deleted() RETURNS trigger AS $body$
+BEGIN
+    %s;
+    RETURN NULL;
+END
+$body$ LANGUAGE plpgsql;
+""" % _STATS_REFRESH.format(
+    where="c.id IN (SELECT parent_id FROM deleted_rows WHERE content_type = 'message')"
+)
+
+# Inserts and deletes fire once per statement over a transition table, so a
+# batch insert touches each conversation once. Updates only fire when a column
+# the stats depend on changed, which keeps embedding and status updates free.
+_TRIGGERS = {
+    "conversation_stats_insert": """
+        CREATE TRIGGER conversation_stats_insert
+        AFTER INSERT ON archived_content
+        REFERENCING NEW TABLE AS inserted_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION conversation_stats_inserted()
+    """,
+    "conversation_stats_update": """
+        CREATE TRIGGER conversation_stats_update
+        AFTER UPDATE OF parent_id, content_type, word_count, timestamp, source_metadata
+        ON archived_content
+        FOR EACH ROW
+        WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id
+              OR OLD.content_type IS DISTINCT FROM NEW.content_type
+              OR OLD.word_count IS DISTINCT FROM NEW.word_count
+              OR OLD.timestamp IS DISTINCT FROM NEW.timestamp
+              OR OLD.source_metadata->'has_media' IS DISTINCT FROM NEW.source_metadata->'has_media')
+        EXECUTE FUNCTION conversation_stats_updated()
+    """,
+    "conversation_stats_delete": """
+        CREATE TRIGGER conversation_stats_delete
+        AFTER DELETE ON archived_content
+        REFERENCING OLD TABLE AS deleted_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION conversation_stats_deleted()
+    """
+}
+
+# Triggers are only created when missing: dropping and recreating them would
+# take an exclusive lock on archived_content every time a process starts
+_TRIGGER_EXISTS_SQL = """
+    SELECT 1 FROM pg_trigger
+    WHERE tgrelid = 'archived_content'::regclass AND tgname = $1
+"""
+
+async def ensure_conversation_stats(conn) -> int:
+    """Create the stats table, indexes and maintenance triggers, and backfill
+    conversations that have no stats row.
+
+    Returns the number of conversations backfilled.
+    """
+    async with conn.transaction():
+        await conn.execute(CONVERSATION_STATS_SCHEMA)
+        for function in (_INSERT_TRIGGER_FUNCTION, _UPDATE_TRIGGER_FUNCTION, _DELETE_TRIGGER_FUNCTION):
+            await conn.execute(function)
+        for name, create in _TRIGGERS.items():
+            if not await conn.fetchval(_TRIGGER_EXISTS_SQL, name):
+                await conn.execute(create)
+        status = await conn.execute(_STATS_REFRESH.format(
+            where="NOT EXISTS (SELECT 1 FROM conversation_stats s WHERE s.conversation_id = c.id)"
+        ))
+    backfilled = int(status.split()[-1]) if status else 0
+    if backfilled:
+        logger.info(f"Backfilled conversation stats for {backfilled} conversations")
+    return backfilled
+
+async def refresh_conversation_stats(conn, conversation_ids: Iterable[int]):
+    """Recompute the stats rows of the given conversations from their messages.
+
+    The triggers keep rows current; this rebuilds rows after bulk edits made
+    with the triggers disabled.
+    """
+    conversation_ids = list(conversation_ids)
+    if not conversation_ids:
+        return
+    await conn.execute(_STATS_REFRESH.format(where="c.id = ANY($1::bigint[])"), conversation_ids)
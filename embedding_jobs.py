@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Embedding Jobs
+Background, resumable generation of conversation embeddings via Ollama.
+
+A run walks the conversations needing vectors in keyset pages. Each page is
+embedded with batched, concurrent calls to the embedding server and stored
+with one binary write. The next page is fetched while the current one is
+being embedded.
+
+How many calls are in flight is steered by the server's observed latency
+rather than fixed sleeps. Concurrency grows while responses stay under the
+target latency and halves when they slow down or fail.
+
+After every page the run saves its progress (counts and keyset cursor) on
+its job. The UI polls that progress, and a retried or reclaimed job resumes
+from it.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from vector_writes import register_vector_codec, write_semantic_vectors, write_metrics
+
+logger = logging.getLogger("archive_import")
+
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
+
+# Latency an embedding call may take before the run stops adding concurrency
+EMBEDDING_TARGET_LATENCY = float(os.getenv("EMBEDDING_TARGET_LATENCY", "2.0"))
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "8"))
+
+# Conversations fetched, embedded and written per page (one progress checkpoint each)
+EMBEDDING_PAGE_SIZE = 100
+MAX_EMBED_CHARS = 8000
+EMBED_ATTEMPTS = 3
+
+_PAGE_BY_IDS = """
+    SELECT id, title, body_text, COALESCE(word_count, 0) AS word_count
+    FROM archived_content
+    WHERE id = ANY($1) AND content_type = 'conversation'
+      AND ($2::bigint IS NULL OR id > $2)
+    ORDER BY id
+    LIMIT $3
+"""
+
+# Largest conversations first, as before; the cursor is (word_count, id)
+_PAGE_MISSING = """
+    SELECT id, title, body_text, COALESCE(word_count, 0) AS word_count
+    FROM archived_content
+    WHERE content_type = 'conversation' AND semantic_vector IS NULL
+      AND ($1::integer IS NULL OR (COALESCE(word_count, 0), id) < ($1, $2::bigint))
+    ORDER BY COALESCE(word_count, 0) DESC, id DESC
+    LIMIT $3
+"""
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit for embedding calls, adjusted additively-increase /
+    multiplicatively-decrease on the smoothed call latency.
+
+    The limit is revisited once per `limit` completed calls: it grows by one
+    while latency is under target and halves above 1.5x target. A failed
+    call halves it at once and delays the next calls with exponential
+    backoff.
+    """
+
+    def __init__(self, target_latency: float = EMBEDDING_TARGET_LATENCY,
+                 max_concurrency: int = EMBEDDING_MAX_CONCURRENCY, initial: int = 2):
+        self.target_latency = target_latency
+        self.max_concurrency = max_concurrency
+        self.limit = min(initial, max_concurrency)
+        self.latency: Optional[float] = None
+        self.calls = 0
+        self.errors = 0
+        self._active = 0
+        self._since_adjust = 0
+        self._consecutive_errors = 0
+        self._backoff_until = 0.0
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self.limit)
+            self._active += 1
+        try:
+            delay = self._backoff_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield
+        finally:
+            async with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def observe(self, latency: float):
+        """Record a successful call."""
+        self.calls += 1
+        self._consecutive_errors = 0
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+        self._since_adjust += 1
+        if self._since_adjust < self.limit:
+            return
+        self._since_adjust = 0
+        if self.latency > 1.5 * self.target_latency:
+            self.limit = max(1, self.limit // 2)
+        elif self.latency < self.target_latency:
+            self.limit = min(self.max_concurrency, self.limit + 1)
+
+    def penalize(self):
+        """Record a failed call."""
+        self.calls += 1
+        self.errors += 1
+        self._consecutive_errors += 1
+        self._since_adjust = 0
+        self.limit = max(1, self.limit // 2)
+        self._backoff_until = time.monotonic() + min(30.0, 0.5 * 2 ** self._consecutive_errors)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.limit,
+            "latency_ms": round(1000 * self.latency, 1) if self.latency is not None else None,
+            "calls": self.calls,
+            "errors": self.errors
+        }
+
+class _BatchEndpointMissing(Exception):
+    pass
+
+class OllamaEmbedder:
+    """
+    Async embedding calls through an AdaptiveLimiter.
+
+    Uses Ollama's batch endpoint (/api/embed) and falls back to one
+    /api/embeddings call per text on servers that predate it.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, limiter: AdaptiveLimiter,
+                 host: str = OLLAMA_HOST, model: str = EMBEDDING_MODEL):
+        self.client = client
+        self.limiter = limiter
+        self.host = host.rstrip("/")
+        self.model = model
+        self._batch_endpoint = True
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if self._batch_endpoint:
+            try:
+                return await self._call("/api/embed", {"model": self.model, "input": texts}, "embeddings")
+            except _BatchEndpointMissing:
+                logger.info("Embedding server has no /api/embed; embedding one text per call")
+                self._batch_endpoint = False
+        return list(await asyncio.gather(*(
+            self._call("/api/embeddings", {"model": self.model, "prompt": text}, "embedding")
+            for text in texts
+        )))
+
+    async def _call(self, path: str, body: Dict[str, Any], key: str) -> Any:
+        async with self.limiter.slot():
+            started = time.monotonic()
+            try:
+                response = await self.client.post(f"{self.host}{path}", json=body)
+                # A missing model is a JSON error; a missing route is Ollama's plain-text 404
+                if (response.status_code == 404 and path == "/api/embed"
+                        and "json" not in response.headers.get("content-type", "")):
+                    raise _BatchEndpointMissing()
+                response.raise_for_status()
+                result = response.json()[key]
+            except _BatchEndpointMissing:
+                raise
+            except Exception:
+                self.limiter.penalize()
+                raise
+            self.limiter.observe(time.monotonic() - started)
+            return result
+
+class EmbeddingRun:
+    """
+    One embedding job: payload is the /generate-embeddings request
+    (conversation_ids, batch_size, max_conversations).
+
+    `checkpoint` is called with the progress after every page and returns
+    False when the run should stop (the job was cancelled or lost its lease).
+    """
+
+    def __init__(self, payload: Dict[str, Any], connect: Callable[[], Awaitable[Any]],
+                 checkpoint: Callable[[Dict[str, Any]], Awaitable[bool]],
+                 progress: Optional[Dict[str, Any]] = None,
+                 limiter: Optional[AdaptiveLimiter] = None):
+        self.conversation_ids = payload.get("conversation_ids")
+        self.batch_size = max(1, payload.get("batch_size") or 10)
+        self.max_conversations = payload.get("max_conversations")
+        self.connect = connect
+        self.checkpoint = checkpoint
+        self.limiter = limiter or AdaptiveLimiter()
+        self.progress = {
+            "total": None,
+            "processed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "cursor": None,
+            "resumed": 0,
+            **(progress or {})
+        }
+
+    @property
+    def consumed(self) -> int:
+        return self.progress["processed"] + self.progress["failed"] + self.progress["skipped"]
+
+    async def run(self) -> Dict[str, Any]:
+        if self.consumed:
+            self.progress["resumed"] += 1
+            logger.info(f"Resuming embedding run after {self.consumed} conversations")
+
+        started = time.monotonic()
+        done_at_start = self.consumed
+        conn = await self.connect()
+        try:
+            await register_vector_codec(conn)
+            if self.progress["total"] is None:
+                self.progress["total"] = await self._count(conn)
+                logger.info(f"Starting embedding generation for {self.progress['total']} conversations")
+
+            async with httpx.AsyncClient(timeout=httpx.Timeout(120.0, connect=10.0)) as client:
+                embedder = OllamaEmbedder(client, self.limiter)
+                cursor = self.progress["cursor"]
+                page = await self._fetch_page(conn, cursor, self.consumed)
+
+                while page:
+                    cursor = self._cursor_after(page)
+                    fetched = self.consumed + len(page)
+                    # Fetch the next page while this one is being embedded
+                    next_page = asyncio.create_task(self._fetch_page(conn, cursor, fetched))
+                    try:
+                        vectors, failed, skipped = await self._embed_page(embedder, page)
+                        following = await next_page
+                    except BaseException:
+                        next_page.cancel()
+                        raise
+
+                    try:
+                        written = await write_semantic_vectors(conn, vectors)
+                    except Exception as e:
+                        logger.error(f"Failed to store {len(vectors)} embeddings: {e}")
+                        written = 0
+                    failed += len(vectors) - written
+
+                    elapsed = time.monotonic() - started
+                    self.progress.update({
+                        "processed": self.progress["processed"] + written,
+                        "failed": self.progress["failed"] + failed,
+                        "skipped": self.progress["skipped"] + skipped,
+                        "cursor": cursor,
+                        "rate_per_second": round((self.consumed - done_at_start) / elapsed, 2) if elapsed else None,
+                        "limiter": self.limiter.snapshot(),
+                        "vector_writes": write_metrics.snapshot()
+                    })
+                    logger.info(f"Generated embeddings for {self.progress['processed']}/{self.progress['total']} conversations "
+                                f"(concurrency {self.limiter.limit}, latency {self.progress['limiter']['latency_ms']} ms)")
+
+                    if not await self.checkpoint(self.progress):
+                        logger.warning("Embedding run stopped: job no longer held by this worker")
+                        break
+                    page = following
+        finally:
+            await conn.close()
+
+        logger.info(f"Embedding generation complete: {self.progress['processed']} successful, "
+                    f"{self.progress['failed']} failed")
+        return self.progress
+
+    async def _count(self, conn) -> int:
+        if self.conversation_ids:
+            total = await conn.fetchval(
+                "SELECT COUNT(*) FROM archived_content WHERE id = ANY($1) AND content_type = 'conversation'",
+                self.conversation_ids
+            )
+        else:
+            total = await conn.fetchval(
+                "SELECT COUNT(*) FROM archived_content WHERE content_type = 'conversation' AND semantic_vector IS NULL"
+            )
+        return min(total, self.max_conversations) if self.max_conversations else total
+
+    async def _fetch_page(self, conn, cursor: Optional[Dict[str, int]], fetched: int) -> List[Any]:
+        limit = EMBEDDING_PAGE_SIZE
+        if self.max_conversations:
+            limit = min(limit, self.max_conversations - fetched)
+            if limit <= 0:
+                return []
+        if self.conversation_ids:
+            return await conn.fetch(_PAGE_BY_IDS, self.conversation_ids,
+                                    cursor["id"] if cursor else None, limit)
+        return await conn.fetch(_PAGE_MISSING, cursor["word_count"] if cursor else None,
+                                cursor["id"] if cursor else None, limit)
+
+    def _cursor_after(self, page: List[Any]) -> Dict[str, int]:
+        last = page[-1]
+        return {"id": last["id"], "word_count": last["word_count"]}
+
+    async def _embed_page(self, embedder: OllamaEmbedder,
+                          page: List[Any]) -> Tuple[List[Tuple[int, List[float]]], int, int]:
+        """(id, vector) rows for the page, plus the failed and skipped counts."""
+        items = []
+        for row in page:
+            content = row["body_text"] or row["title"] or ""
+            if content.strip():
+                items.append((row["id"], content[:MAX_EMBED_CHARS]))
+        skipped = len(page) - len(items)
+
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        results = await asyncio.gather(*(self._embed_batch(embedder, batch) for batch in batches))
+
+        vectors = [row for batch in results for row in batch]
+        return vectors, len(items) - len(vectors), skipped
+
+    async def _embed_batch(self, embedder: OllamaEmbedder,
+                           batch: List[Tuple[int, str]]) -> List[Tuple[int, List[float]]]:
+        for attempt in range(1, EMBED_ATTEMPTS + 1):
+            try:
+                embeddings = await embedder.embed([text for _, text in batch])
+                return [(content_id, embedding) for (content_id, _), embedding in zip(batch, embeddings)
+                        if embedding]
+            except Exception as e:
+                logger.warning(f"Embedding call for {len(batch)} conversations failed "
+                               f"(attempt {attempt}/{EMBED_ATTEMPTS}): {e}")
+        return []
@@ -13,6 +13,8 @@ Key innovations:
 - Natural language grounding to avoid template artifacts
 """
 
+import sys
+from pathlib import Path
 import json
 import logging
 import hashlib
@@ -23,8 +25,32 @@ from enum import Enum
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+# The shared Lexicon matcher lives in src/, outside the lpe_core package
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+from lexicon import Lexicon
+
 logger = logging.getLogger(__name__)
 
+# Emotion keywords; the first matching emotion (in this order) labels a sentence
+EMOTION_LEXICON = Lexicon({
+    'joy': ['happy', 'joy', 'celebration', 'triumph', 'elated'],
+    'fear': ['afraid', 'terror', 'scared', 'frightened', 'dread'],
+    'anger': ['angry', 'rage', 'furious', 'mad', 'enraged'],
+    'sadness': ['sad', 'grief', 'sorrow', 'melancholy', 'despair'],
+    'surprise': ['surprise', 'shocked', 'amazed', 'astonished'],
+    'love': ['love', 'affection', 'adoration', 'cherish'],
+})
+
+THEME_LEXICON = Lexicon({
+    'power': ['power', 'control', 'authority', 'dominance', 'rule'],
+    'love': ['love', 'romance', 'relationship', 'marriage', 'partnership'],
+    'death': ['death', 'mortality', 'dying', 'killed', 'perish'],
+    'growth': ['growth', 'development', 'change', 'transformation', 'evolution'],
+    'conflict': ['conflict', 'war', 'battle', 'fight', 'struggle'],
+    'justice': ['justice', 'fairness', 'right', 'wrong', 'moral'],
+    'identity': ['identity', 'self', 'who am i', 'belonging', 'purpose'],
+})
+
 class AttributeType(Enum):
     PERSONA = "persona"
     NAMESPACE = "namespace" 
@@ -173,49 +199,30 @@ class NarrativeDNAExtractor:
     
     def _extract_emotional_trajectory(self, text: str) -> List[str]:
         """Extract emotional progression."""
-        # Simple emotion detection
-        emotions = {
-            'joy': ['happy', 'joy', 'celebration', 'triumph', 'elated'],
-            'fear': ['afraid', 'terror', 'scared', 'frightened', 'dread'],
-            'anger': ['angry', 'rage', 'furious', 'mad', 'enraged'],
-            'sadness': ['sad', 'grief', 'sorrow', 'melancholy', 'despair'],
-            'surprise': ['surprise', 'shocked', 'amazed', 'astonished'],
-            'love': ['love', 'affection', 'adoration', 'cherish'],
-        }
+        # Simple emotion detection: one lexicon scan, then attribute matches to sentences
+        text_lower = text.lower()
+        matches = EMOTION_LEXICON.scan(text_lower)
         
         emotional_trajectory = []
-        sentences = text.split('.')
+        offset = 0
         
-        for i, sentence in enumerate(sentences):
-            sentence_lower = sentence.lower()
-            for emotion, words in emotions.items():
-                if any(word in sentence_lower for word in words):
+        for i, sentence in enumerate(text_lower.split('.')):
+            sentence_matches = matches.slice(offset, offset + len(sentence))
+            offset += len(sentence) + 1
+            for emotion in EMOTION_LEXICON.category_terms:
+                if sentence_matches.has(emotion):
                     emotional_trajectory.append(f"{i}: {emotion}")
                     break
+            if len(emotional_trajectory) >= 10:
+                break
         
-        return emotional_trajectory[:10]
+        return emotional_trajectory
     
     def _extract_themes(self, text: str) -> List[str]:
         """Extract thematic elements."""
-        themes = []
-        
         # Look for thematic keywords
-        theme_patterns = {
-            'power': ['power', 'control', 'authority', 'dominance', 'rule'],
-            'love': ['love', 'romance', 'relationship', 'marriage', 'partnership'],
-            'death': ['death', 'mortality', 'dying', 'killed', 'perish'],
-            'growth': ['growth', 'development', 'change', 'transformation', 'evolution'],
-            'conflict': ['conflict', 'war', 'battle', 'fight', 'struggle'],
-            'justice': ['justice', 'fairness', 'right', 'wrong', 'moral'],
-            'identity': ['identity', 'self', 'who am i', 'belonging', 'purpose'],
-        }
-        
-        text_lower = text.lower()
-        for theme, keywords in theme_patterns.items():
-            if any(keyword in text_lower for keyword in keywords):
-                themes.append(theme)
-        
-        return themes
+        matches = THEME_LEXICON.scan(text)
+        return [theme for theme in THEME_LEXICON.category_terms if matches.has(theme)]
     
     def _analyze_structure(self, text: str) -> str:
         """Analyze narrative structure."""
@@ -4,6 +4,7 @@ Implements sophisticated multi-dimensional attributes with filtered namespaces
 and consciousness mapping for narrative analysis.
 """
 
+import sys
 import asyncio
 import logging
 import re
@@ -16,6 +17,10 @@ from datetime import datetime
 import numpy as np
 from pathlib import Path
 
+# The shared Lexicon matcher lives in src/, outside the lpe_core package
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+from lexicon import Lexicon, LexiconMatch
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -230,6 +235,7 @@ class NoeticAnalyzer:
     def __init__(self):
         self.consciousness_markers = self._load_consciousness_markers()
         self.intentional_patterns = self._load_intentional_patterns()
+        self.lexicon = self._build_lexicon()
         
     def _load_consciousness_markers(self) -> Dict[str, List[str]]:
         """Load linguistic markers that indicate different levels of consciousness."""
@@ -251,46 +257,51 @@ class NoeticAnalyzer:
             "universal_claims": ["always", "never", "everyone", "no one", "everything", "nothing"]
         }
     
+    def _build_lexicon(self) -> Lexicon:
+        """Compile all consciousness and intentional markers into one lexicon."""
+        categories = {}
+        for level, markers in self.consciousness_markers.items():
+            categories[f"consciousness:{level}"] = markers
+        for pattern_type, markers in self.intentional_patterns.items():
+            categories[f"intentional:{pattern_type}"] = markers
+        return Lexicon(categories)
+    
     def analyze_noetic_patterns(self, text: str) -> List[NoeticPattern]:
         """Analyze text for patterns of consciousness and intentional meaning."""
         patterns = []
-        sentences = self._segment_sentences(text)
         
-        for sentence in sentences:
-            pattern = self._analyze_sentence_consciousness(sentence)
+        # Scan the whole text once, then attribute marker matches to sentences
+        matches = self.lexicon.scan(text)
+        
+        for span in re.finditer(r'[^.!?]+', text):
+            sentence = span.group().strip()
+            if not sentence:
+                continue
+            pattern = self._analyze_sentence_consciousness(sentence, matches.slice(span.start(), span.end()))
             if pattern:
                 patterns.append(pattern)
         
         return patterns
     
-    def _segment_sentences(self, text: str) -> List[str]:
-        """Segment text into sentences for analysis."""
-        # Simple implementation - would use spaCy or NLTK in production
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() for s in sentences if s.strip()]
-    
-    def _analyze_sentence_consciousness(self, sentence: str) -> Optional[NoeticPattern]:
+    def _analyze_sentence_consciousness(self, sentence: str,
+                                        matches: Optional[LexiconMatch] = None) -> Optional[NoeticPattern]:
         """Analyze a single sentence for consciousness patterns."""
-        sentence_lower = sentence.lower()
+        if matches is None:
+            matches = self.lexicon.scan(sentence)
         
         # Calculate intentional weight
         intentional_weight = 0.0
-        for pattern_type, markers in self.intentional_patterns.items():
-            for marker in markers:
-                if marker in sentence_lower:
-                    intentional_weight += 0.2
+        for pattern_type in self.intentional_patterns:
+            intentional_weight += 0.2 * len(matches.terms(f"intentional:{pattern_type}"))
         
         # Determine consciousness depth
         consciousness_depth = 1
-        for level, markers in self.consciousness_markers.items():
-            for marker in markers:
-                if marker in sentence_lower:
-                    if level == "metacognitive":
-                        consciousness_depth = max(consciousness_depth, 4)
-                    elif level == "phenomenological":
-                        consciousness_depth = max(consciousness_depth, 3)
-                    elif level == "reflective_thought":
-                        consciousness_depth = max(consciousness_depth, 2)
+        if matches.has("consciousness:metacognitive"):
+            consciousness_depth = 4
+        elif matches.has("consciousness:phenomenological"):
+            consciousness_depth = 3
+        elif matches.has("consciousness:reflective_thought"):
+            consciousness_depth = 2
         
         # Generate simple projection vector (would use embeddings in production)
         projection_vector = [float(len(sentence)), float(intentional_weight), float(consciousness_depth)]
@@ -299,16 +310,13 @@ class NoeticAnalyzer:
         meaning_coherence = min(1.0, intentional_weight / 2.0 + 0.3)
         
         # Extract intersubjective markers
-        intersubjective_markers = []
-        for marker in self.consciousness_markers.get("intersubjective", []):
-            if marker in sentence_lower:
-                intersubjective_markers.append(marker)
+        matched = set(matches.term_counts)
+        intersubjective_markers = [marker for marker in self.consciousness_markers.get("intersubjective", [])
+                                   if marker.lower() in matched]
         
         # Extract phenomenological anchors
-        phenomenological_anchors = []
-        for marker in self.consciousness_markers.get("phenomenological", []):
-            if marker in sentence_lower:
-                phenomenological_anchors.append(marker)
+        phenomenological_anchors = [marker for marker in self.consciousness_markers.get("phenomenological", [])
+                                    if marker.lower() in matched]
         
         if intentional_weight > 0.1 or consciousness_depth > 1:
             return NoeticPattern(
@@ -36,6 +36,7 @@ from lpe_core.translation_roundtrip import LanguageRoundTripAnalyzer
 from lpe_core.llm_provider import get_llm_provider, GoogleProvider, OllamaVisionProvider
 from lpe_core.models import Projection, MaieuticSession, RoundTripResult
 from lpe_core.knowledge_base import LamishKnowledgeBase
+from lpe_core.lexicon import Lexicon
 
 # Load environment variables
 load_dotenv()
@@ -586,13 +587,13 @@ async def enhance_semantic_anchors():
         ai_engine = AttributeIntelligenceEngine(quantum_engine=quantum_engine if NARRATIVE_THEORY_AVAILABLE else None)
         
         # Get initial anchor count
-        initial_count = len(ai_engine.anchor_points)
+        initial_count = len(ai_engine.anchor_index)
         
         # Enhance anchors from archive
         await ai_engine.enhance_semantic_anchors_from_archive()
         
         # Get final anchor count
-        final_count = len(ai_engine.anchor_points)
+        final_count = len(ai_engine.anchor_index)
         new_anchors = final_count - initial_count
         
         return {
@@ -1326,7 +1327,9 @@ async def analyze_lamish_meaning(request: LamishAnalysisRequest):
             quality_indicators = {}
         
         # Get suggested optimal configuration  
-        suggested_attributes = knowledge_base.suggest_optimal_configuration(narrative)
+        suggested_attributes = knowledge_base.suggest_optimal_configuration(
+            narrative, essence_embedding if any(essence_embedding) else None
+        )
         
         # Create actual lamish projection using suggested attributes
         projection = projection_engine.create_projection(
@@ -1432,8 +1435,7 @@ async def create_concept(concept_data: dict):
 async def delete_concept(concept_id: str):
     """Delete a concept from the knowledge base."""
     try:
-        if concept_id in knowledge_base.concepts:
-            del knowledge_base.concepts[concept_id]
+        if knowledge_base.remove_concept(concept_id):
             knowledge_base.save_knowledge_base()
             return {"status": "success", "message": "Concept deleted successfully"}
         else:
@@ -1450,15 +1452,15 @@ async def get_stored_meanings():
     """Get all stored lamish meanings."""
     try:
         meanings = []
-        for key, meaning in knowledge_base.meanings.items():
+        for key, meaning in knowledge_base.list_meanings():
             meanings.append({
                 "id": key,
-                "preview": meaning.source_text[:50] + "..." if len(meaning.source_text) > 50 else meaning.source_text,
-                "full_text": meaning.source_text,
-                "dimensions": len(meaning.essence_embedding),
-                "created": meaning.created_at,
-                "quality_indicators": meaning.quality_indicators,
-                "narrative_elements": meaning.narrative_elements
+                "preview": meaning["source_text"][:50] + "..." if len(meaning["source_text"]) > 50 else meaning["source_text"],
+                "full_text": meaning["source_text"],
+                "dimensions": meaning["embedding_dim"],
+                "created": meaning["created_at"],
+                "quality_indicators": meaning["quality_indicators"],
+                "narrative_elements": meaning["narrative_elements"]
             })
         
         return {"meanings": meanings}
@@ -2705,14 +2707,23 @@ Return JSON with suggested attribute types and search queries."""
         logger.error(f"Failed to extract attributes: {e}")
         raise HTTPException(status_code=500, detail=f"Attribute extraction failed: {str(e)}")
 
+# Whole-word cues used by the mock attribute analysis
+MOCK_ATTRIBUTE_LEXICON = Lexicon({
+    "contemplative": ["think", "believe", "feel", "consider", "wonder"],
+    "conceptual": ["world", "reality", "universe", "system", "framework"],
+    "analytical": ["analyze", "examine", "study", "research", "investigate"],
+    "aesthetic": ["beautiful", "elegant", "graceful", "flowing", "artistic"]
+}, whole_words=True)
+
 def generate_mock_attribute_analysis(text: str, mode: str):
     """Generate mock analysis when LLM fails."""
     words = text.lower().split()
+    cues = MOCK_ATTRIBUTE_LEXICON.scan(text)
     
     attributes = []
     
     # Mock persona extraction
-    if any(word in words for word in ["think", "believe", "feel", "consider", "wonder"]):
+    if cues.has("contemplative"):
         attributes.append({
             "id": f"persona_{len(attributes)}",
             "type": "persona",
@@ -2725,7 +2736,7 @@ def generate_mock_attribute_analysis(text: str, mode: str):
         })
     
     # Mock namespace extraction  
-    if any(word in words for word in ["world", "reality", "universe", "system", "framework"]):
+    if cues.has("conceptual"):
         attributes.append({
             "id": f"namespace_{len(attributes)}",
             "type": "namespace", 
@@ -2739,11 +2750,11 @@ def generate_mock_attribute_analysis(text: str, mode: str):
     
     # Mock style extraction
     if len(words) > 20:
-        if any(word in words for word in ["analyze", "examine", "study", "research", "investigate"]):
+        if cues.has("analytical"):
             style_name = "Analytical Expression"
             style_desc = "Clear, methodical communication that breaks down complex topics"
             keywords = ["analytical", "systematic", "precise", "methodical", "logical"]
-        elif any(word in words for word in ["beautiful", "elegant", "graceful", "flowing", "artistic"]):
+        elif cues.has("aesthetic"):
             style_name = "Aesthetic Expression"  
             style_desc = "Flowing, beautiful language that emphasizes grace and elegance"
             keywords = ["aesthetic", "graceful", "flowing", "elegant", "artistic"]
@@ -2843,7 +2854,8 @@ async def transform_large_narrative(request: TransformationRequest):
             namespace=request.target_namespace,
             style=request.target_style,
             narrative_id=transform_id,
-            max_parallel=2  # Conservative parallel processing
+            projection_engine=projection_engine,
+            progress_callback=send_progress_update
         )
         
         # Send final progress update
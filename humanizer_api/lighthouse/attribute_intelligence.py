@@ -12,6 +12,7 @@ AI-guided dynamic attribute selection system that:
 Author: Enhanced for dynamic attribute discovery
 """
 
+import sys
 import numpy as np
 import torch
 from typing import Dict, List, Tuple, Optional, Any
@@ -20,6 +21,7 @@ import json
 import sqlite3
 from pathlib import Path
 import logging
+import threading
 from datetime import datetime
 
 # Import centralized embedding system
@@ -34,8 +36,21 @@ except ImportError:
     except ImportError:
         EMBEDDING_CONFIG_AVAILABLE = None
 
+# The shared Lexicon matcher lives in src/, outside the lpe_core package
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+from lexicon import Lexicon
+from vector_index import VectorIndex
+
 logger = logging.getLogger(__name__)
 
+# Content keywords suggesting a persona for new semantic anchors
+PERSONA_HINT_LEXICON = Lexicon({
+    "researcher": ["research", "study", "analysis"],
+    "storyteller": ["story", "narrative", "character"],
+    "philosopher": ["wisdom", "philosophy", "meaning"],
+    "guide": ["guide", "how to", "steps"]
+})
+
 @dataclass
 class AttributeProfile:
     """Represents a complete attribute configuration with metadata."""
@@ -119,11 +134,19 @@ class AttributeIntelligenceEngine:
         self.rag_db_path = rag_db_path
         self._init_rag_database()
         
+        # Vector indexes over pattern source embeddings, keyed by embedding dimension
+        # (loaded from the patterns table on first query, then kept in step with it)
+        self._pattern_indexes: Optional[Dict[int, VectorIndex]] = None
+        self._pattern_index_lock = threading.Lock()
+        
         # Quantum engine integration
         self.quantum_engine = quantum_engine
         
-        # Semantic anchor points (learned from data)
-        self.anchor_points = {}
+        # Semantic anchor points (learned from data), as a normalized matrix with
+        # parallel ids; payloads hold each anchor's description and attribute hints
+        self.anchor_index_path = Path(self.rag_db_path).parent / "semantic_anchors"
+        self.anchor_index = VectorIndex(self.embedding_dimensions)
+        self._anchor_index_version: Optional[int] = None  # Table version the in-memory index reflects
         self._load_semantic_anchors()
         
         # Attribute taxonomy (expandable via LLM discovery)
@@ -169,6 +192,22 @@ class AttributeIntelligenceEngine:
             )
         """)
         
+        # Version bumped by every write to an anchor, so a saved anchor index can
+        # tell it is stale even when a replaced anchor leaves the row count unchanged
+        cursor.execute("CREATE TABLE IF NOT EXISTS semantic_anchors_version (version INTEGER NOT NULL)")
+        cursor.execute("""
+            INSERT INTO semantic_anchors_version (version)
+            SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM semantic_anchors_version)
+        """)
+        for event in ("INSERT", "DELETE", "UPDATE OF anchor_id, embedding, description, attribute_hints"):
+            name = "semantic_anchors_" + event.split()[0].lower()
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON semantic_anchors
+                BEGIN
+                    UPDATE semantic_anchors_version SET version = version + 1;
+                END
+            """)
+        
         conn.commit()
         conn.close()
         logger.info("RAG database initialized")
@@ -188,30 +227,90 @@ class AttributeIntelligenceEngine:
             return None
 
     def _load_semantic_anchors(self):
-        """Load semantic anchor points for embedding space exploration."""
+        """
+        Load semantic anchor points for embedding space exploration.
+        
+        The anchor matrix is memory-mapped from its saved index when that was
+        saved at the semantic_anchors table's current version, and rebuilt from
+        the table (then saved) otherwise.
+        """
         try:
             conn = sqlite3.connect(self.rag_db_path)
             cursor = conn.cursor()
             
-            cursor.execute("SELECT anchor_id, embedding, description, attribute_hints FROM semantic_anchors")
-            rows = cursor.fetchall()
+            # Read the version and the rows from one snapshot
+            cursor.execute("BEGIN")
+            anchor_version = self._anchor_version(cursor)
             
-            for anchor_id, embedding_blob, description, hints in rows:
-                embedding = np.frombuffer(embedding_blob, dtype=np.float32)
-                self.anchor_points[anchor_id] = {
-                    'embedding': embedding,
-                    'description': description,
-                    'hints': json.loads(hints) if hints else {}
-                }
+            cached = self._load_anchor_index(anchor_version)
+            self._anchor_index_version = anchor_version
+            if cached is not None:
+                self.anchor_index = cached
+            else:
+                cursor.execute("SELECT anchor_id, embedding, description, attribute_hints FROM semantic_anchors")
+                ids, embeddings, payloads = [], [], []
+                for anchor_id, embedding_blob, description, hints in cursor.fetchall():
+                    embedding = np.frombuffer(embedding_blob, dtype=np.float32)
+                    if len(embedding) != self.anchor_index.dimension:
+                        continue  # Anchor from a different embedding model
+                    ids.append(anchor_id)
+                    embeddings.append(embedding)
+                    payloads.append({
+                        'description': description,
+                        'hints': json.loads(hints) if hints else {}
+                    })
+                
+                if ids:
+                    self.anchor_index.add_many(ids, np.vstack(embeddings), payloads)
+                self._save_anchor_index()
                 
+            conn.rollback()
             conn.close()
-            logger.info(f"Loaded {len(self.anchor_points)} semantic anchors")
+            logger.info(f"Loaded {len(self.anchor_index)} semantic anchors")
             
         except Exception as e:
             logger.warning(f"Could not load semantic anchors: {e}")
             # Initialize with some default anchors
             self._create_default_anchors()
 
+    @staticmethod
+    def _anchor_version(cursor) -> int:
+        """Current version of the semantic_anchors table (bumped on every anchor write)."""
+        cursor.execute("SELECT version FROM semantic_anchors_version")
+        return cursor.fetchone()[0]
+
+    def _load_anchor_index(self, anchor_version: int) -> Optional[VectorIndex]:
+        """Memory-map the saved anchor index if it matches the table version and embedding size."""
+        if not self.anchor_index_path.with_suffix(".json").exists():
+            return None
+        try:
+            index, metadata = VectorIndex.load(self.anchor_index_path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Could not load saved anchor index: {e}")
+            return None
+        if index.dimension != self.anchor_index.dimension or metadata.get("source_version") != anchor_version:
+            return None
+        return index
+
+    def _save_anchor_index(self):
+        """Save the anchor matrix, tagged with the table version it reflects, for later processes to memory-map."""
+        if self._anchor_index_version is None:
+            # Another process wrote anchors this index does not hold; the next load rebuilds it
+            logger.debug("Anchor index is behind the semantic_anchors table; not saving it")
+            return
+        try:
+            self.anchor_index.save(self.anchor_index_path, metadata={"source_version": self._anchor_index_version})
+        except Exception as e:
+            logger.warning(f"Could not save anchor index: {e}")
+
+    def _add_anchor(self, anchor_id: str, embedding: np.ndarray, description: str, hints: Dict) -> bool:
+        """Add an anchor to the in-memory index; False if its embedding size does not match."""
+        if len(embedding) != self.anchor_index.dimension:
+            logger.warning(f"Skipping anchor {anchor_id}: {len(embedding)}-d embedding, index is {self.anchor_index.dimension}-d")
+            return False
+        self.anchor_index.add(anchor_id, embedding, {'description': description, 'hints': hints})
+        return True
+
     def _create_default_anchors(self):
         """Create initial semantic anchor points."""
         if not self.embedder:
@@ -243,11 +342,7 @@ class AttributeIntelligenceEngine:
         for anchor_id, config in default_anchors.items():
             embedding = self._generate_embedding(config["text"])
             if embedding is not None:
-                self.anchor_points[anchor_id] = {
-                    'embedding': embedding,
-                    'description': config["text"],
-                    'hints': config["hints"]
-                }
+                self._add_anchor(anchor_id, embedding, config["text"], config["hints"])
             
         logger.info("Created default semantic anchors")
 
@@ -335,55 +430,79 @@ class AttributeIntelligenceEngine:
 
     def _find_nearest_anchors(self, embedding: np.ndarray, top_k: int = 3) -> List[Tuple[str, float, Dict]]:
         """Find nearest semantic anchors to the narrative embedding."""
-        similarities = []
-        
-        for anchor_id, anchor_data in self.anchor_points.items():
-            similarity = np.dot(embedding, anchor_data['embedding']) / (
-                np.linalg.norm(embedding) * np.linalg.norm(anchor_data['embedding'])
-            )
-            similarities.append((anchor_id, similarity, anchor_data['hints']))
-            
-        return sorted(similarities, key=lambda x: x[1], reverse=True)[:top_k]
+        return self._find_nearest_anchors_batch(np.atleast_2d(embedding), top_k)[0]
+
+    def _find_nearest_anchors_batch(self, embeddings: np.ndarray, top_k: int = 3) -> List[List[Tuple[str, float, Dict]]]:
+        """Nearest semantic anchors for each row of an (N, D) matrix of narrative embeddings."""
+        results = self.anchor_index.search_batch(embeddings, k=top_k)
+        return [
+            [(anchor_id, similarity, payload['hints']) for anchor_id, similarity, payload in anchors]
+            for anchors in results
+        ]
 
+    def _get_pattern_index(self, dimension: int) -> Optional[VectorIndex]:
+        """Pattern index for an embedding dimension, loading all patterns on first use."""
+        if self._pattern_indexes is None:
+            with self._pattern_index_lock:
+                if self._pattern_indexes is None:
+                    self._pattern_indexes = self._load_pattern_indexes()
+        return self._pattern_indexes.get(dimension)
+    
+    def _load_pattern_indexes(self) -> Dict[int, VectorIndex]:
+        """Build vector indexes from every stored transformation pattern in one scan."""
+        conn = sqlite3.connect(self.rag_db_path)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, source_embedding, persona, namespace, style,
+                   fidelity, preservation_score, narrative_snippet, transformation_type, created_at
+            FROM transformation_patterns
+            WHERE source_embedding IS NOT NULL
+        """)
+        
+        grouped: Dict[int, Tuple[List[str], List[np.ndarray], List[TransformationPattern]]] = {}
+        for row in cursor.fetchall():
+            pattern = self._pattern_from_row(row)
+            ids, vectors, patterns = grouped.setdefault(len(pattern.source_embedding), ([], [], []))
+            ids.append(pattern.id)
+            vectors.append(pattern.source_embedding)
+            patterns.append(pattern)
+        conn.close()
+        
+        indexes = {}
+        for dimension, (ids, vectors, patterns) in grouped.items():
+            index = VectorIndex(dimension, initial_capacity=max(256, len(ids)))
+            index.add_many(ids, np.vstack(vectors), patterns)
+            indexes[dimension] = index
+        
+        logger.info(f"Indexed {sum(len(i) for i in indexes.values())} transformation patterns")
+        return indexes
+    
+    def _pattern_from_row(self, row: Tuple) -> TransformationPattern:
+        """Build a TransformationPattern from a transformation_patterns row."""
+        try:
+            created_at = datetime.fromisoformat(str(row[9]))
+        except (TypeError, ValueError):
+            created_at = datetime.now()
+        
+        return TransformationPattern(
+            id=row[0],
+            source_embedding=np.frombuffer(row[1], dtype=np.float32),
+            target_embedding=None,  # Not needed for similarity
+            attributes={"persona": row[2], "namespace": row[3], "style": row[4]},
+            success_metrics={"fidelity": row[5], "preservation": row[6]},
+            narrative_snippet=row[7],
+            transformation_type=row[8],
+            created_at=created_at
+        )
+    
     def _query_similar_patterns(self, embedding: np.ndarray, limit: int = 5) -> List[TransformationPattern]:
-        """Query RAG database for similar transformation patterns."""
+        """Find the stored transformation patterns whose source is nearest the narrative."""
         try:
-            conn = sqlite3.connect(self.rag_db_path)
-            cursor = conn.cursor()
-            
-            # Get all patterns (in real implementation, use vector similarity search)
-            cursor.execute("""
-                SELECT id, source_embedding, persona, namespace, style, 
-                       fidelity, preservation_score, narrative_snippet, transformation_type
-                FROM transformation_patterns 
-                ORDER BY success_rating DESC
-                LIMIT ?
-            """, (limit,))
-            
-            patterns = []
-            for row in cursor.fetchall():
-                source_emb = np.frombuffer(row[1], dtype=np.float32)
-                similarity = np.dot(embedding, source_emb) / (
-                    np.linalg.norm(embedding) * np.linalg.norm(source_emb)
-                )
-                
-                pattern = TransformationPattern(
-                    id=row[0],
-                    source_embedding=source_emb,
-                    target_embedding=None,  # Not needed for similarity
-                    attributes={"persona": row[2], "namespace": row[3], "style": row[4]},
-                    success_metrics={"fidelity": row[5], "preservation": row[6]},
-                    narrative_snippet=row[7],
-                    transformation_type=row[8],
-                    created_at=datetime.now()
-                )
-                patterns.append((pattern, similarity))
-                
-            conn.close()
+            index = self._get_pattern_index(len(embedding))
+            if index is None:
+                return []
             
-            # Sort by similarity and return top patterns
-            patterns.sort(key=lambda x: x[1], reverse=True)
-            return [p[0] for p in patterns]
+            return [pattern for _, _, pattern in index.search(embedding, k=limit)]
             
         except Exception as e:
             logger.warning(f"Could not query patterns: {e}")
@@ -495,14 +614,17 @@ Select the BEST combination for this transformation. Respond in JSON:
                                      embedding: np.ndarray, 
                                      radius: float = 0.1) -> List[Tuple[str, float]]:
         """Explore the embedding neighborhood around the narrative."""
-        neighborhood = []
+        if len(self.anchor_index) == 0:
+            return []
         
-        for anchor_id, anchor_data in self.anchor_points.items():
-            distance = np.linalg.norm(embedding - anchor_data['embedding'])
-            if distance <= radius:
-                neighborhood.append((anchor_data['description'], distance))
-                
-        return sorted(neighborhood, key=lambda x: x[1])
+        # Euclidean distance between the raw embeddings, as radius has always measured
+        distances = self.anchor_index.distances(embedding)
+        
+        within = np.flatnonzero(distances <= radius)
+        within = within[np.argsort(distances[within], kind="stable")]
+        
+        ids = self.anchor_index.ids
+        return [(self.anchor_index.payload(ids[i])['description'], float(distances[i])) for i in within]
 
     def _generate_povm_coordinates(self, 
                                  embedding: np.ndarray,
@@ -590,11 +712,37 @@ Select the BEST combination for this transformation. Respond in JSON:
             conn.commit()
             conn.close()
             
+            self._index_pattern(pattern_id, source_embedding, source_text, attributes, metrics, transformation_type)
+            
             logger.info(f"Recorded transformation pattern: {pattern_id}")
             
         except Exception as e:
             logger.error(f"Failed to record transformation: {e}")
 
+    def _index_pattern(self, pattern_id: str, source_embedding: np.ndarray, source_text: str,
+                       attributes: Dict[str, str], metrics: Dict[str, float], transformation_type: str):
+        """Add a newly recorded pattern to the loaded index, if there is one yet."""
+        if self._pattern_indexes is None:
+            return  # Picked up when the index is first loaded
+        
+        source_embedding = np.asarray(source_embedding, dtype=np.float32)
+        pattern = TransformationPattern(
+            id=pattern_id,
+            source_embedding=source_embedding,
+            target_embedding=None,
+            attributes={key: attributes.get(key, '') for key in ("persona", "namespace", "style")},
+            success_metrics={"fidelity": metrics.get('fidelity', 0), "preservation": metrics.get('preservation_score', 0)},
+            narrative_snippet=source_text[:200],
+            transformation_type=transformation_type,
+            created_at=datetime.now()
+        )
+        
+        with self._pattern_index_lock:
+            dimension = len(source_embedding)
+            if dimension not in self._pattern_indexes:
+                self._pattern_indexes[dimension] = VectorIndex(dimension)
+            self._pattern_indexes[dimension].add(pattern_id, source_embedding, pattern)
+
     def get_attribute_insights(self, attribute_profile: AttributeProfile) -> Dict[str, Any]:
         """Get detailed insights about the selected attributes."""
         return {
@@ -615,21 +763,23 @@ Select the BEST combination for this transformation. Respond in JSON:
         """Suggest alternative attribute combinations."""
         alternatives = []
         
+        if len(self.anchor_index) == 0:
+            return alternatives
+        
         # Find semantically similar options
-        for anchor_id, anchor_data in self.anchor_points.items():
-            similarity = np.dot(profile.embedding_anchor, anchor_data['embedding']) / (
-                np.linalg.norm(profile.embedding_anchor) * np.linalg.norm(anchor_data['embedding'])
-            )
-            
-            if 0.7 <= similarity < 0.9:  # Similar but not identical
-                hints = anchor_data['hints']
-                if hints:
-                    alternatives.append({
-                        "persona": hints.get('persona', [profile.persona])[0],
-                        "namespace": hints.get('namespace', [profile.namespace])[0],
-                        "style": hints.get('style', [profile.style])[0],
-                        "reason": f"Alternative based on {anchor_id} similarity"
-                    })
+        similarities = self.anchor_index.scores(profile.embedding_anchor)
+        ids = self.anchor_index.ids
+        
+        for i in np.flatnonzero((similarities >= 0.7) & (similarities < 0.9)):  # Similar but not identical
+            anchor_id = ids[i]
+            hints = self.anchor_index.payload(anchor_id)['hints']
+            if hints:
+                alternatives.append({
+                    "persona": hints.get('persona', [profile.persona])[0],
+                    "namespace": hints.get('namespace', [profile.namespace])[0],
+                    "style": hints.get('style', [profile.style])[0],
+                    "reason": f"Alternative based on {anchor_id} similarity"
+                })
                     
         return alternatives[:3]  # Limit to top 3
 
@@ -816,21 +966,18 @@ Select the BEST combination for this transformation. Respond in JSON:
                                 if len(content) > 100 and self.embedder:  # Meaningful content
                                     # Create new semantic anchor
                                     anchor_embedding = self.embedder.encode(content[:200])
-                                    anchor_id = f"archive_learned_{anchor_type}_{len(self.anchor_points)}"
+                                    anchor_id = f"archive_learned_{anchor_type}_{len(self.anchor_index)}"
                                     
                                     # Analyze content to generate attribute hints
                                     hints = self._analyze_content_for_hints(content, anchor_type)
                                     
-                                    self.anchor_points[anchor_id] = {
-                                        'embedding': anchor_embedding,
-                                        'description': content[:100] + "...",
-                                        'hints': hints
-                                    }
+                                    self._add_anchor(anchor_id, anchor_embedding, content[:100] + "...", hints)
                                     
                                     # Store in database
                                     self._store_semantic_anchor(anchor_id, anchor_embedding, content[:100], hints)
                                     
-                    logger.info(f"Enhanced semantic anchors from archive: now have {len(self.anchor_points)} total anchors")
+                    self._save_anchor_index()
+                    logger.info(f"Enhanced semantic anchors from archive: now have {len(self.anchor_index)} total anchors")
                     
         except Exception as e:
             logger.warning(f"Archive anchor enhancement failed: {e}")
@@ -840,17 +987,11 @@ Select the BEST combination for this transformation. Respond in JSON:
         hints = {"persona": [], "namespace": [], "style": []}
         
         # Simple heuristic analysis (could be enhanced with LLM)
-        content_lower = content.lower()
-        
         # Persona hints based on content analysis
-        if "research" in content_lower or "study" in content_lower or "analysis" in content_lower:
-            hints["persona"].append("researcher")
-        if "story" in content_lower or "narrative" in content_lower or "character" in content_lower:
-            hints["persona"].append("storyteller")
-        if "wisdom" in content_lower or "philosophy" in content_lower or "meaning" in content_lower:
-            hints["persona"].append("philosopher")
-        if "guide" in content_lower or "how to" in content_lower or "steps" in content_lower:
-            hints["persona"].append("guide")
+        persona_matches = PERSONA_HINT_LEXICON.scan(content)
+        hints["persona"].extend(
+            persona for persona in PERSONA_HINT_LEXICON.category_terms if persona_matches.has(persona)
+        )
             
         # Namespace hints
         if content_type == "technical":
@@ -876,7 +1017,13 @@ Select the BEST combination for this transformation. Respond in JSON:
         return hints
 
     def _store_semantic_anchor(self, anchor_id: str, embedding: np.ndarray, description: str, hints: Dict):
-        """Store a new semantic anchor in the database."""
+        """
+        Store a new semantic anchor in the database.
+        
+        Callers add the anchor to the in-memory index as well; the index then
+        reflects the table version after this write unless another process
+        wrote anchors in between.
+        """
         try:
             conn = sqlite3.connect(self.rag_db_path)
             cursor = conn.cursor()
@@ -894,6 +1041,12 @@ Select the BEST combination for this transformation. Respond in JSON:
                 0.0  # Initial success rate
             ))
             
+            version = self._anchor_version(cursor)
+            if self._anchor_index_version is not None and version == self._anchor_index_version + 1:
+                self._anchor_index_version = version
+            else:
+                self._anchor_index_version = None
+            
             conn.commit()
             conn.close()
             logger.debug(f"Stored semantic anchor: {anchor_id}")
@@ -0,0 +1,206 @@
+"""
+Scalable Clustering for Embedding Collections
+=============================================
+
+NumPy-only k-means tooling for clustering large sets of passage embeddings
+in bounded memory:
+
+- Squared Euclidean distances computed as |x|² - 2x·c + |c|², one matrix
+  product per block of rows instead of one norm per (point, center) pair
+- k-means++ seeding on a random sample of the data
+- Mini-batch k-means (Sculley, 2010): each step reads one batch of rows, so
+  the input can be a memory-mapped array far larger than RAM
+- Silhouette estimated on a random sample instead of all O(n²) pairs
+
+Every pass over the full data works through row blocks of `block_size`.
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 8192
+
+def squared_distances(X: np.ndarray, centers: np.ndarray,
+                      center_sq_norms: Optional[np.ndarray] = None) -> np.ndarray:
+    """(n, k) squared Euclidean distances between rows of X and centers."""
+    X = np.asarray(X, dtype=np.float32)
+    if center_sq_norms is None:
+        center_sq_norms = np.einsum('ij,ij->i', centers, centers)
+    x_sq_norms = np.einsum('ij,ij->i', X, X)[:, None]
+    distances = x_sq_norms - 2.0 * (X @ centers.T) + center_sq_norms[None, :]
+    return np.maximum(distances, 0.0, out=distances)
+
+def assign_labels(X: np.ndarray, centers: np.ndarray,
+                  block_size: int = DEFAULT_BLOCK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """Nearest center and squared distance to it for every row, processed in blocks."""
+    centers = np.asarray(centers, dtype=np.float32)
+    center_sq_norms = np.einsum('ij,ij->i', centers, centers)
+    n = X.shape[0]
+    labels = np.empty(n, dtype=np.int64)
+    min_distances = np.empty(n, dtype=np.float32)
+
+    for start in range(0, n, block_size):
+        block = squared_distances(X[start:start + block_size], centers, center_sq_norms)
+        labels[start:start + block_size] = block.argmin(axis=1)
+        min_distances[start:start + block_size] = block[np.arange(len(block)), labels[start:start + block_size]]
+
+    return labels, min_distances
+
+def sample_rows(X: np.ndarray, size: int, rng: np.random.Generator) -> np.ndarray:
+    """A random sample of rows, read in ascending order (sequential for memory maps)."""
+    n = X.shape[0]
+    if size >= n:
+        return np.asarray(X, dtype=np.float32)
+    indices = np.sort(rng.choice(n, size, replace=False))
+    return np.asarray(X[indices], dtype=np.float32)
+
+def kmeans_plus_plus(X: np.ndarray, n_clusters: int, rng: np.random.Generator,
+                     n_local_trials: Optional[int] = None) -> np.ndarray:
+    """
+    k-means++ seeding: each new center is drawn with probability proportional
+    to its squared distance from the nearest existing center (greedy variant,
+    keeping the best of a few candidates per step).
+    """
+    n = X.shape[0]
+    n_local_trials = n_local_trials or 2 + int(np.log(n_clusters))
+    centers = np.empty((n_clusters, X.shape[1]), dtype=np.float32)
+
+    centers[0] = X[rng.integers(n)]
+    closest = squared_distances(X, centers[:1])[:, 0]
+    potential = closest.sum()
+
+    for c in range(1, n_clusters):
+        if potential <= 0:
+            # All points coincide with chosen centers; fill with random rows
+            centers[c:] = X[rng.choice(n, n_clusters - c)]
+            break
+        candidates = np.searchsorted(np.cumsum(closest), rng.random(n_local_trials) * potential)
+        candidates = np.minimum(candidates, n - 1)
+        candidate_distances = np.minimum(closest[:, None], squared_distances(X, X[candidates]))
+        candidate_potentials = candidate_distances.sum(axis=0)
+        best = candidate_potentials.argmin()
+
+        centers[c] = X[candidates[best]]
+        closest = candidate_distances[:, best]
+        potential = candidate_potentials[best]
+
+    return centers
+
+class MiniBatchKMeans:
+    """
+    Mini-batch k-means with k-means++ initialization.
+
+    fit() accepts any array supporting row indexing, including np.memmap;
+    only one batch (plus the seeding sample) is held in memory at a time.
+    """
+
+    def __init__(self, n_clusters: int, batch_size: int = 1024, max_iter: int = 100,
+                 init_size: Optional[int] = None, tol: float = 1e-4,
+                 max_no_improvement: int = 10, random_state: int = 42,
+                 block_size: int = DEFAULT_BLOCK_SIZE):
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.max_iter = max_iter
+        self.init_size = init_size or max(3 * batch_size, 3 * n_clusters)
+        self.tol = tol
+        self.max_no_improvement = max_no_improvement
+        self.random_state = random_state
+        self.block_size = block_size
+
+        self.cluster_centers_: Optional[np.ndarray] = None
+        self.labels_: Optional[np.ndarray] = None
+        self.inertia_: Optional[float] = None
+        self.n_iter_ = 0
+
+    def fit(self, X: np.ndarray) -> "MiniBatchKMeans":
+        rng = np.random.default_rng(self.random_state)
+        n = X.shape[0]
+        if n < self.n_clusters:
+            raise ValueError(f"n_samples={n} should be >= n_clusters={self.n_clusters}")
+
+        centers = kmeans_plus_plus(sample_rows(X, self.init_size, rng), self.n_clusters, rng)
+        counts = np.zeros(self.n_clusters, dtype=np.float64)
+
+        smoothed_inertia = None
+        no_improvement = 0
+        for iteration in range(self.max_iter):
+            batch = sample_rows(X, self.batch_size, rng)
+            labels, distances = assign_labels(batch, centers, self.block_size)
+
+            # Per-center learning rate 1/count: each center is the running mean of its points
+            previous = centers.copy()
+            batch_counts = np.bincount(labels, minlength=self.n_clusters)
+            batch_sums = np.zeros_like(centers)
+            np.add.at(batch_sums, labels, batch)
+            updated = batch_counts > 0
+            counts[updated] += batch_counts[updated]
+            rate = (batch_counts[updated] / counts[updated])[:, None].astype(np.float32)
+            centers[updated] += rate * (batch_sums[updated] / batch_counts[updated, None] - centers[updated])
+
+            self.n_iter_ = iteration + 1
+
+            # Stop when centers settle or the smoothed batch inertia stops improving
+            shift = np.sum((centers - previous) ** 2) / max(np.sum(previous ** 2), 1e-12)
+            batch_inertia = distances.mean()
+            if smoothed_inertia is None or batch_inertia < smoothed_inertia:
+                no_improvement = 0
+            else:
+                no_improvement += 1
+            smoothed_inertia = batch_inertia if smoothed_inertia is None else 0.7 * smoothed_inertia + 0.3 * batch_inertia
+
+            if shift <= self.tol or no_improvement >= self.max_no_improvement:
+                break
+
+        self.cluster_centers_ = centers
+        self.labels_, distances = assign_labels(X, centers, self.block_size)
+        self.inertia_ = float(distances.sum())
+        logger.debug(f"Mini-batch k-means: {self.n_iter_} iterations, inertia {self.inertia_:.3f}")
+        return self
+
+    def fit_predict(self, X: np.ndarray) -> np.ndarray:
+        return self.fit(X).labels_
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return assign_labels(X, self.cluster_centers_, self.block_size)[0]
+
+def sampled_silhouette_score(X: np.ndarray, labels: np.ndarray, sample_size: int = 2000,
+                             random_state: int = 42) -> float:
+    """
+    Mean silhouette coefficient estimated on a random sample of points.
+
+    Exact silhouette needs every pairwise distance; on a sample of s points it
+    needs s² (a few million for the default), independent of corpus size.
+    """
+    labels = np.asarray(labels)
+    rng = np.random.default_rng(random_state)
+    n = X.shape[0]
+
+    if n > sample_size:
+        indices = np.sort(rng.choice(n, sample_size, replace=False))
+        X, labels = np.asarray(X[indices], dtype=np.float32), labels[indices]
+    else:
+        X = np.asarray(X, dtype=np.float32)
+
+    unique, labels = np.unique(labels, return_inverse=True)
+    if len(unique) < 2 or len(unique) >= len(X):
+        return 0.0
+
+    distances = np.sqrt(squared_distances(X, X))
+    # Mean distance from each point to each cluster: (s, k)
+    one_hot = np.zeros((len(X), len(unique)), dtype=np.float32)
+    one_hot[np.arange(len(X)), labels] = 1.0
+    cluster_sizes = one_hot.sum(axis=0)
+    cluster_distance_sums = distances @ one_hot
+
+    own_size = cluster_sizes[labels]
+    own = cluster_distance_sums[np.arange(len(X)), labels] / np.maximum(own_size - 1, 1)
+    other = cluster_distance_sums / cluster_sizes[None, :]
+    other[np.arange(len(X)), labels] = np.inf
+    nearest_other = other.min(axis=1)
+
+    silhouettes = (nearest_other - own) / np.maximum(np.maximum(own, nearest_other), 1e-12)
+    silhouettes[own_size <= 1] = 0.0  # Singleton clusters score 0 by convention
+    return float(silhouettes.mean())
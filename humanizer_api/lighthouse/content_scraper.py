@@ -3,6 +3,7 @@ Intelligent Content Scraping System for Attribute Generation
 Scrapes high-quality public sources and processes them through the advanced attribute system.
 """
 
+import sys
 import asyncio
 import aiohttp
 import logging
@@ -17,6 +18,9 @@ import hashlib
 import time
 
 from advanced_attribute_system import AdvancedAttributeGenerator, AdvancedAttribute
+# The shared Lexicon matcher lives in src/, outside the lpe_core package
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+from lexicon import Lexicon
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -61,6 +65,12 @@ class QualityAnalyzer:
             "coherence_threshold": 0.3,
             "complexity_threshold": 0.2
         }
+        self.marker_lexicon = Lexicon({
+            "coherence": ["therefore", "however", "moreover", "furthermore", "consequently", 
+                          "in addition", "for example", "in contrast", "similarly", "meanwhile"],
+            "complexity": ["although", "nevertheless", "whereas", "notwithstanding", 
+                           "complexity", "nuanced", "sophisticated", "intricate"]
+        })
     
     def analyze_quality(self, content: str) -> Tuple[float, Dict[str, Any]]:
         """Analyze content quality and return score with detailed metrics."""
@@ -91,16 +101,12 @@ class QualityAnalyzer:
         else:
             structure_score = 1.0
         
-        # Coherence indicators
-        coherence_markers = ["therefore", "however", "moreover", "furthermore", "consequently", 
-                           "in addition", "for example", "in contrast", "similarly", "meanwhile"]
-        coherence_count = sum(1 for marker in coherence_markers if marker in content.lower())
+        # Coherence and complexity indicators (distinct markers present)
+        markers = self.marker_lexicon.scan(content)
+        coherence_count = len(markers.terms("coherence"))
         coherence_score = min(1.0, coherence_count / (sentence_count * 0.1)) if sentence_count > 0 else 0
         
-        # Complexity indicators
-        complexity_markers = ["although", "nevertheless", "whereas", "notwithstanding", 
-                            "complexity", "nuanced", "sophisticated", "intricate"]
-        complexity_count = sum(1 for marker in complexity_markers if marker in content.lower())
+        complexity_count = len(markers.terms("complexity"))
         complexity_score = min(1.0, complexity_count / (sentence_count * 0.05)) if sentence_count > 0 else 0
         
         # Repetition penalty
@@ -16,9 +16,12 @@ Key Features:
 - Result recombination with coherence checking
 """
 
+import os
 import re
+import time
 import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
@@ -325,130 +328,275 @@ class ContextAwareSplitter:
         
         return chunks
 
+# Shared worker pool for in-process chunk execution. The LPE transformer makes
+# blocking provider calls, so chunks run on threads rather than the event loop.
+_chunk_executor: Optional[ThreadPoolExecutor] = None
+
+def get_chunk_executor() -> ThreadPoolExecutor:
+    """Get the process-wide worker pool used for LPE chunk execution"""
+    global _chunk_executor
+    if _chunk_executor is None:
+        max_workers = int(os.getenv("LPE_CHUNK_WORKERS", "8"))
+        _chunk_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lpe-chunk")
+    return _chunk_executor
+
+class ChunkProgress:
+    """
+    Aggregates per-chunk status into a single progress stream for a narrative
+    """
+    
+    def __init__(self, chunks: List[TextChunk], transform_id: str = None, progress_callback=None):
+        self.transform_id = transform_id
+        self.progress_callback = progress_callback
+        self.total = len(chunks)
+        self.chunk_status = {chunk.id: "pending" for chunk in chunks}
+        self.chunk_durations: Dict[str, int] = {}
+    
+    def summary(self) -> Dict[str, Any]:
+        """Current counts by status plus the per-chunk breakdown"""
+        counts = {"pending": 0, "running": 0, "completed": 0, "failed": 0}
+        for status in self.chunk_status.values():
+            counts[status] += 1
+        return {
+            "total_chunks": self.total,
+            "completed_chunks": counts["completed"],
+            "failed_chunks": counts["failed"],
+            "running_chunks": counts["running"],
+            "pending_chunks": counts["pending"],
+            "progress": (counts["completed"] + counts["failed"]) / self.total if self.total else 1.0,
+            "chunks": dict(self.chunk_status)
+        }
+    
+    async def update(self, chunk: TextChunk, status: str, duration_ms: int = None, stage: str = None):
+        """Record a chunk status change and forward the aggregate to the callback"""
+        self.chunk_status[chunk.id] = status
+        if duration_ms is not None:
+            self.chunk_durations[chunk.id] = duration_ms
+        
+        if not (self.progress_callback and self.transform_id):
+            return
+        
+        data = self.summary()
+        data.update({"chunk_id": chunk.id, "chunk_index": chunk.chunk_index})
+        if stage is not None:
+            data["stage"] = stage
+        if duration_ms is not None:
+            data["duration_ms"] = duration_ms
+        try:
+            await self.progress_callback(self.transform_id, "chunk", status, data)
+        except Exception as e:
+            logger.warning(f"Chunk progress callback failed: {e}")
+
 class LPEChunkProcessor:
     """
     Processes text chunks through the LPE pipeline with context awareness
+    
+    Chunks are executed in-process: each one runs the projection pipeline
+    directly on the shared worker pool, so there is no HTTP round trip back
+    into the /transform endpoint. With pipeline_stages enabled the five LPE
+    stages are overlapped across chunks instead of running each chunk to
+    completion before the next one starts.
     """
     
-    def __init__(self, lpe_api_base: str = "http://localhost:8100"):
-        self.lpe_api_base = lpe_api_base
+    def __init__(self, projection_engine=None, executor: ThreadPoolExecutor = None,
+                 pipeline_stages: bool = True, stage_limits: Dict[str, int] = None):
+        self.projection_engine = projection_engine
+        self.executor = executor or get_chunk_executor()
+        self.pipeline_stages = pipeline_stages
+        self.stage_limits = stage_limits
         
     async def process_chunks_parallel(self, chunks: List[TextChunk], 
                                     persona: str, namespace: str, style: str,
-                                    max_parallel: int = 3) -> List[Dict[str, Any]]:
+                                    max_parallel: int = None,
+                                    transform_id: str = None,
+                                    progress_callback=None) -> List[Dict[str, Any]]:
         """
         Process multiple chunks through LPE pipeline in parallel
         
+        Workers pull from a shared queue, so a worker that finishes a short
+        chunk immediately picks up the next one instead of waiting for the
+        slowest chunk of a fixed batch.
+        
         Returns list of processed results that can be recombined
         """
+        progress = ChunkProgress(chunks, transform_id, progress_callback)
+        
         if len(chunks) == 1:
             # Single chunk - process directly
-            result = await self._process_single_chunk(chunks[0], persona, namespace, style)
+            result = await self._process_single_chunk(chunks[0], persona, namespace, style, progress)
             return [result]
         
-        logger.info(f"Processing {len(chunks)} chunks in parallel (max {max_parallel} concurrent)")
+        if self.pipeline_stages:
+            return await self._process_chunks_pipelined(chunks, persona, namespace, style, progress)
+        
+        max_parallel = max_parallel or getattr(self.executor, "_max_workers", 3)
+        worker_count = min(max_parallel, len(chunks))
+        logger.info(f"Processing {len(chunks)} chunks with {worker_count} workers")
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        for chunk in chunks:
+            queue.put_nowait(chunk)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+        positions = {chunk.id: i for i, chunk in enumerate(chunks)}
+        
+        async def worker():
+            while True:
+                try:
+                    chunk = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results[positions[chunk.id]] = await self._process_single_chunk(
+                    chunk, persona, namespace, style, progress
+                )
+        
+        await asyncio.gather(*(worker() for _ in range(worker_count)))
+        
+        return results
+    
+    async def _process_chunks_pipelined(self, chunks: List[TextChunk], persona: str, namespace: str,
+                                        style: str, progress: ChunkProgress) -> List[Dict[str, Any]]:
+        """Run all chunks through one stage-pipelined translation chain"""
+        from lpe_core.projection import TranslationChain
+        from lpe_core.stage_scheduler import StagePipelineScheduler
+        
+        chain = TranslationChain(persona, namespace, style, verbose=False)
+        scheduler = StagePipelineScheduler(chain, stage_limits=self.stage_limits, executor=self.executor)
+        
+        logger.info(f"Processing {len(chunks)} chunks with stage pipelining")
+        
+        start_times: Dict[int, float] = {}
+        
+        async def on_stage(index: int, step_type: str, status: str, data: Dict[str, Any]):
+            if index not in start_times:
+                start_times[index] = time.time()
+            await progress.update(chunks[index], "running", data.get("duration_ms"), stage=step_type)
+        
+        projections = await scheduler.run_all([self._prepare_content(c) for c in chunks], on_stage)
         
-        # Process chunks in batches to avoid overwhelming the system
         results = []
-        for i in range(0, len(chunks), max_parallel):
-            batch = chunks[i:i + max_parallel]
-            
-            # Create tasks for this batch
-            tasks = []
-            for chunk in batch:
-                task = self._process_single_chunk(chunk, persona, namespace, style)
-                tasks.append(task)
-            
-            # Execute batch in parallel
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Handle any exceptions
-            for j, result in enumerate(batch_results):
-                if isinstance(result, Exception):
-                    logger.error(f"Error processing chunk {batch[j].id}: {result}")
-                    # Create error result
-                    result = {
-                        "chunk_id": batch[j].id,
-                        "success": False,
-                        "error": str(result),
-                        "original_content": batch[j].content
-                    }
-                
-                results.append(result)
+        for index, (chunk, projection) in enumerate(zip(chunks, projections)):
+            duration_ms = int((time.time() - start_times.get(index, time.time())) * 1000)
+            if isinstance(projection, Exception):
+                logger.error(f"Failed to process chunk {chunk.id}: {projection}")
+                await progress.update(chunk, "failed", duration_ms)
+                results.append(self._error_result(chunk, projection))
+                continue
             
-            # Brief pause between batches
-            if i + max_parallel < len(chunks):
-                await asyncio.sleep(1)
+            if self.projection_engine is not None:
+                self.projection_engine.add_projection(projection)
+            await progress.update(chunk, "completed", duration_ms)
+            results.append(self._success_result(chunk, projection, duration_ms))
         
         return results
     
-    async def _process_single_chunk(self, chunk: TextChunk, persona: str, namespace: str, style: str) -> Dict[str, Any]:
+    def _prepare_content(self, chunk: TextChunk) -> str:
+        """Wrap chunk content with overlap context and position metadata"""
+        content_with_context = chunk.content
+        
+        if chunk.overlap_before:
+            content_with_context = f"[Previous context: {chunk.overlap_before}]\n\n{content_with_context}"
+        
+        if chunk.overlap_after:
+            content_with_context = f"{content_with_context}\n\n[Following context: {chunk.overlap_after}]"
+        
+        # Add chunk metadata to help LPE understand this is part of a larger narrative
+        if chunk.total_chunks > 1:
+            content_with_context = f"[This is part {chunk.chunk_index + 1} of {chunk.total_chunks} of a larger narrative]\n\n{content_with_context}"
+        
+        return content_with_context
+    
+    def _run_projection(self, content: str, persona: str, namespace: str, style: str):
+        """Run the 5-stage projection pipeline synchronously (worker thread)"""
+        if self.projection_engine is not None:
+            return self.projection_engine.create_projection(
+                narrative=content, persona=persona, namespace=namespace,
+                style=style, show_steps=False
+            )
+        
+        from lpe_core.projection import TranslationChain
+        chain = TranslationChain(persona, namespace, style, verbose=False)
+        return chain.run(content, show_steps=False)
+    
+    async def _process_single_chunk(self, chunk: TextChunk, persona: str, namespace: str, style: str,
+                                    progress: ChunkProgress = None) -> Dict[str, Any]:
         """Process a single chunk through the LPE pipeline"""
+        if progress:
+            await progress.update(chunk, "running")
+        
+        start_time = time.time()
         try:
-            import aiohttp
-            
-            # Prepare the content with context from overlaps
-            content_with_context = chunk.content
-            
-            if chunk.overlap_before:
-                content_with_context = f"[Previous context: {chunk.overlap_before}]\n\n{content_with_context}"
-            
-            if chunk.overlap_after:
-                content_with_context = f"{content_with_context}\n\n[Following context: {chunk.overlap_after}]"
+            loop = asyncio.get_running_loop()
+            projection = await loop.run_in_executor(
+                self.executor, self._run_projection,
+                self._prepare_content(chunk), persona, namespace, style
+            )
+            duration_ms = int((time.time() - start_time) * 1000)
             
-            # Add chunk metadata to help LPE understand this is part of a larger narrative
-            if chunk.total_chunks > 1:
-                content_with_context = f"[This is part {chunk.chunk_index + 1} of {chunk.total_chunks} of a larger narrative]\n\n{content_with_context}"
+            if progress:
+                await progress.update(chunk, "completed", duration_ms)
             
-            # Make request to LPE API
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "content": content_with_context,
-                    "persona": persona,
-                    "namespace": namespace,
-                    "style": style,
-                    "chunk_metadata": {
-                        "chunk_id": chunk.id,
-                        "chunk_index": chunk.chunk_index,
-                        "total_chunks": chunk.total_chunks,
-                        "word_count": chunk.word_count,
-                        "estimated_tokens": chunk.estimated_tokens
-                    }
-                }
-                
-                async with session.post(f"{self.lpe_api_base}/transform", json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return {
-                            "chunk_id": chunk.id,
-                            "chunk_index": chunk.chunk_index,
-                            "success": True,
-                            "result": result,
-                            "original_content": chunk.content,
-                            "processed_content": result.get("final_output", ""),
-                            "processing_steps": result.get("steps", [])
-                        }
-                    else:
-                        error_text = await response.text()
-                        raise Exception(f"LPE API error {response.status}: {error_text}")
+            return self._success_result(chunk, projection, duration_ms)
         
         except Exception as e:
             logger.error(f"Failed to process chunk {chunk.id}: {e}")
-            return {
-                "chunk_id": chunk.id,
-                "chunk_index": chunk.chunk_index,
-                "success": False,
-                "error": str(e),
-                "original_content": chunk.content
-            }
+            if progress:
+                await progress.update(chunk, "failed", int((time.time() - start_time) * 1000))
+            return self._error_result(chunk, e)
+    
+    def _success_result(self, chunk: TextChunk, projection, duration_ms: int) -> Dict[str, Any]:
+        """Build the chunk result record for a completed projection"""
+        return {
+            "chunk_id": chunk.id,
+            "chunk_index": chunk.chunk_index,
+            "success": True,
+            "result": projection.to_dict(),
+            "original_content": chunk.content,
+            "processed_content": projection.final_projection,
+            "processing_steps": [
+                {
+                    "name": step.name,
+                    "input": step.input_snapshot,
+                    "output": step.output_snapshot,
+                    "duration_ms": step.duration_ms,
+                    "metadata": step.metadata
+                }
+                for step in projection.steps
+            ],
+            "duration_ms": duration_ms
+        }
+    
+    def _error_result(self, chunk: TextChunk, error: Exception) -> Dict[str, Any]:
+        """Build the chunk result record for a failed chunk"""
+        return {
+            "chunk_id": chunk.id,
+            "chunk_index": chunk.chunk_index,
+            "success": False,
+            "error": str(error),
+            "original_content": chunk.content
+        }
 
 class ResultRecombiner:
     """
     Intelligently recombines processed chunk results into coherent narrative
+    
+    In "rolling" mode (the default when an LLM provider is available) only the
+    seams between adjacent chunks are examined. Each seam is scored by the
+    embedding similarity of the outgoing chunk's tail and the incoming chunk's
+    head, and only low-scoring seams get an LLM call to write a bridge. Seams
+    are handled independently and in parallel, so no prompt ever contains the
+    whole document. A seam that cannot be scored (embedding failure, empty
+    window) is left as is rather than smoothed.
     """
     
-    def __init__(self, llm_provider=None):
+    def __init__(self, llm_provider=None, mode: str = "rolling",
+                 seam_threshold: float = 0.6, seam_window: int = 80,
+                 executor: ThreadPoolExecutor = None):
         self.llm_provider = llm_provider
+        self.mode = mode
+        self.seam_threshold = seam_threshold  # Seams below this similarity get smoothed
+        self.seam_window = seam_window        # Words taken from each side of a seam
+        self.executor = executor
     
     async def recombine_results(self, chunk_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -496,10 +644,13 @@ class ResultRecombiner:
                 content = result.get("original_content", "")
                 processed_parts.append(f"[Original content - processing failed]: {content}")
         
-        combined_narrative = await self._intelligent_combine(processed_parts)
-        
-        # Analyze coherence
-        coherence_analysis = await self._analyze_coherence(processed_parts, combined_narrative)
+        if self.mode == "rolling" and self.llm_provider is not None:
+            combined_narrative, coherence_analysis = await self._rolling_combine(processed_parts)
+        else:
+            combined_narrative = await self._intelligent_combine(processed_parts)
+            
+            # Analyze coherence
+            coherence_analysis = await self._analyze_coherence(processed_parts, combined_narrative)
         
         return {
             "final_narrative": combined_narrative,
@@ -509,6 +660,114 @@ class ResultRecombiner:
             "coherence_analysis": coherence_analysis
         }
     
+    async def _rolling_combine(self, parts: List[str]) -> Tuple[str, Dict[str, Any]]:
+        """Combine parts by scoring every seam and smoothing only the weak ones"""
+        seam_count = len(parts) - 1
+        
+        similarities = await asyncio.gather(*(
+            self._score_seam(parts[i], parts[i + 1]) for i in range(seam_count)
+        ))
+        
+        async def no_bridge():
+            return None
+        
+        # Unscored seams are not smoothed: an unreachable embedder must not turn into an LLM call per seam
+        bridges = await asyncio.gather(*(
+            self._smooth_seam(parts[i], parts[i + 1])
+            if similarities[i] is not None and similarities[i] < self.seam_threshold else no_bridge()
+            for i in range(seam_count)
+        ))
+        
+        segments = []
+        for i, part in enumerate(parts):
+            segments.append(part)
+            if i < seam_count and bridges[i]:
+                segments.append(bridges[i])
+        combined = await self._intelligent_combine(segments)
+        
+        scored = [similarity for similarity in similarities if similarity is not None]
+        if scored or not seam_count:
+            coherence_score = sum(scored) / len(scored) if scored else 1.0
+            coherence_score = max(0.0, min(1.0, coherence_score))
+            if coherence_score >= 0.85:
+                transition_quality = "excellent"
+            elif coherence_score >= self.seam_threshold:
+                transition_quality = "good"
+            else:
+                transition_quality = "poor"
+            analysis = {
+                "parts_count": len(parts),
+                "total_length": len(combined),
+                "coherence_score": coherence_score,
+                "transition_quality": transition_quality,
+                "narrative_flow": "maintained" if transition_quality != "poor" else "fragmented"
+            }
+        else:
+            # No seam could be scored; fall back to the text heuristics
+            analysis = await self._analyze_coherence(parts, combined)
+        
+        analysis.update({
+            "mode": "rolling",
+            "seam_threshold": self.seam_threshold,
+            "seams_scored": len(scored),
+            "seams_smoothed": sum(1 for b in bridges if b),
+            "seams": [
+                {"index": i, "similarity": similarities[i], "smoothed": bool(bridges[i])}
+                for i in range(seam_count)
+            ]
+        })
+        
+        return combined, analysis
+    
+    def _seam_windows(self, left: str, right: str) -> Tuple[str, str]:
+        """Tail of the outgoing part and head of the incoming part"""
+        left_words = left.split()
+        right_words = right.split()
+        return " ".join(left_words[-self.seam_window:]), " ".join(right_words[:self.seam_window])
+    
+    async def _score_seam(self, left: str, right: str) -> Optional[float]:
+        """Embedding similarity across one seam, or None when it cannot be scored"""
+        tail, head = self._seam_windows(left, right)
+        if not tail or not head:
+            return None
+        
+        loop = asyncio.get_running_loop()
+        try:
+            tail_vec, head_vec = await asyncio.gather(
+                loop.run_in_executor(self.executor, self.llm_provider.embed, tail),
+                loop.run_in_executor(self.executor, self.llm_provider.embed, head)
+            )
+        except Exception as e:
+            logger.warning(f"Seam embedding failed: {e}")
+            return None
+        
+        if not tail_vec or not head_vec or len(tail_vec) != len(head_vec):
+            return None
+        return _cosine_similarity(tail_vec, head_vec)
+    
+    async def _smooth_seam(self, left: str, right: str) -> Optional[str]:
+        """Ask the LLM for a short bridge between two adjacent parts"""
+        tail, head = self._seam_windows(left, right)
+        system_prompt = ("You are editing a long narrative that was transformed in sections. "
+                         "Write a brief transition that joins two adjacent sections smoothly.")
+        prompt = (f"END OF PREVIOUS SECTION:\n{tail}\n\n"
+                  f"START OF NEXT SECTION:\n{head}\n\n"
+                  "Write one or two sentences that bridge these sections. "
+                  "Output only the bridging sentences.")
+        
+        loop = asyncio.get_running_loop()
+        try:
+            bridge = await loop.run_in_executor(self.executor, self.llm_provider.generate, prompt, system_prompt)
+        except Exception as e:
+            logger.warning(f"Seam smoothing failed: {e}")
+            return None
+        
+        bridge = (bridge or "").strip()
+        # Discard anything that isn't a short bridge (errors, rewrites of whole sections)
+        if not bridge or len(bridge.split()) > self.seam_window:
+            return None
+        return bridge
+    
     async def _intelligent_combine(self, parts: List[str]) -> str:
         """Intelligently combine narrative parts with transition handling"""
         if not parts:
@@ -556,7 +815,7 @@ class ResultRecombiner:
                 # Simple transition quality check
                 if any(word in end_part.lower() for word in ['however', 'meanwhile', 'therefore', 'thus']):
                     transitions.append("smooth")
-                elif end_part.endswith('.') and start_part[0].isupper():
+                elif end_part.endswith('.') and start_part[:1].isupper():
                     transitions.append("adequate")
                 else:
                     transitions.append("abrupt")
@@ -576,18 +835,43 @@ class ResultRecombiner:
         
         return analysis
 
+def _cosine_similarity(a: List[float], b: List[float]) -> float:
+    """Cosine similarity between two embedding vectors"""
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = sum(x * x for x in a) ** 0.5
+    norm_b = sum(y * y for y in b) ** 0.5
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
 # Main integration function
 async def process_large_narrative(content: str, persona: str, namespace: str, style: str,
-                                narrative_id: str = None, max_parallel: int = 3) -> Dict[str, Any]:
+                                narrative_id: str = None, max_parallel: int = None,
+                                projection_engine=None, progress_callback=None,
+                                llm_provider=None, recombine_mode: str = None) -> Dict[str, Any]:
     """
     Complete pipeline for processing large narratives through LPE
     
-    Handles splitting, parallel processing, and recombination
+    Handles splitting, parallel processing, and recombination. Progress is
+    reported per chunk through progress_callback, keyed by narrative_id.
+    
+    Recombination only calls the LLM (rolling seam smoothing) when an
+    llm_provider is passed or recombine_mode="rolling" is requested, in which
+    case the configured provider is used. Otherwise chunks are joined without
+    any LLM calls, as before.
     """
     # Initialize components
     splitter = ContextAwareSplitter(max_tokens_per_chunk=3000)
-    processor = LPEChunkProcessor()
-    recombiner = ResultRecombiner()
+    processor = LPEChunkProcessor(projection_engine=projection_engine)
+    if recombine_mode is None:
+        recombine_mode = "rolling" if llm_provider is not None else "concatenate"
+    if recombine_mode == "rolling" and llm_provider is None:
+        from lpe_core.llm_provider import get_llm_provider
+        llm_provider = get_llm_provider()
+    recombiner = ResultRecombiner(llm_provider=llm_provider, mode=recombine_mode,
+                                  executor=processor.executor)
     
     # Step 1: Split text if needed
     chunks = splitter.split_for_lpe(content, narrative_id)
@@ -596,7 +880,8 @@ async def process_large_narrative(content: str, persona: str, namespace: str, st
     
     # Step 2: Process chunks through LPE
     chunk_results = await processor.process_chunks_parallel(
-        chunks, persona, namespace, style, max_parallel
+        chunks, persona, namespace, style, max_parallel,
+        transform_id=narrative_id, progress_callback=progress_callback
     )
     
     # Step 3: Recombine results
@@ -16,7 +16,6 @@ Author: Enhanced for production use
 
 import json
 import os
-import shutil
 import hashlib
 from datetime import datetime
 from pathlib import Path
@@ -27,6 +26,8 @@ import mimetypes
 import sqlite3
 import uuid
 
+from media_store import MediaStore, IMAGE_EXTENSIONS, fingerprint_files, hash_file, probe_image_dimensions
+
 # Import our systems
 try:
     from embedding_config import get_embedding_manager, embed_text
@@ -36,6 +37,12 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+MEDIA_EXTENSIONS = IMAGE_EXTENSIONS | {
+    '.mp3', '.wav', '.ogg', '.m4a',  # audio
+    '.mp4', '.mov', '.avi', '.webm',  # video
+    '.pdf', '.doc', '.docx', '.txt'  # documents
+}
+
 @dataclass
 class MediaFile:
     """Represents a media file associated with conversations."""
@@ -310,6 +317,7 @@ class EnhancedConversationImporter:
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         
         self.db = ConversationDatabase()
+        self.media_store = MediaStore(self.storage_dir / "media")
         
         # Initialize embedding system
         self.embedding_manager = None
@@ -467,33 +475,32 @@ class EnhancedConversationImporter:
                                       messages: List[ConversationMessage]) -> Optional[str]:
         """
         Enhanced media handling with proper database integration.
+
+        Files are hashed (and images probed for dimensions) in parallel, then
+        stored once in the content-addressed media store and hard-linked into
+        the conversation's media directory.
         """
-        # Find all media files
-        media_files = []
-        media_extensions = {
-            '.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp',  # images
-            '.mp3', '.wav', '.ogg', '.m4a',  # audio
-            '.mp4', '.mov', '.avi', '.webm',  # video
-            '.pdf', '.doc', '.docx', '.txt'  # documents
-        }
-        
-        for ext in media_extensions:
-            media_files.extend(source_dir.glob(f'*{ext}'))
-            media_files.extend(source_dir.glob(f'*{ext.upper()}'))
+        # Find all media files in one directory listing
+        media_files = sorted(
+            path for path in source_dir.iterdir()
+            if path.suffix.lower() in MEDIA_EXTENSIONS and path.is_file()
+        )
         
         if not media_files:
             return None
         
         # Create organized media directory
-        media_base_dir = self.storage_dir / "media"
-        media_base_dir.mkdir(parents=True, exist_ok=True)
-        
-        conversation_media_dir = media_base_dir / conversation_id
+        conversation_media_dir = self.storage_dir / "media" / conversation_id
         conversation_media_dir.mkdir(parents=True, exist_ok=True)
         
         # Process each media file
-        for media_file in media_files:
-            self._process_media_file(media_file, conversation_media_dir, conversation_id, messages)
+        fingerprints = fingerprint_files(media_files)
+        for media_file, (checksum, dimensions, error) in zip(media_files, fingerprints):
+            if checksum is None:
+                logger.warning(f"Failed to read media file {media_file}: {error}")
+                continue
+            self._process_media_file(media_file, conversation_media_dir, conversation_id, messages,
+                                     checksum, dimensions)
         
         logger.info(f"Processed {len(media_files)} media files for conversation {conversation_id}")
         return str(conversation_media_dir)
@@ -502,40 +509,39 @@ class EnhancedConversationImporter:
                           source_file: Path, 
                           dest_dir: Path, 
                           conversation_id: str,
-                          messages: List[ConversationMessage]):
+                          messages: List[ConversationMessage],
+                          file_checksum: Optional[str] = None,
+                          dimensions: Optional[Dict[str, int]] = None):
         """
         Process and catalog a single media file.
         """
         try:
-            # Calculate file checksum
-            file_checksum = self._calculate_file_checksum(source_file)
+            if file_checksum is None:
+                file_checksum = hash_file(source_file)
+            media_type = self._determine_media_type(source_file.suffix.lower())
+            if dimensions is None and media_type == 'image':
+                dimensions = probe_image_dimensions(source_file)
             
-            # Check if file already exists (deduplication)
-            existing_media = self._find_existing_media_by_checksum(file_checksum)
-            if existing_media:
-                logger.info(f"Media file {source_file.name} already exists, linking...")
-                # Link to existing file instead of copying
-                stored_path = existing_media['stored_path']
-            else:
-                # Copy file to organized location
-                file_ext = source_file.suffix.lower()
-                media_type = self._determine_media_type(file_ext)
-                
-                # Create type-specific subdirectory
-                type_dir = dest_dir / media_type
-                type_dir.mkdir(exist_ok=True)
-                
-                # Generate unique filename if needed
-                dest_file = type_dir / source_file.name
-                counter = 1
-                while dest_file.exists():
-                    stem = source_file.stem
-                    dest_file = type_dir / f"{stem}_{counter}{source_file.suffix}"
-                    counter += 1
-                
-                shutil.copy2(source_file, dest_file)
-                stored_path = str(dest_file)
-                logger.info(f"Copied media file: {source_file.name} -> {dest_file}")
+            # Store the content once (deduplication), then link it into the conversation
+            object_path, created = self.media_store.add(source_file, file_checksum)
+            if not created:
+                logger.info(f"Media file {source_file.name} already stored, linking...")
+            
+            # Create type-specific subdirectory
+            type_dir = dest_dir / media_type
+            type_dir.mkdir(exist_ok=True)
+            
+            # Generate unique filename if needed; a link to the same object is reused
+            dest_file = type_dir / source_file.name
+            counter = 1
+            while dest_file.exists() and not os.path.samefile(dest_file, object_path):
+                stem = source_file.stem
+                dest_file = type_dir / f"{stem}_{counter}{source_file.suffix}"
+                counter += 1
+            
+            if not dest_file.exists():
+                self.media_store.link(file_checksum, dest_file)
+            stored_path = str(dest_file)
             
             # Determine MIME type
             mime_type, _ = mimetypes.guess_type(str(source_file))
@@ -550,7 +556,7 @@ class EnhancedConversationImporter:
                 id=str(uuid.uuid4()),
                 original_filename=source_file.name,
                 stored_path=stored_path,
-                media_type=self._determine_media_type(source_file.suffix.lower()),
+                media_type=media_type,
                 mime_type=mime_type,
                 file_size=source_file.stat().st_size,
                 checksum=file_checksum,
@@ -558,7 +564,8 @@ class EnhancedConversationImporter:
                 message_id=associated_message_id,
                 metadata={
                     'original_path': str(source_file),
-                    'dimensions': self._get_image_dimensions(source_file) if media_type == 'image' else None
+                    'object_path': str(object_path),
+                    'dimensions': dimensions
                 }
             )
             
@@ -572,18 +579,10 @@ class EnhancedConversationImporter:
         except Exception as e:
             logger.warning(f"Failed to process media file {source_file}: {e}")
     
-    def _calculate_file_checksum(self, file_path: Path) -> str:
-        """Calculate SHA256 checksum of a file."""
-        hash_sha256 = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
-    
     def _determine_media_type(self, file_extension: str) -> str:
         """Determine media type from file extension."""
         ext = file_extension.lower()
-        if ext in {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp'}:
+        if ext in IMAGE_EXTENSIONS:
             return 'image'
         elif ext in {'.mp3', '.wav', '.ogg', '.m4a'}:
             return 'audio'
@@ -592,37 +591,6 @@ class EnhancedConversationImporter:
         else:
             return 'document'
     
-    def _find_existing_media_by_checksum(self, checksum: str) -> Optional[Dict[str, Any]]:
-        """Find existing media file by checksum."""
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT stored_path, original_filename, media_type 
-            FROM media_files WHERE checksum = ? LIMIT 1
-        """, (checksum,))
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            return {
-                'stored_path': result[0],
-                'filename': result[1],
-                'media_type': result[2]
-            }
-        return None
-    
-    def _get_image_dimensions(self, image_path: Path) -> Optional[Dict[str, int]]:
-        """Get image dimensions if possible."""
-        try:
-            from PIL import Image
-            with Image.open(image_path) as img:
-                return {'width': img.width, 'height': img.height}
-        except ImportError:
-            logger.debug("PIL not available for image dimension extraction")
-        except Exception as e:
-            logger.debug(f"Could not get dimensions for {image_path}: {e}")
-        return None
-    
     def _associate_media_with_message(self, 
                                    media_file: Path, 
                                    messages: List[ConversationMessage]) -> Optional[str]:
@@ -844,6 +812,7 @@ class EnhancedConversationImporter:
         
         # Find all conversation.json files
         conversation_files = list(base_path.rglob('conversation.json'))
+        self.media_store.refresh()
         results['total_found'] = len(conversation_files)
         
         logger.info(f"Found {len(conversation_files)} conversation files in {base_directory}")
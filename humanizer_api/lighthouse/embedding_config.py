@@ -12,7 +12,7 @@ Author: Enhanced for multi-model embedding support
 import os
 import numpy as np
 import torch
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Union
 from dataclasses import dataclass
 import logging
 import json
@@ -237,6 +237,74 @@ class EmbeddingManager:
             logger.error(f"Embedding generation failed for {model_name}: {e}")
             raise
     
+    def embed_texts(self, texts: List[str], model_name: Optional[str] = None,
+                    batch_size: int = 32) -> np.ndarray:
+        """
+        Generate embeddings for many texts, one provider request per batch.
+        
+        Returns a (len(texts), dimensions) float32 matrix in input order.
+        """
+        
+        if model_name is None:
+            model_name = self.active_model
+        
+        if model_name not in self.models:
+            raise ValueError(f"Model {model_name} not configured")
+        
+        config = self.models[model_name]
+        if not texts:
+            return np.empty((0, config.dimensions or 0), dtype=np.float32)
+        
+        batches = []
+        try:
+            for start in range(0, len(texts), batch_size):
+                batch = texts[start:start + batch_size]
+                if config.provider == "ollama":
+                    embeddings = self._embed_ollama_batch(batch, config)
+                elif config.provider == "sentence_transformers":
+                    embeddings = self._embed_sentence_transformers(batch, config)
+                elif config.provider == "openai":
+                    embeddings = self._embed_openai_batch(batch, config)
+                else:
+                    raise ValueError(f"Unsupported provider: {config.provider}")
+                batches.append(np.atleast_2d(embeddings).astype(np.float32))
+            
+        except Exception as e:
+            logger.error(f"Batch embedding failed for {model_name}: {e}")
+            raise
+        
+        embeddings = np.vstack(batches)
+        if config.normalized:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms > 0, norms, 1.0)
+        return embeddings
+    
+    def _embed_ollama_batch(self, texts: List[str], config: EmbeddingModelConfig) -> np.ndarray:
+        """Embed a batch with Ollama's /api/embed, falling back to one request per text."""
+        try:
+            import httpx
+        except ImportError:
+            raise Exception("httpx required for Ollama embeddings")
+        
+        batch_endpoint = config.endpoint.replace("/api/embeddings", "/api/embed")
+        response = httpx.post(batch_endpoint, json={"model": config.name, "input": texts}, timeout=120.0)
+        if response.status_code == 200 and "embeddings" in response.json():
+            return np.array(response.json()["embeddings"], dtype=np.float32)
+        
+        # Older Ollama servers only have the single-prompt endpoint
+        logger.debug(f"Ollama batch endpoint unavailable ({response.status_code}); embedding one at a time")
+        return np.vstack([self._embed_ollama(text, config) for text in texts])
+    
+    def _embed_openai_batch(self, texts: List[str], config: EmbeddingModelConfig) -> np.ndarray:
+        """Embed a batch with a single OpenAI embeddings request."""
+        try:
+            import openai
+        except ImportError:
+            raise Exception("openai package required for OpenAI embeddings")
+        
+        response = openai.embeddings.create(model=config.name, input=texts)
+        return np.array([item.embedding for item in response.data], dtype=np.float32)
+    
     def _embed_ollama(self, text: str, config: EmbeddingModelConfig) -> np.ndarray:
         """Generate embedding using Ollama."""
         try:
@@ -265,8 +333,8 @@ class EmbeddingManager:
         except ImportError:
             raise Exception("httpx required for Ollama embeddings")
     
-    def _embed_sentence_transformers(self, text: str, config: EmbeddingModelConfig) -> np.ndarray:
-        """Generate embedding using sentence-transformers."""
+    def _embed_sentence_transformers(self, text: Union[str, List[str]], config: EmbeddingModelConfig) -> np.ndarray:
+        """Generate embedding (or a batch of embeddings) using sentence-transformers."""
         try:
             from sentence_transformers import SentenceTransformer
             
@@ -278,7 +346,7 @@ class EmbeddingManager:
             model = self._embedding_cache[cache_key]
             embedding = model.encode(text, convert_to_numpy=True)
             
-            if config.normalized:
+            if config.normalized and isinstance(text, str):
                 embedding = embedding / np.linalg.norm(embedding)
             
             return embedding.astype(np.float32)
@@ -484,6 +552,10 @@ def embed_text(text: str, model_name: Optional[str] = None) -> np.ndarray:
     """Convenience function for text embedding."""
     return get_embedding_manager().embed_text(text, model_name)
 
+def embed_texts(texts: List[str], model_name: Optional[str] = None) -> np.ndarray:
+    """Convenience function for batch text embedding."""
+    return get_embedding_manager().embed_texts(texts, model_name)
+
 def get_embedding_dimensions(model_name: Optional[str] = None) -> int:
     """Convenience function to get embedding dimensions."""
     return get_embedding_manager().get_dimensions(model_name)
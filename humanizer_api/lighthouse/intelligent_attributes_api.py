@@ -93,7 +93,7 @@ async def get_status():
             "available": True,
             "embedding_model_loaded": engine.embedder is not None,
             "quantum_integration": engine.quantum_engine is not None,
-            "semantic_anchors_count": len(engine.anchor_points),
+            "semantic_anchors_count": len(engine.anchor_index),
             "attribute_taxonomy_size": {
                 "personas": len(engine.attribute_taxonomy.get("persona", [])),
                 "namespaces": len(engine.attribute_taxonomy.get("namespace", [])),
@@ -332,7 +332,7 @@ async def get_attribute_taxonomy():
         return {
             "taxonomy": enhanced_taxonomy,
             "total_combinations": len(enhanced_taxonomy["persona"]) * len(enhanced_taxonomy["namespace"]) * len(enhanced_taxonomy["style"]),
-            "semantic_anchors": list(engine.anchor_points.keys()),
+            "semantic_anchors": engine.anchor_index.ids,
             "expansion_capability": "dynamic_via_llm_discovery"
         }
         
@@ -3,7 +3,6 @@
 
 import re
 import json
-import spacy
 import numpy as np
 from typing import Dict, List, Optional, Any, Set
 from dataclasses import dataclass, field, asdict
@@ -13,14 +12,15 @@ import statistics
 import logging
 from datetime import datetime
 
+from nlp_service import get_nlp_service
+
 logger = logging.getLogger(__name__)
 
-# Load spaCy model for linguistic analysis
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    logger.warning("spaCy model not available - linguistic analysis will be limited")
-    nlp = None
+PRONOUNS = ["i", "you", "he", "she", "it", "we", "they", "me", "him", "her", "us", "them"]
+MODALS = ["can", "could", "may", "might", "must", "shall", "should", "will", "would"]
+FORMAL_CONNECTIVES = {'therefore', 'furthermore', 'consequently', 'nevertheless'}
+INFORMAL_WORDS = {'gonna', 'wanna', 'yeah', 'ok', 'cool'}
+CONTRACTIONS = {"'ll", "'re", "'ve", "'d"}
 
 class AttributeType(Enum):
     NAMESPACE = "namespace"
@@ -181,10 +181,20 @@ class StylometricAnalyzer:
     @staticmethod
     def analyze_text(text: str) -> Dict[str, Any]:
         """Extract comprehensive stylometric features from text"""
-        if not nlp:
-            return {"error": "spaCy not available for analysis"}
+        return StylometricAnalyzer.analyze_texts([text])[0]
+    
+    @staticmethod
+    def analyze_texts(texts: List[str]) -> List[Dict[str, Any]]:
+        """Extract stylometric features from many texts in one batched pipeline run"""
+        service = get_nlp_service()
+        if not service.is_available():
+            return [{"error": "spaCy not available for analysis"} for _ in texts]
         
-        doc = nlp(text)
+        return [StylometricAnalyzer.analyze_doc(doc) for doc in service.pipe(texts, task="stylometry")]
+    
+    @staticmethod
+    def analyze_doc(doc) -> Dict[str, Any]:
+        """Extract stylometric features from a parsed Doc in a single token pass"""
         sentences = list(doc.sents)
         
         if not sentences:
@@ -195,36 +205,39 @@ class StylometricAnalyzer:
         avg_length = statistics.mean(sentence_lengths)
         length_std = statistics.stdev(sentence_lengths) if len(sentence_lengths) > 1 else 0
         
-        # Pronoun analysis
-        pronouns = ["i", "you", "he", "she", "it", "we", "they", "me", "him", "her", "us", "them"]
+        # Pronoun, modal, punctuation and formality counts
         pronoun_counts = defaultdict(int)
-        total_words = len([token for token in doc if token.is_alpha])
-        
-        for token in doc:
-            if token.text.lower() in pronouns:
-                pronoun_counts[token.text.lower()] += 1
-        
-        pronoun_freqs = {p: pronoun_counts[p] / total_words for p in pronouns}
-        
-        # Modal verb analysis
-        modals = ["can", "could", "may", "might", "must", "shall", "should", "will", "would"]
         modal_counts = defaultdict(int)
+        total_words = 0
+        punct_count = 0
+        formal_indicators = 0
+        informal_indicators = 0
         
         for token in doc:
-            if token.text.lower() in modals:
-                modal_counts[token.text.lower()] += 1
-        
-        modal_freqs = {m: modal_counts[m] / total_words for m in modals}
-        
-        # Punctuation density
-        punct_count = len([token for token in doc if token.is_punct])
+            lower = token.lower_
+            if token.is_alpha:
+                total_words += 1
+            if token.is_punct:
+                punct_count += 1
+            if lower in PRONOUNS:
+                pronoun_counts[lower] += 1
+            elif lower in MODALS:
+                modal_counts[lower] += 1
+            formal, informal = StylometricAnalyzer._formality_indicators(token)
+            formal_indicators += formal
+            informal_indicators += informal
+        
+        word_base = total_words or 1
+        pronoun_freqs = {p: pronoun_counts[p] / word_base for p in PRONOUNS}
+        modal_freqs = {m: modal_counts[m] / word_base for m in MODALS}
         punct_density = punct_count / total_words if total_words > 0 else 0
         
         # Rhetorical device detection (basic patterns)
-        devices = StylometricAnalyzer.detect_rhetorical_devices(text)
+        devices = StylometricAnalyzer.detect_rhetorical_devices(doc.text)
         
         # Formality scoring (basic heuristic)
-        formality = StylometricAnalyzer.calculate_formality(doc)
+        total_indicators = formal_indicators + informal_indicators
+        formality = formal_indicators / total_indicators if total_indicators else 0.5
         
         return {
             "avg_sentence_length": avg_length,
@@ -269,6 +282,29 @@ class StylometricAnalyzer:
         
         return list(set(devices))
     
+    @staticmethod
+    def _formality_indicators(token) -> tuple:
+        """Formal and informal indicator weights contributed by one token"""
+        formal = 0
+        informal = 0
+        lower = token.lower_
+        
+        # Formal indicators
+        if token.tag_ in ['VBZ', 'VBD', 'VBN']:  # More complex verb forms
+            formal += 1
+        if lower in FORMAL_CONNECTIVES:
+            formal += 2
+        if len(token.text) > 6 and token.is_alpha:  # Longer words
+            formal += 1
+            
+        # Informal indicators  
+        if lower in INFORMAL_WORDS:
+            informal += 2
+        if token.text in CONTRACTIONS:
+            informal += 1
+        
+        return formal, informal
+    
     @staticmethod
     def calculate_formality(doc) -> float:
         """Calculate formality score using linguistic features"""
@@ -276,19 +312,9 @@ class StylometricAnalyzer:
         informal_indicators = 0
         
         for token in doc:
-            # Formal indicators
-            if token.tag_ in ['VBZ', 'VBD', 'VBN']:  # More complex verb forms
-                formal_indicators += 1
-            if token.text.lower() in ['therefore', 'furthermore', 'consequently', 'nevertheless']:
-                formal_indicators += 2
-            if len(token.text) > 6 and token.is_alpha:  # Longer words
-                formal_indicators += 1
-                
-            # Informal indicators  
-            if token.text.lower() in ['gonna', 'wanna', 'yeah', 'ok', 'cool']:
-                informal_indicators += 2
-            if token.text in ["'ll", "'re", "'ve", "'d"]:  # Contractions
-                informal_indicators += 1
+            formal, informal = StylometricAnalyzer._formality_indicators(token)
+            formal_indicators += formal
+            informal_indicators += informal
         
         total_indicators = formal_indicators + informal_indicators
         if total_indicators == 0:
@@ -304,16 +330,19 @@ class TransformationInference:
                                     transformed_texts: List[str]) -> NamespaceManifest:
         """Reverse-engineer namespace manifest from transformation examples"""
         # Extract replaced entities
-        if not nlp:
+        service = get_nlp_service()
+        if not service.is_available():
             return NamespaceManifest(id="inferred", description="Basic inferred namespace")
         
         replaced_entities = []
         mapping_policy = MappingPolicy.SURROGATE_ON_EARTH_ENTITIES.value
         
-        for orig, trans in zip(original_texts, transformed_texts):
-            orig_doc = nlp(orig)
-            trans_doc = nlp(trans)
-            
+        # Parse originals and transformations together in one batched, NER-only run
+        pair_count = min(len(original_texts), len(transformed_texts))
+        docs = list(service.pipe(list(original_texts[:pair_count]) + list(transformed_texts[:pair_count]),
+                                 task="entities"))
+        
+        for orig_doc, trans_doc in zip(docs[:pair_count], docs[pair_count:]):
             # Extract entities that were replaced
             orig_entities = {ent.text for ent in orig_doc.ents if ent.label_ in ["PERSON", "GPE", "ORG"]}
             trans_entities = {ent.text for ent in trans_doc.ents if ent.label_ in ["PERSON", "GPE", "ORG"]}
@@ -345,8 +374,7 @@ class TransformationInference:
         combined_analysis = {}
         dict_keys = set()
         
-        for text in transformed_texts:
-            analysis = StylometricAnalyzer.analyze_text(text)
+        for analysis in StylometricAnalyzer.analyze_texts(transformed_texts):
             for key, value in analysis.items():
                 if isinstance(value, dict):
                     dict_keys.add(key)
@@ -389,7 +417,7 @@ class TransformationInference:
             return StyleManifest()
         
         # Analyze each text and average the results
-        all_analyses = [StylometricAnalyzer.analyze_text(text) for text in transformed_texts]
+        all_analyses = StylometricAnalyzer.analyze_texts(transformed_texts)
         
         # Extract numeric values and average them
         avg_sentence_length = statistics.mean([a.get('avg_sentence_length', 15) for a in all_analyses])
@@ -19,9 +19,10 @@ Author: Enhanced for comprehensive literary analysis
 """
 
 import asyncio
+import os
 import re
+import time
 import numpy as np
-import torch
 from typing import Dict, List, Tuple, Optional, Set, Any
 from dataclasses import dataclass
 from pathlib import Path
@@ -31,6 +32,24 @@ from datetime import datetime
 import logging
 from collections import defaultdict, Counter
 
+from clustering import MiniBatchKMeans, sampled_silhouette_score, squared_distances
+from passage_store import PassageEmbeddingStore
+
+# Cluster quality is estimated on this many sampled passages
+SILHOUETTE_SAMPLE_SIZE = 2000
+
+# Passages nearest each cluster center whose text is read for labeling
+CLUSTER_REPRESENTATIVES = 10
+
+# Legacy BLOB embeddings moved into the memory-mapped store per transaction
+EMBEDDING_MIGRATION_BATCH = 1000
+
+# Local mirror of raw Gutenberg texts, so reruns don't hit the network
+GUTENBERG_MIRROR_DIR = os.getenv("GUTENBERG_MIRROR_DIR", "./data/gutenberg_mirror")
+
+# Passages embedded per request to the embedding model
+EMBEDDING_BATCH_SIZE = 32
+
 # Try to import httpx, fall back to urllib
 try:
     import httpx
@@ -88,29 +107,137 @@ class SemanticCluster:
     attribute_category: str  # 'persona', 'namespace', 'style', or new category
     defining_characteristics: List[str]
 
+def passage_embedding_store(db_path: str) -> PassageEmbeddingStore:
+    """The embedding matrix file kept alongside a literature database."""
+    return PassageEmbeddingStore(Path(db_path).with_name("literature_embeddings"))
+
+def ensure_embedding_row_column(cursor: sqlite3.Cursor):
+    """Add literary_passages.embedding_row to databases created before the embedding store."""
+    try:
+        cursor.execute("ALTER TABLE literary_passages ADD COLUMN embedding_row INTEGER")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_passages_embedding_row ON literary_passages(embedding_row)")
+
+class PassageCatalog:
+    """
+    Passage metadata in embedding-row order, without passage text.
+
+    Index i describes row i of the embedding matrix returned alongside it;
+    text is read from the database only for the passages actually fetched.
+    """
+
+    def __init__(self, db_path: str, store: PassageEmbeddingStore, rows: List[tuple]):
+        self.db_path = db_path
+        self.store = store
+        self.passage_ids = [row[0] for row in rows]
+        self.authors = [row[1] for row in rows]
+        self.work_titles = [row[2] for row in rows]
+        self.gutenberg_ids = [row[3] for row in rows]
+        self.word_counts = [row[4] for row in rows]
+        self.embedding_rows = np.array([row[5] for row in rows], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.passage_ids)
+
+    def fetch(self, indices: np.ndarray) -> List[LiteraryPassage]:
+        """Full passages (text and embedding) for the given catalog indices."""
+        indices = [int(i) for i in indices]
+        ids = [self.passage_ids[i] for i in indices]
+        texts = {}
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for start in range(0, len(ids), 500):  # Stay under SQLite's bound-parameter limit
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                texts.update(conn.execute(
+                    f"SELECT passage_id, text FROM literary_passages WHERE passage_id IN ({placeholders})",
+                    chunk
+                ).fetchall())
+        finally:
+            conn.close()
+
+        matrix = self.store.matrix()
+        return [
+            LiteraryPassage(
+                text=texts.get(self.passage_ids[i], ""),
+                author=self.authors[i],
+                work_title=self.work_titles[i],
+                gutenberg_id=self.gutenberg_ids[i],
+                passage_id=self.passage_ids[i],
+                word_count=self.word_counts[i],
+                embedding=np.array(matrix[self.embedding_rows[i]])
+            )
+            for i in indices
+        ]
+
 class ProjectGutenbergMiner:
     """
     Fetches and processes texts from Project Gutenberg.
+    
+    Raw texts and metadata are cached in a local mirror directory, so reruns
+    (and runs without network access) read from disk. Network requests are
+    bounded by `max_concurrency` and spaced by `requests_per_second`.
     """
     
     BASE_URL = "https://www.gutenberg.org"
     
-    def __init__(self):
+    def __init__(self, mirror_dir: Optional[str] = None, max_concurrency: int = 4,
+                 requests_per_second: float = 2.0, offline: bool = False):
         self.session = None
+        self.mirror_dir = Path(mirror_dir or GUTENBERG_MIRROR_DIR)
+        self.mirror_dir.mkdir(parents=True, exist_ok=True)
+        self.offline = offline
+        self.min_request_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._throttle_lock = asyncio.Lock()
+        self._last_request = 0.0
+        self.mirror_hits = 0
+        self.network_fetches = 0
         
     async def __aenter__(self):
-        self.session = httpx.AsyncClient(timeout=30.0)
+        if not self.offline:
+            self.session = httpx.AsyncClient(timeout=30.0)
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.aclose()
     
+    def _mirror_path(self, gutenberg_id: str, suffix: str) -> Path:
+        return self.mirror_dir / f"{gutenberg_id}{suffix}"
+    
+    def _write_mirror(self, path: Path, content: str):
+        """Write a mirror file atomically so an interrupted run never leaves a partial text."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(content, encoding="utf-8")
+        os.replace(tmp_path, path)
+    
+    async def _get(self, url: str):
+        """GET under the concurrency bound, spacing request starts by the rate limit."""
+        if self.session is None:
+            raise RuntimeError(f"Offline: {url} is not in the local mirror")
+        async with self._semaphore:
+            async with self._throttle_lock:
+                wait = self._last_request + self.min_request_interval - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_request = time.monotonic()
+            return await self.session.get(url)
+    
+    async def fetch_work(self, gutenberg_id: str) -> Tuple[Dict[str, str], Optional[str]]:
+        """Metadata and cleaned text of a work, fetched concurrently."""
+        return await asyncio.gather(self.fetch_work_metadata(gutenberg_id), self.fetch_text(gutenberg_id))
+    
     async def fetch_work_metadata(self, gutenberg_id: str) -> Dict[str, str]:
         """Fetch metadata for a Project Gutenberg work."""
+        mirror_path = self._mirror_path(gutenberg_id, ".json")
+        if mirror_path.exists():
+            return json.loads(mirror_path.read_text(encoding="utf-8"))
+        
         try:
             url = f"{self.BASE_URL}/ebooks/{gutenberg_id}"
-            response = await self.session.get(url)
+            response = await self._get(url)
             
             if response.status_code == 200:
                 html = response.text
@@ -119,11 +246,13 @@ class ProjectGutenbergMiner:
                 title_match = re.search(r'<title>([^|]+)', html)
                 author_match = re.search(r'by\s+([^<\n]+)', html)
                 
-                return {
+                metadata = {
                     "title": title_match.group(1).strip() if title_match else f"Work {gutenberg_id}",
                     "author": author_match.group(1).strip() if author_match else "Unknown",
                     "gutenberg_id": gutenberg_id
                 }
+                self._write_mirror(mirror_path, json.dumps(metadata))
+                return metadata
             else:
                 return {"title": f"Work {gutenberg_id}", "author": "Unknown", "gutenberg_id": gutenberg_id}
                 
@@ -132,20 +261,29 @@ class ProjectGutenbergMiner:
             return {"title": f"Work {gutenberg_id}", "author": "Unknown", "gutenberg_id": gutenberg_id}
     
     async def fetch_text(self, gutenberg_id: str) -> Optional[str]:
-        """Fetch the full text of a Project Gutenberg work."""
+        """Fetch the full text of a Project Gutenberg work (from the mirror when cached)."""
+        mirror_path = self._mirror_path(gutenberg_id, ".txt")
+        if mirror_path.exists():
+            self.mirror_hits += 1
+            raw_text = mirror_path.read_text(encoding="utf-8")
+            return await asyncio.to_thread(self._clean_gutenberg_text, raw_text)
+        
         try:
             # Try different text formats
             for format_suffix in [".txt", "-0.txt", "-8.txt"]:
                 url = f"{self.BASE_URL}/files/{gutenberg_id}/{gutenberg_id}{format_suffix}"
                 
                 try:
-                    response = await self.session.get(url)
+                    response = await self._get(url)
                     if response.status_code == 200:
-                        text = response.text
+                        raw_text = response.text
+                        self.network_fetches += 1
+                        
+                        # Mirror the raw text; cleaning rules can change between runs
+                        self._write_mirror(mirror_path, raw_text)
                         
                         # Clean up the text (remove headers/footers)
-                        text = self._clean_gutenberg_text(text)
-                        return text
+                        return await asyncio.to_thread(self._clean_gutenberg_text, raw_text)
                         
                 except Exception:
                     continue
@@ -264,9 +402,11 @@ class LiterarySemanticAnalyzer:
                 gutenberg_id TEXT,
                 word_count INTEGER,
                 embedding BLOB,
-                created_at TIMESTAMP
+                created_at TIMESTAMP,
+                embedding_row INTEGER
             )
         """)
+        ensure_embedding_row_column(cursor)
         
         # Semantic clusters table
         cursor.execute("""
@@ -299,6 +439,7 @@ class LiterarySemanticAnalyzer:
         
         conn.commit()
         conn.close()
+        self.embedding_store = passage_embedding_store(self.db_path)
         logger.info("Literature analysis database initialized")
     
     def extract_meaningful_passages(self, text: str, metadata: Dict[str, str], 
@@ -357,36 +498,51 @@ class LiterarySemanticAnalyzer:
     
     async def analyze_passage_semantics(self, passage: LiteraryPassage) -> LiteraryPassage:
         """Analyze a passage using embeddings and quantum tools."""
+        return (await self.analyze_passages([passage]))[0]
+    
+    async def analyze_passages(self, passages: List[LiteraryPassage],
+                               batch_size: int = EMBEDDING_BATCH_SIZE) -> List[LiteraryPassage]:
+        """
+        Embed passages in batches and derive their meaning-states.
         
-        try:
-            # Generate embedding using centralized system
-            embedding = self._generate_embedding(passage.text)
-            if embedding is None:
-                return passage
-            passage.embedding = embedding
-            
-            # Generate quantum meaning-state if available
-            if self.quantum_engine and QUANTUM_AVAILABLE:
-                # Pass the full embedding - the quantum engine will handle dimension mapping
-                meaning_state = self.quantum_engine.text_to_meaning_state(
-                    passage.text,
-                    torch.tensor(embedding, dtype=torch.float32)  # Use full embedding
-                )
-                passage.meaning_state = meaning_state
+        Each batch is one embedding request and one mapper forward pass; the
+        blocking embedding call runs in a worker thread so fetches keep going.
+        """
+        for start in range(0, len(passages), batch_size):
+            batch = passages[start:start + batch_size]
+            try:
+                embeddings = await asyncio.to_thread(self._generate_embeddings, [p.text for p in batch])
+                if embeddings is None:
+                    continue
+                for passage, embedding in zip(batch, embeddings):
+                    passage.embedding = embedding
                 
-            return passage
-            
-        except Exception as e:
-            logger.warning(f"Failed to analyze passage semantics: {e}")
-            return passage
+                # Generate quantum meaning-states if available
+                if self.quantum_engine and QUANTUM_AVAILABLE:
+                    # Pass the full embeddings - the quantum engine will handle dimension mapping
+                    meaning_states = self.quantum_engine.texts_to_meaning_states(
+                        [p.text for p in batch], embeddings
+                    )
+                    for passage, meaning_state in zip(batch, meaning_states):
+                        passage.meaning_state = meaning_state
+                        
+            except Exception as e:
+                logger.warning(f"Failed to analyze passage semantics: {e}")
+        
+        return passages
     
     def _generate_embedding(self, text: str) -> Optional[np.ndarray]:
         """Generate embedding using the configured embedding system."""
+        embeddings = self._generate_embeddings([text])
+        return embeddings[0] if embeddings is not None else None
+    
+    def _generate_embeddings(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Generate a (len(texts), dim) embedding matrix with the configured embedding system."""
         try:
             if self.embedding_manager:
-                return self.embedding_manager.embed_text(text)
+                return self.embedding_manager.embed_texts(texts)
             elif self.embedder:
-                return self.embedder.encode(text)
+                return np.asarray(self.embedder.encode(texts, batch_size=EMBEDDING_BATCH_SIZE), dtype=np.float32)
             else:
                 logger.warning("No embedding system available")
                 return None
@@ -395,33 +551,59 @@ class LiterarySemanticAnalyzer:
             return None
     
     def store_passage(self, passage: LiteraryPassage):
-        """Store analyzed passage in database."""
+        """Store analyzed passage in database, its embedding in the memory-mapped store."""
+        self.store_passages([passage])
+    
+    def store_passages(self, passages: List[LiteraryPassage]):
+        """Store analyzed passages in one transaction, their embeddings in one store write."""
+        if not passages:
+            return
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            embedding_blob = passage.embedding.tobytes() if passage.embedding is not None else None
+            # A re-analyzed passage overwrites its own row so the store stays dense
+            existing_rows = {}
+            ids = [p.passage_id for p in passages]
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                cursor.execute(
+                    f"SELECT passage_id, embedding_row FROM literary_passages "
+                    f"WHERE passage_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                existing_rows.update(cursor.fetchall())
             
-            cursor.execute("""
+            embedding_rows = {p.passage_id: existing_rows.get(p.passage_id) for p in passages}
+            embedded = [p for p in passages if p.embedding is not None]
+            if embedded:
+                rows = self.embedding_store.write_many(
+                    np.vstack([p.embedding for p in embedded]),
+                    [embedding_rows[p.passage_id] for p in embedded]
+                )
+                embedding_rows.update(zip((p.passage_id for p in embedded), rows))
+            
+            now = datetime.now()
+            cursor.executemany("""
                 INSERT OR REPLACE INTO literary_passages 
-                (passage_id, text, author, work_title, gutenberg_id, word_count, embedding, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+                (passage_id, text, author, work_title, gutenberg_id, word_count, embedding, created_at, embedding_row)
+                VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?)
+            """, [(
                 passage.passage_id,
                 passage.text,
                 passage.author, 
                 passage.work_title,
                 passage.gutenberg_id,
                 passage.word_count,
-                embedding_blob,
-                datetime.now()
-            ))
+                now,
+                embedding_rows[passage.passage_id]
+            ) for passage in passages])
             
             conn.commit()
             conn.close()
             
         except Exception as e:
-            logger.error(f"Failed to store passage: {e}")
+            logger.error(f"Failed to store passages: {e}")
 
 class AttributeDiscoveryEngine:
     """
@@ -430,65 +612,98 @@ class AttributeDiscoveryEngine:
     
     def __init__(self, db_path: str = "./data/literature_attributes.db"):
         self.db_path = db_path
+        self.embedding_store = passage_embedding_store(db_path)
+        
+    def _migrate_blob_embeddings(self, conn: sqlite3.Connection):
+        """Move embeddings still stored as BLOBs into the memory-mapped store, a batch at a time."""
+        migrated = 0
+        while True:
+            rows = conn.execute("""
+                SELECT passage_id, embedding FROM literary_passages
+                WHERE embedding IS NOT NULL AND embedding_row IS NULL
+                LIMIT ?
+            """, (EMBEDDING_MIGRATION_BATCH,)).fetchall()
+            if not rows:
+                break
+            
+            updates = [
+                (self.embedding_store.write(np.frombuffer(blob, dtype=np.float32)), passage_id)
+                for passage_id, blob in rows
+            ]
+            conn.executemany(
+                "UPDATE literary_passages SET embedding_row = ?, embedding = NULL WHERE passage_id = ?",
+                updates
+            )
+            conn.commit()
+            migrated += len(updates)
+        
+        if migrated:
+            logger.info(f"Moved {migrated} passage embeddings into {self.embedding_store.matrix_path}")
         
-    def load_passage_embeddings(self) -> Tuple[List[LiteraryPassage], np.ndarray]:
-        """Load all passage embeddings from database."""
+    def load_passage_embeddings(self) -> Tuple[PassageCatalog, np.ndarray]:
+        """
+        Load passage metadata and a memory-mapped view of their embeddings.
+        
+        Row i of the returned matrix is the embedding of catalog entry i.
+        Passage text is not read here; see PassageCatalog.fetch.
+        """
         
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
+        ensure_embedding_row_column(cursor)
+        self._migrate_blob_embeddings(conn)
         
         cursor.execute("""
-            SELECT passage_id, text, author, work_title, gutenberg_id, word_count, embedding
+            SELECT passage_id, author, work_title, gutenberg_id, word_count, embedding_row
             FROM literary_passages 
-            WHERE embedding IS NOT NULL
+            WHERE embedding_row IS NOT NULL
+            ORDER BY embedding_row
         """)
-        
-        passages = []
-        embeddings = []
-        
-        for row in cursor.fetchall():
-            passage_id, text, author, work_title, gutenberg_id, word_count, embedding_blob = row
-            
-            embedding = np.frombuffer(embedding_blob, dtype=np.float32)
-            
-            passage = LiteraryPassage(
-                text=text,
-                author=author,
-                work_title=work_title,
-                gutenberg_id=gutenberg_id,
-                passage_id=passage_id,
-                word_count=word_count,
-                embedding=embedding
-            )
-            
-            passages.append(passage)
-            embeddings.append(embedding)
-        
+        catalog = PassageCatalog(self.db_path, self.embedding_store, cursor.fetchall())
         conn.close()
         
-        return passages, np.array(embeddings) if embeddings else np.array([])
+        matrix = self.embedding_store.matrix()
+        rows = catalog.embedding_rows
+        if len(rows) == 0:
+            return catalog, np.array([])
+        if rows[-1] == len(rows) - 1:
+            # Rows are exactly 0..n-1: the memory map itself, nothing copied
+            return catalog, matrix[:len(rows)]
+        
+        # Orphaned rows (e.g. a failed insert after the vector was written) leave gaps
+        logger.debug(f"Embedding store has {len(matrix) - len(rows)} unreferenced rows; gathering in memory")
+        return catalog, np.asarray(matrix[rows])
     
     def discover_semantic_clusters(self, 
-                                 passages: List[LiteraryPassage],
+                                 passages: PassageCatalog,
                                  embeddings: np.ndarray,
                                  n_clusters: int = 50) -> List[SemanticCluster]:
-        """Discover semantic clusters in the embedding space."""
+        """
+        Discover semantic clusters in the embedding space.
+        
+        Clustering streams over the (possibly memory-mapped) embeddings; text is
+        fetched only for the passages nearest each cluster center.
+        """
         
         if len(embeddings) == 0:
             return []
             
         # Try scikit-learn first, fall back to simple clustering
         try:
-            from sklearn.cluster import KMeans
+            from sklearn.cluster import MiniBatchKMeans as SklearnMiniBatchKMeans
             from sklearn.metrics import silhouette_score
             
-            # Perform clustering
+            # Perform clustering (mini-batch, so large corpora stay in bounded memory)
             actual_clusters = min(n_clusters, len(passages))
-            kmeans = KMeans(n_clusters=actual_clusters, random_state=42)
+            kmeans = SklearnMiniBatchKMeans(n_clusters=actual_clusters, init="k-means++",
+                                            batch_size=1024, n_init=3, random_state=42)
             cluster_labels = kmeans.fit_predict(embeddings)
             
-            # Calculate silhouette score for quality assessment
-            silhouette_avg = silhouette_score(embeddings, cluster_labels)
+            # Calculate silhouette score for quality assessment on a sample of passages
+            silhouette_avg = silhouette_score(
+                embeddings, cluster_labels,
+                sample_size=min(SILHOUETTE_SAMPLE_SIZE, len(embeddings)), random_state=42
+            )
             logger.info(f"Clustering silhouette score: {silhouette_avg:.3f}")
             
             cluster_centers = kmeans.cluster_centers_
@@ -506,19 +721,26 @@ class AttributeDiscoveryEngine:
         clusters = []
         actual_clusters = len(cluster_centers)
         
+        # Group passage indices by cluster in one pass (ascending within each cluster)
+        order = np.argsort(cluster_labels, kind="stable")
+        boundaries = np.searchsorted(cluster_labels[order], np.arange(actual_clusters + 1))
+        
         for cluster_id in range(actual_clusters):
-            cluster_mask = cluster_labels == cluster_id
-            if not np.any(cluster_mask):
-                continue
-                
-            cluster_passages = [p for i, p in enumerate(passages) if cluster_mask[i]]
-            if not cluster_passages:
+            members = order[boundaries[cluster_id]:boundaries[cluster_id + 1]]
+            if len(members) == 0:
                 continue
                 
             cluster_center = cluster_centers[cluster_id]
             
+            # Read text only for the members closest to the center
+            distances = squared_distances(embeddings[members], np.atleast_2d(cluster_center).astype(np.float32))[:, 0]
+            nearest = members[np.argsort(distances, kind="stable")[:CLUSTER_REPRESENTATIVES]]
+            cluster_passages = passages.fetch(nearest)
+            
             # Generate semantic label for cluster
-            semantic_label = self._generate_cluster_label(cluster_passages)
+            semantic_label = self._generate_cluster_label(
+                cluster_passages, authors=[passages.authors[i] for i in members]
+            )
             
             # Determine attribute category
             attribute_category = self._classify_attribute_category(cluster_passages, semantic_label)
@@ -541,56 +763,33 @@ class AttributeDiscoveryEngine:
         return clusters
     
     def _simple_clustering(self, embeddings: np.ndarray, n_clusters: int) -> Tuple[np.ndarray, np.ndarray, float]:
-        """Simple clustering fallback when scikit-learn is not available."""
+        """Mini-batch k-means fallback when scikit-learn is not available."""
         
         n_samples, n_features = embeddings.shape
         actual_clusters = min(n_clusters, max(2, n_samples // 3))  # Better ratio: 3 samples per cluster minimum
         
         if actual_clusters <= 1 or n_samples < 6:  # Need at least 6 samples for meaningful clustering
             # Not enough data for clustering
-            return np.zeros(n_samples), embeddings.mean(axis=0).reshape(1, -1), 0.5
-        
-        # Initialize cluster centers randomly
-        np.random.seed(42)
-        center_indices = np.random.choice(n_samples, actual_clusters, replace=False)
-        cluster_centers = embeddings[center_indices].copy()
-        
-        # Simple k-means-like iteration
-        for iteration in range(20):  # Max 20 iterations
-            # Assign points to nearest center
-            distances = np.array([
-                [np.linalg.norm(embedding - center) for center in cluster_centers]
-                for embedding in embeddings
-            ])
-            cluster_labels = np.argmin(distances, axis=1)
-            
-            # Update centers
-            new_centers = []
-            for i in range(actual_clusters):
-                cluster_points = embeddings[cluster_labels == i]
-                if len(cluster_points) > 0:
-                    new_centers.append(cluster_points.mean(axis=0))
-                else:
-                    new_centers.append(cluster_centers[i])  # Keep old center if no points
-            
-            cluster_centers = np.array(new_centers)
-        
-        # Calculate simple quality metric (inverse of average distance to centers)
-        total_distance = 0
-        for i, embedding in enumerate(embeddings):
-            center = cluster_centers[cluster_labels[i]]
-            total_distance += np.linalg.norm(embedding - center)
-        
-        avg_distance = total_distance / n_samples
-        quality_score = 1.0 / (1.0 + avg_distance)  # Normalize to [0,1]
-        
-        return cluster_labels, cluster_centers, quality_score
-    
-    def _generate_cluster_label(self, passages: List[LiteraryPassage]) -> str:
-        """Generate a semantic label for a cluster based on its passages."""
+            return np.zeros(n_samples, dtype=np.int64), embeddings.mean(axis=0).reshape(1, -1), 0.5
+        
+        kmeans = MiniBatchKMeans(n_clusters=actual_clusters, random_state=42)
+        cluster_labels = kmeans.fit_predict(embeddings)
+        
+        quality_score = sampled_silhouette_score(embeddings, cluster_labels, sample_size=SILHOUETTE_SAMPLE_SIZE)
+        logger.info(f"Clustering silhouette score (sampled): {quality_score:.3f}")
+        
+        return cluster_labels, kmeans.cluster_centers_, quality_score
+    
+    def _generate_cluster_label(self, passages: List[LiteraryPassage],
+                                authors: Optional[List[str]] = None) -> str:
+        """
+        Generate a semantic label for a cluster based on its passages.
+        
+        `authors` covers every cluster member when only representatives are passed.
+        """
         
         # Extract common themes from authors and works
-        authors = [p.author for p in passages]
+        authors = authors if authors is not None else [p.author for p in passages]
         works = [p.work_title for p in passages]
         
         # Get the most common author for this cluster
@@ -756,13 +955,51 @@ class AttributeDiscoveryEngine:
         
         logger.info(f"Stored {len(clusters)} discovered attribute clusters")
 
+class PipelineStats:
+    """Busy time and item counts per mining stage, reported as throughput."""
+    
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.items: Dict[str, int] = defaultdict(int)
+        self.started = time.monotonic()
+    
+    def record(self, stage: str, seconds: float, items: int):
+        self.seconds[stage] += seconds
+        self.items[stage] += items
+    
+    def report(self) -> Dict[str, Any]:
+        """
+        Per-stage items, busy seconds and items per busy second.
+        
+        Fetch busy time is summed across concurrent requests, so it can exceed
+        the wall-clock time of the whole run.
+        """
+        stages = {
+            stage: {
+                "items": self.items[stage],
+                "seconds": round(self.seconds[stage], 3),
+                "items_per_second": round(self.items[stage] / self.seconds[stage], 2) if self.seconds[stage] > 0 else None
+            }
+            for stage in self.seconds
+        }
+        wall_seconds = time.monotonic() - self.started
+        busiest = max(self.seconds, key=self.seconds.get) if self.seconds else None
+        return {"wall_seconds": round(wall_seconds, 3), "stages": stages, "bottleneck": busiest}
+
 # Main orchestration function
 async def mine_literature_for_attributes(gutenberg_ids: List[str],
-                                       max_passages_per_work: int = 50) -> Dict[str, Any]:
+                                       max_passages_per_work: int = 50,
+                                       max_concurrent_fetches: int = 4,
+                                       embedding_batch_size: int = EMBEDDING_BATCH_SIZE,
+                                       offline: bool = False) -> Dict[str, Any]:
     """
     Main function to mine Project Gutenberg literature for comprehensive attributes.
     
-    Returns statistics and discovered attributes.
+    Works flow through a staged pipeline: texts are fetched concurrently (or read
+    from the local mirror) while earlier works are split into passages, embedded
+    in batches and written in one transaction per work.
+    
+    Returns statistics, per-stage throughput and discovered attributes.
     """
     
     logger.info(f"Starting literature mining for {len(gutenberg_ids)} works")
@@ -787,35 +1024,58 @@ async def mine_literature_for_attributes(gutenberg_ids: List[str],
         
     analyzer = LiterarySemanticAnalyzer(quantum_engine=quantum_engine, embedding_model="nomic-embed-text")
     discovery_engine = AttributeDiscoveryEngine()
+    stats = PipelineStats()
     
     total_passages = 0
     processed_works = 0
     
+    # Fetched works wait here for analysis; the bound keeps fetches from running far ahead
+    fetched: asyncio.Queue = asyncio.Queue(maxsize=2 * max_concurrent_fetches)
+    
+    async def fetch_one(miner: ProjectGutenbergMiner, gutenberg_id: str):
+        started = time.monotonic()
+        try:
+            metadata, text = await miner.fetch_work(gutenberg_id)
+        except Exception as e:
+            logger.error(f"Error fetching work {gutenberg_id}: {e}")
+            metadata, text = None, None
+        stats.record("fetch", time.monotonic() - started, 1)
+        await fetched.put((gutenberg_id, metadata, text))
+    
+    async def fetch_all(miner: ProjectGutenbergMiner):
+        await asyncio.gather(*(fetch_one(miner, gutenberg_id) for gutenberg_id in gutenberg_ids))
+    
     # Mine literature
-    async with ProjectGutenbergMiner() as miner:
-        for gutenberg_id in gutenberg_ids:
+    async with ProjectGutenbergMiner(max_concurrency=max_concurrent_fetches, offline=offline) as miner:
+        fetch_task = asyncio.create_task(fetch_all(miner))
+        
+        for _ in range(len(gutenberg_ids)):
+            gutenberg_id, metadata, text = await fetched.get()
             try:
-                logger.info(f"Processing Gutenberg work {gutenberg_id}")
-                
-                # Fetch metadata and text
-                metadata = await miner.fetch_work_metadata(gutenberg_id)
-                text = await miner.fetch_text(gutenberg_id)
-                
                 if not text:
                     logger.warning(f"Could not fetch text for {gutenberg_id}")
                     continue
                 
+                logger.info(f"Processing Gutenberg work {gutenberg_id}")
+                
                 # Extract passages
-                passages = analyzer.extract_meaningful_passages(text, metadata)
+                started = time.monotonic()
+                passages = await asyncio.to_thread(analyzer.extract_meaningful_passages, text, metadata)
                 logger.info(f"Extracted {len(passages)} passages from {metadata['title']}")
                 
                 # Limit passages per work
                 passages = passages[:max_passages_per_work]
+                stats.record("extract", time.monotonic() - started, len(passages))
+                
+                # Analyze semantics in batches
+                started = time.monotonic()
+                await analyzer.analyze_passages(passages, batch_size=embedding_batch_size)
+                stats.record("embed", time.monotonic() - started, len(passages))
                 
-                # Analyze semantics
-                for passage in passages:
-                    analyzed_passage = await analyzer.analyze_passage_semantics(passage)
-                    analyzer.store_passage(analyzed_passage)
+                # One transaction per work
+                started = time.monotonic()
+                await asyncio.to_thread(analyzer.store_passages, passages)
+                stats.record("store", time.monotonic() - started, len(passages))
                     
                 total_passages += len(passages)
                 processed_works += 1
@@ -825,6 +1085,13 @@ async def mine_literature_for_attributes(gutenberg_ids: List[str],
             except Exception as e:
                 logger.error(f"Error processing work {gutenberg_id}: {e}")
                 continue
+        
+        await fetch_task
+        mirror_hits = miner.mirror_hits
+    
+    throughput = stats.report()
+    throughput["mirror_hits"] = mirror_hits
+    logger.info(f"Mining throughput: {throughput}")
     
     # Discover attribute clusters
     logger.info("Discovering semantic clusters...")
@@ -847,10 +1114,11 @@ async def mine_literature_for_attributes(gutenberg_ids: List[str],
             "discovered_attributes_by_category": {
                 category: [c.semantic_label for c in clusters if c.attribute_category == category]
                 for category in category_counts.keys()
-            }
+            },
+            "pipeline_throughput": throughput
         }
     else:
-        return {"error": "No passages with embeddings found"}
+        return {"error": "No passages with embeddings found", "pipeline_throughput": throughput}
 
 # Predefined list of high-quality Project Gutenberg works for attribute mining
 CLASSIC_LITERATURE_IDS = [
@@ -0,0 +1,160 @@
+"""
+Batched Metrics for Meaning-State Collections
+=============================================
+
+Purity, von Neumann entropy and fidelity for many density matrices at once.
+
+States are stacked into one (N, d, d) tensor and decomposed with a single
+batched eigh. The eigenvalues give purity Tr(ρ²) = Σλ² and entropy
+S(ρ) = -Σλ log λ, and the eigenvectors give √ρ, which fidelity reuses:
+
+    F(ρ, σ) = Tr √(√ρ σ √ρ) = Σ √eig(√ρ σ √ρ)
+
+so comparing a narrative against hundreds of archive neighbors, or building a
+pairwise fidelity matrix for clustering, is a few batched decompositions
+instead of a Python loop of small ones.
+"""
+
+import torch
+from typing import List, Optional, Sequence, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+EIGENVALUE_FLOOR = 1e-12
+
+# Bound on the number of (d, d) products materialized at once by pairwise_fidelity
+PAIRWISE_BLOCK_ELEMENTS = 2 ** 22
+
+def stack_density_matrices(states: Sequence) -> torch.Tensor:
+    """Stack MeaningStates or (d, d) tensors into one (N, d, d) tensor."""
+    matrices = [getattr(state, "density_matrix", state) for state in states]
+    return torch.stack(matrices)
+
+def _symmetrize(matrices: torch.Tensor) -> torch.Tensor:
+    """Remove round-off asymmetry so eigh sees a Hermitian input."""
+    return (matrices + matrices.mH) / 2
+
+class MeaningStateBatch:
+    """
+    A stack of density matrices with a shared, lazily computed eigendecomposition.
+
+    Every metric derived from the spectrum (purity, entropy, √ρ, fidelity)
+    reuses the same batched eigh, so each state is decomposed at most once.
+    """
+
+    def __init__(self, states: Union[torch.Tensor, Sequence]):
+        """
+        Args:
+            states: (N, d, d) or (d, d) tensor, or a sequence of MeaningStates / (d, d) tensors
+        """
+        density = states if isinstance(states, torch.Tensor) else stack_density_matrices(states)
+        if density.dim() == 2:
+            density = density.unsqueeze(0)
+        self.density = density
+        self._eigenvalues: Optional[torch.Tensor] = None
+        self._eigenvectors: Optional[torch.Tensor] = None
+        self._sqrt: Optional[torch.Tensor] = None
+
+    def __len__(self) -> int:
+        return self.density.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        return self.density.shape[-1]
+
+    def _decompose(self):
+        if self._eigenvalues is None:
+            eigenvalues, eigenvectors = torch.linalg.eigh(_symmetrize(self.density))
+            self._eigenvalues = torch.clamp(eigenvalues.real, min=0)
+            self._eigenvectors = eigenvectors
+
+    @property
+    def eigenvalues(self) -> torch.Tensor:
+        """(N, d) non-negative eigenvalues, ascending."""
+        self._decompose()
+        return self._eigenvalues
+
+    @property
+    def sqrt(self) -> torch.Tensor:
+        """(N, d, d) matrix square roots √ρ."""
+        if self._sqrt is None:
+            self._decompose()
+            V = self._eigenvectors
+            root = torch.diag_embed(torch.sqrt(self._eigenvalues)).to(V.dtype)
+            self._sqrt = V @ root @ V.mH
+        return self._sqrt
+
+    def purity(self) -> torch.Tensor:
+        """(N,) purities Tr(ρ²)."""
+        return (self.eigenvalues ** 2).sum(dim=-1)
+
+    def von_neumann_entropy(self) -> torch.Tensor:
+        """(N,) entropies S(ρ) = -Tr(ρ log ρ)."""
+        eigenvalues = self.eigenvalues
+        # Numerical zeros contribute 0·log 0 = 0
+        safe = torch.where(eigenvalues > EIGENVALUE_FLOOR, eigenvalues, torch.ones_like(eigenvalues))
+        return -(eigenvalues * torch.log(safe)).sum(dim=-1)
+
+    def fidelity(self, other: "MeaningStateBatch") -> torch.Tensor:
+        """
+        (N,) elementwise fidelities F(ρ_i, σ_i) against a batch of the same size.
+
+        A single-state batch is broadcast against the other side.
+        """
+        return _fidelity_from_sqrt(self.sqrt, other.density)
+
+    def fidelity_to(self, state) -> torch.Tensor:
+        """(N,) fidelities of every state in the batch against one reference state."""
+        reference = MeaningStateBatch(getattr(state, "density_matrix", state))
+        return reference.fidelity(self)
+
+    def pairwise_fidelity(self, other: Optional["MeaningStateBatch"] = None) -> torch.Tensor:
+        """
+        (N, M) fidelity matrix F(ρ_i, σ_j); against itself when other is None.
+
+        Rows are processed in blocks so memory stays bounded for large corpora.
+        """
+        symmetric = other is None
+        other = self if symmetric else other
+        n, m, d = len(self), len(other), self.dimension
+
+        rows_per_block = max(1, PAIRWISE_BLOCK_ELEMENTS // max(1, m * d * d))
+        blocks = []
+        for start in range(0, n, rows_per_block):
+            sqrt_rho = self.sqrt[start:start + rows_per_block].unsqueeze(1)  # (b, 1, d, d)
+            blocks.append(_fidelity_from_sqrt(sqrt_rho, other.density.unsqueeze(0)))
+        matrix = torch.cat(blocks) if blocks else torch.zeros(0, m)
+
+        if symmetric:
+            # Fidelity is symmetric; average away round-off and pin the diagonal
+            matrix = (matrix + matrix.T) / 2
+            matrix.fill_diagonal_(1.0)
+        return matrix
+
+    def summary(self) -> dict:
+        """Purity and entropy for every state, as plain lists for JSON responses."""
+        return {
+            "purity": self.purity().tolist(),
+            "entropy": self.von_neumann_entropy().tolist()
+        }
+
+def _fidelity_from_sqrt(sqrt_rho: torch.Tensor, sigma: torch.Tensor) -> torch.Tensor:
+    """Σ √eig(√ρ σ √ρ) over broadcastable batches, clamped to [0, 1]."""
+    inner = _symmetrize(sqrt_rho @ sigma.to(sqrt_rho.dtype) @ sqrt_rho)
+    eigenvalues = torch.clamp(torch.linalg.eigvalsh(inner), min=0)
+    return torch.clamp(torch.sqrt(eigenvalues).sum(dim=-1), 0.0, 1.0)
+
+def batch_purity(states: Union[torch.Tensor, Sequence]) -> List[float]:
+    """Purities of a collection of states."""
+    return MeaningStateBatch(states).purity().tolist()
+
+def batch_entropy(states: Union[torch.Tensor, Sequence]) -> List[float]:
+    """Von Neumann entropies of a collection of states."""
+    return MeaningStateBatch(states).von_neumann_entropy().tolist()
+
+def pairwise_fidelity_matrix(states: Union[torch.Tensor, Sequence],
+                             others: Optional[Union[torch.Tensor, Sequence]] = None) -> torch.Tensor:
+    """Fidelity matrix of a collection (or between two collections) of states."""
+    batch = MeaningStateBatch(states)
+    return batch.pairwise_fidelity(MeaningStateBatch(others) if others is not None else None)
@@ -0,0 +1,227 @@
+"""
+Content-Addressed Media Store
+=============================
+
+Imported media is stored once, as objects/<aa>/<sha256><ext> under the media
+directory. The per-conversation paths recorded in the database are hard links
+to those objects, so a file that appears in many conversations (or in every
+re-import of an export) takes disk space once and is never copied again.
+
+Files are hashed with large buffered reads (memory-mapped for big files) on a
+thread pool; hashlib releases the GIL while digesting, so hashing scales with
+the disk rather than one core. Image dimensions come from the file header
+alone instead of decoding the whole image.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import shutil
+import struct
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+MEDIA_HASH_WORKERS = int(os.getenv("LPE_MEDIA_HASH_WORKERS", "8"))
+
+# Read size for buffered hashing; files at least MEDIA_MMAP_THRESHOLD bytes are mmapped instead
+HASH_BUFFER_SIZE = 1 << 20
+MEDIA_MMAP_THRESHOLD = 8 << 20
+
+# Linux FICLONE ioctl: copy-on-write clone on btrfs, XFS and similar filesystems
+_FICLONE = 0x40049409
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp'}
+
+def hash_file(path: Union[str, Path]) -> str:
+    """SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MEDIA_MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        else:
+            buffer = bytearray(min(HASH_BUFFER_SIZE, max(size, 1)))
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+    return digest.hexdigest()
+
+def _jpeg_dimensions(f) -> Optional[Tuple[int, int]]:
+    """Walk JPEG segment headers up to the first start-of-frame marker."""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0x01, 0xd8) or 0xd0 <= marker <= 0xd7:
+            continue
+        if marker == 0xd9:
+            return None
+        header = f.read(2)
+        if len(header) < 2:
+            return None
+        length = struct.unpack(">H", header)[0]
+        # SOF0-SOF15, excluding DHT (C4), JPG (C8) and DAC (CC)
+        if 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+def probe_image_dimensions(path: Union[str, Path]) -> Optional[Dict[str, int]]:
+    """Width and height read from a PNG, GIF, JPEG, WebP or BMP header, or None."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(32)
+            size = None
+            if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+                size = struct.unpack(">II", head[16:24])
+            elif head[:6] in (b"GIF87a", b"GIF89a"):
+                size = struct.unpack("<HH", head[6:10])
+            elif head[:2] == b"\xff\xd8":
+                size = _jpeg_dimensions(f)
+            elif head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+                chunk = head[12:16]
+                if chunk == b"VP8 ":
+                    width, height = struct.unpack("<HH", head[26:30])
+                    size = (width & 0x3fff, height & 0x3fff)
+                elif chunk == b"VP8L":
+                    bits = struct.unpack("<I", head[21:25])[0]
+                    size = ((bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1)
+                elif chunk == b"VP8X":
+                    size = (int.from_bytes(head[24:27], "little") + 1,
+                            int.from_bytes(head[27:30], "little") + 1)
+            elif head[:2] == b"BM":
+                if struct.unpack("<I", head[14:18])[0] == 12:
+                    size = struct.unpack("<HH", head[18:22])
+                else:
+                    width, height = struct.unpack("<ii", head[18:26])
+                    size = (width, abs(height))
+    except (OSError, struct.error) as e:
+        logger.debug(f"Could not get dimensions for {path}: {e}")
+        return None
+
+    if not size:
+        return None
+    return {"width": size[0], "height": size[1]}
+
+def clone_file(source: Union[str, Path], dest: Union[str, Path]):
+    """Copy a file as a reflink where the filesystem supports it, else byte for byte."""
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError:
+            shutil.copyfileobj(src, dst, HASH_BUFFER_SIZE)
+    shutil.copystat(source, dest)
+
+def link_file(source: Union[str, Path], dest: Union[str, Path]):
+    """Hard-link dest to source, falling back to a clone across filesystems."""
+    try:
+        os.link(source, dest)
+    except OSError:
+        clone_file(source, dest)
+
+class MediaStore:
+    """
+    Checksum-addressed object directory.
+
+    The stored checksums are read from disk once (on first use, or on
+    `refresh` at the start of an import run) and kept current in memory, so
+    deciding whether a file is new needs no filesystem or database lookups.
+    """
+
+    def __init__(self, media_dir: Union[str, Path]):
+        self.objects_dir = Path(media_dir) / "objects"
+        self._lock = threading.Lock()
+        self._objects: Optional[Dict[str, str]] = None  # checksum -> object file name
+
+    def refresh(self):
+        """Reload the stored checksums from the object directory."""
+        objects = {}
+        if self.objects_dir.exists():
+            for fan_out in os.scandir(self.objects_dir):
+                if fan_out.is_dir():
+                    for entry in os.scandir(fan_out.path):
+                        if not entry.name.startswith("."):
+                            objects[entry.name.split(".", 1)[0]] = entry.name
+        with self._lock:
+            self._objects = objects
+        logger.info(f"Media store holds {len(objects)} objects")
+
+    def __contains__(self, checksum: str) -> bool:
+        if self._objects is None:
+            self.refresh()
+        return checksum in self._objects
+
+    def object_path(self, checksum: str, suffix: str = "") -> Path:
+        """Where an object lives; the suffix of an already stored object wins."""
+        if checksum in self:
+            return self.objects_dir / checksum[:2] / self._objects[checksum]
+        return self.objects_dir / checksum[:2] / f"{checksum}{suffix.lower()}"
+
+    def add(self, source: Union[str, Path], checksum: str) -> Tuple[Path, bool]:
+        """
+        Store a file under its checksum.
+
+        Returns (object path, created); created is False when the content was
+        already stored.
+        """
+        path = self.object_path(checksum, Path(source).suffix)
+        if checksum in self:
+            return path, False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Clone into a temporary name first so a partial copy never looks stored
+        staging = path.parent / f".{checksum}.{uuid.uuid4().hex}"
+        try:
+            clone_file(source, staging)
+            os.replace(staging, path)
+        finally:
+            if staging.exists():
+                staging.unlink()
+        with self._lock:
+            self._objects[checksum] = path.name
+        return path, True
+
+    def link(self, checksum: str, dest: Union[str, Path]):
+        """Materialize a stored object at dest as a hard link."""
+        link_file(self.object_path(checksum), dest)
+
+def fingerprint_files(paths: Iterable[Union[str, Path]],
+                      probe_images: bool = True,
+                      max_workers: int = MEDIA_HASH_WORKERS) -> List[Tuple[Optional[str], Optional[Dict[str, int]], Optional[str]]]:
+    """
+    (checksum, dimensions, error) for each path, in order, hashed on a thread pool.
+
+    Dimensions are only probed for image files when probe_images is set.
+    """
+    def fingerprint(path):
+        try:
+            dimensions = probe_image_dimensions(path) if probe_images and Path(path).suffix.lower() in IMAGE_EXTENSIONS else None
+            return hash_file(path), dimensions, None
+        except OSError as e:
+            return None, None, str(e)
+
+    paths = list(paths)
+    if len(paths) <= 1:
+        return [fingerprint(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        return list(pool.map(fingerprint, paths))
@@ -15,16 +15,28 @@ Core Concepts:
 Author: Based on theoretical framework by [User]
 """
 
+import os
+import threading
 import numpy as np
 import torch
 import torch.nn as nn
+from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Union
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
 import logging
 
+from meaning_metrics import MeaningStateBatch
+
 logger = logging.getLogger(__name__)
 
+# Precomputed POVM artifacts, one file per (dimension, seed)
+POVM_ARTIFACT_DIR = Path(os.getenv("POVM_ARTIFACT_DIR", Path(__file__).parent / "data" / "povm_artifacts"))
+POVM_ARTIFACT_VERSION = 1
+
+# Saved embedding-to-state mapper weights, one file per (embedding dimension, semantic dimension)
+MAPPER_WEIGHTS_DIR = Path(os.getenv("MAPPER_WEIGHTS_DIR", Path(__file__).parent / "data" / "embedding_mappers"))
+
 @dataclass
 class MeaningState:
     """
@@ -42,7 +54,7 @@ class MeaningState:
         """Validate that this is a proper density matrix."""
         assert self.density_matrix.shape == (self.dimension, self.dimension)
         assert torch.allclose(torch.trace(self.density_matrix), torch.tensor(1.0), atol=1e-6)
-        assert torch.all(torch.linalg.eigvals(self.density_matrix).real >= -1e-6)  # Positive semidefinite
+        assert torch.all(torch.linalg.eigvalsh(self.density_matrix) >= -1e-6)  # Positive semidefinite
     
     @classmethod
     def maximally_mixed(cls, dimension: int, semantic_labels: Optional[List[str]] = None):
@@ -70,9 +82,7 @@ class MeaningState:
     
     def von_neumann_entropy(self) -> float:
         """Calculate von Neumann entropy S(ρ) = -Tr(ρ log ρ)."""
-        eigenvals = torch.linalg.eigvals(self.density_matrix).real
-        eigenvals = eigenvals[eigenvals > 1e-12]  # Remove numerical zeros
-        return -torch.sum(eigenvals * torch.log(eigenvals)).item()
+        return MeaningStateBatch(self.density_matrix).von_neumann_entropy().item()
 
 class MeaningPOVM:
     """
@@ -84,38 +94,103 @@ class MeaningPOVM:
     """
     
     def __init__(self, 
-                 elements: List[torch.Tensor], 
+                 elements: Union[List[torch.Tensor], torch.Tensor], 
                  labels: List[str],
-                 is_sic_like: bool = False):
+                 is_sic_like: bool = False,
+                 kraus_operators: Optional[torch.Tensor] = None,
+                 validate: bool = True):
         """
         Initialize a Meaning-POVM.
         
         Args:
-            elements: List of positive operators E_i, each shape (d, d)
+            elements: Positive operators E_i, as a list of (d, d) tensors or one (n, d, d) tensor
             labels: Semantic labels for each element (e.g., "mythic", "analytic")
             is_sic_like: Whether this approximates a SIC-POVM structure
+            kraus_operators: Optional precomputed (n, d, d) Kraus operators M_i = √E_i
+            validate: Check POVM properties (skipped for artifacts validated offline)
         """
-        self.elements = elements
+        self.element_tensor = elements if isinstance(elements, torch.Tensor) else torch.stack(elements)
+        self.elements = list(self.element_tensor.unbind(0))
         self.labels = labels
-        self.dimension = elements[0].shape[0]
-        self.num_elements = len(elements)
+        self.dimension = self.element_tensor.shape[-1]
+        self.num_elements = self.element_tensor.shape[0]
         self.is_sic_like = is_sic_like
+        self._kraus_tensor = kraus_operators
         
         # Validate POVM properties
-        self._validate_povm()
+        if validate:
+            self._validate_povm()
     
     def _validate_povm(self):
         """Validate that elements form a proper POVM."""
-        # Check positivity
-        for i, E in enumerate(self.elements):
-            eigenvals = torch.linalg.eigvals(E).real
-            assert torch.all(eigenvals >= -1e-6), f"Element {i} not positive semidefinite"
+        # Check positivity (batched over all elements)
+        eigenvals = torch.linalg.eigvalsh(self.element_tensor)
+        negative = (eigenvals < -1e-6).any(dim=-1).nonzero()
+        assert len(negative) == 0, f"Element {negative[0].item()} not positive semidefinite"
         
         # Check completeness: sum of elements = identity
-        element_sum = sum(self.elements)
+        element_sum = self.element_tensor.sum(dim=0)
         identity = torch.eye(self.dimension)
         assert torch.allclose(element_sum, identity, atol=1e-6), "POVM elements don't sum to identity"
     
+    @property
+    def kraus_tensor(self) -> torch.Tensor:
+        """Kraus operators M_i = √E_i stacked as (n, d, d), computed once per POVM."""
+        if self._kraus_tensor is None:
+            self._kraus_tensor = self._compute_kraus_operators(self.element_tensor)
+        return self._kraus_tensor
+    
+    @property
+    def kraus_operators(self) -> List[torch.Tensor]:
+        return list(self.kraus_tensor.unbind(0))
+    
+    @staticmethod
+    def _compute_kraus_operators(elements: torch.Tensor) -> torch.Tensor:
+        """Batched matrix square roots via one eigendecomposition of all elements."""
+        # Eigendecomposition: E = U Λ U†
+        eigenvals, eigenvecs = torch.linalg.eigh(elements)
+        # Ensure non-negative eigenvalues; M = U sqrt(Λ) U†
+        sqrt_eigenvals = torch.sqrt(torch.clamp(eigenvals, min=0))
+        M = eigenvecs @ torch.diag_embed(sqrt_eigenvals).to(eigenvecs.dtype) @ eigenvecs.mH
+        return M.real
+    
+    def validate_kraus_operators(self):
+        """Validate that the Kraus operators satisfy E_i = M_i† M_i."""
+        M = self.kraus_tensor
+        reconstructed = M.mH @ M
+        mismatched = (~torch.isclose(reconstructed, self.element_tensor, atol=1e-5)).flatten(1).any(dim=1).nonzero()
+        assert len(mismatched) == 0, f"Kraus operator {mismatched[0].item()} inconsistent with POVM element"
+    
+    def save_artifact(self, path: Union[str, Path], seed: Optional[int] = None):
+        """
+        Save elements and Kraus operators as one (2, n, d, d) tensor file.
+        
+        Only validated POVMs should be saved: loading skips validation.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        operators = torch.stack([self.element_tensor, self.kraus_tensor]).to(torch.float32).contiguous()
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        torch.save({
+            "version": POVM_ARTIFACT_VERSION,
+            "dimension": self.dimension,
+            "seed": seed,
+            "is_sic_like": self.is_sic_like,
+            "operators": operators
+        }, tmp_path)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load_artifact(cls, path: Union[str, Path], labels: List[str]) -> 'MeaningPOVM':
+        """Load a precomputed POVM; tensors are memory-mapped rather than read eagerly."""
+        data = torch.load(path, mmap=True, weights_only=True)
+        if data.get("version") != POVM_ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported POVM artifact version in {path}: {data.get('version')}")
+        operators = data["operators"]
+        assert len(labels) == operators.shape[1], f"Need {operators.shape[1]} labels for d={data['dimension']}"
+        return cls(operators[0], labels, is_sic_like=data["is_sic_like"],
+                   kraus_operators=operators[1], validate=False)
+    
     @classmethod
     def create_sic_like_povm(cls, 
                            dimension: int, 
@@ -213,11 +288,26 @@ class MeaningPOVM:
         
         Returns probabilities p(i) = Tr(ρ E_i) for each semantic element.
         """
-        probabilities = {}
+        return self.measure_density_matrix(meaning_state.density_matrix)
+    
+    def measure_batch(self, density_matrices: torch.Tensor) -> torch.Tensor:
+        """
+        Measure a stack of density matrices at once.
         
-        for element, label in zip(self.elements, self.labels):
-            prob = torch.trace(meaning_state.density_matrix @ element).real.item()
-            probabilities[label] = max(0.0, prob)  # Ensure non-negative
+        Args:
+            density_matrices: Shape (N, d, d)
+            
+        Returns:
+            (N, num_elements) non-negative probabilities p(i) = Tr(ρ E_i)
+        """
+        elements = self.element_tensor.to(density_matrices.dtype)
+        # Tr(ρ E) = Σ_jk ρ_jk E_kj
+        probs = torch.einsum('njk,ikj->ni', density_matrices, elements).real
+        return torch.clamp(probs, min=0.0)  # Ensure non-negative
+    
+    def probabilities_by_label(self, probs: torch.Tensor) -> Dict[str, float]:
+        """Label one row of measure_batch output, normalized as measure() reports it."""
+        probabilities = dict(zip(self.labels, probs.tolist()))
         
         # Normalize to handle numerical errors
         total = sum(probabilities.values())
@@ -228,14 +318,8 @@ class MeaningPOVM:
     
     def compute_pairwise_overlaps(self) -> torch.Tensor:
         """Compute pairwise overlaps Tr(E_i E_j) for analyzing SIC-like properties."""
-        overlaps = torch.zeros(self.num_elements, self.num_elements)
-        
-        for i in range(self.num_elements):
-            for j in range(self.num_elements):
-                overlap = torch.trace(self.elements[i] @ self.elements[j]).real
-                overlaps[i, j] = overlap
-        
-        return overlaps
+        # Tr(E_i E_j) = Σ_kl (E_i)_kl (E_j)_lk
+        return torch.einsum('ikl,jlk->ij', self.element_tensor, self.element_tensor).real
     
     def measure_density_matrix(self, density_matrix: torch.Tensor) -> Dict[str, float]:
         """
@@ -250,18 +334,7 @@ class MeaningPOVM:
         Returns:
             Dictionary of measurement probabilities for each semantic element
         """
-        probabilities = {}
-        
-        for element, label in zip(self.elements, self.labels):
-            prob = torch.trace(density_matrix @ element).real.item()
-            probabilities[label] = max(0.0, prob)  # Ensure non-negative
-        
-        # Normalize to handle numerical errors
-        total = sum(probabilities.values())
-        if total > 0:
-            probabilities = {k: v/total for k, v in probabilities.items()}
-        
-        return probabilities
+        return self.probabilities_by_label(self.measure_batch(density_matrix.unsqueeze(0))[0])
 
 class NarrativeTransformation:
     """
@@ -289,22 +362,14 @@ class NarrativeTransformation:
         self.transformation_type = transformation_type
         
         if kraus_operators is None:
-            # Use eigendecomposition to get proper square root for Kraus operators
-            self.kraus_operators = []
-            for E in povm.elements:
-                # Eigendecomposition: E = U Λ U†
-                eigenvals, eigenvecs = torch.linalg.eigh(E)
-                # Ensure non-negative eigenvalues
-                eigenvals = torch.clamp(eigenvals, min=0)
-                # M = U sqrt(Λ) U†
-                sqrt_eigenvals = torch.sqrt(eigenvals)
-                M = eigenvecs @ torch.diag(sqrt_eigenvals) @ eigenvecs.conj().T
-                self.kraus_operators.append(M.real)
+            # Kraus operators M_i = √E_i are computed once per POVM (or loaded
+            # from its artifact) and were validated when the POVM was built
+            self.kraus_operators = povm.kraus_operators
         else:
             self.kraus_operators = kraus_operators
             
-        # Validate that Kraus operators are consistent with POVM
-        self._validate_kraus_operators()
+            # Validate that custom Kraus operators are consistent with POVM
+            self._validate_kraus_operators()
     
     def _validate_kraus_operators(self):
         """Validate that Kraus operators satisfy E_i = M_i† M_i."""
@@ -394,22 +459,9 @@ class NarrativeTransformation:
         Compute quantum fidelity F(ρ, σ) = Tr(√(√ρ σ √ρ)) between states.
         Measures how "similar" the meaning-states are (1 = identical, 0 = orthogonal).
         """
-        rho = initial_state.density_matrix
-        sigma = final_state.density_matrix
-        
-        # Compute matrix square roots using eigendecomposition
-        def matrix_sqrt(M):
-            eigenvals, eigenvecs = torch.linalg.eigh(M)
-            eigenvals = torch.clamp(eigenvals, min=1e-8)  # Ensure positive
-            sqrt_eigenvals = torch.sqrt(eigenvals)
-            return eigenvecs @ torch.diag(sqrt_eigenvals) @ eigenvecs.conj().T
-        
-        sqrt_rho = matrix_sqrt(rho + 1e-8 * torch.eye(rho.shape[0]))
-        inner_matrix = sqrt_rho @ sigma @ sqrt_rho
-        sqrt_inner = matrix_sqrt(inner_matrix + 1e-8 * torch.eye(inner_matrix.shape[0]))
-        
-        fidelity = torch.trace(sqrt_inner).real.item()
-        return min(1.0, max(0.0, fidelity))  # Clamp to [0,1]
+        rho = MeaningStateBatch(initial_state.density_matrix)
+        sigma = MeaningStateBatch(final_state.density_matrix)
+        return rho.fidelity(sigma).item()  # Clamped to [0,1]
 
 class NarrativeCoherenceConstraint:
     """
@@ -471,6 +523,169 @@ class NarrativeCoherenceConstraint:
         
         return is_coherent, total_violation
 
+class EmbeddingToState(nn.Module):
+    """
+    Neural network mapping LLM embeddings to valid density matrices.
+    
+    Uses Cholesky parameterization to ensure positive semidefinite, trace-1 output.
+    """
+    
+    def __init__(self, embedding_dim: int, state_dim: int):
+        super().__init__()
+        self.state_dim = state_dim
+        self.embedding_dim = embedding_dim
+        
+        # Map to Cholesky factors of density matrix
+        cholesky_dim = state_dim * (state_dim + 1) // 2  # Lower triangular elements
+        
+        self.mapper = nn.Sequential(
+            nn.Linear(embedding_dim, 512),
+            nn.ReLU(),
+            nn.Linear(512, 256),
+            nn.ReLU(),
+            nn.Linear(256, cholesky_dim),
+        )
+        
+        tril_indices = torch.tril_indices(state_dim, state_dim)
+        self.register_buffer("tril_rows", tril_indices[0], persistent=False)
+        self.register_buffer("tril_cols", tril_indices[1], persistent=False)
+        self.register_buffer("diagonal_mask", tril_indices[0] == tril_indices[1], persistent=False)
+    
+    def forward(self, embedding: torch.Tensor) -> torch.Tensor:
+        """Convert (batch, embedding_dim) embeddings to (batch, d, d) density matrices."""
+        cholesky_elements = self.mapper(embedding)
+        
+        # Ensure positive diagonal elements (the original per-item code assigned to
+        # L.diagonal().data, which rebinds a view and never reached L)
+        cholesky_elements = torch.where(
+            self.diagonal_mask, torch.exp(cholesky_elements) + 1e-6, cholesky_elements
+        )
+        
+        # Reconstruct lower triangular matrices
+        L = cholesky_elements.new_zeros(embedding.shape[0], self.state_dim, self.state_dim)
+        L[:, self.tril_rows, self.tril_cols] = cholesky_elements
+        
+        # Construct density matrix: ρ = L L†, normalized to trace 1
+        rho = L @ L.transpose(-1, -2)
+        trace = rho.diagonal(dim1=-2, dim2=-1).sum(dim=-1)
+        return rho / trace[:, None, None]
+
+class EmbeddingMapperRegistry:
+    """
+    One EmbeddingToState per embedding dimension, backed by saved weights.
+    
+    Weights are loaded from the registry directory when present (for example
+    after training); otherwise a mapper is initialized from a seed derived
+    from its dimensions and saved, so every process maps the same embedding
+    to the same meaning-state.
+    """
+    
+    def __init__(self, state_dim: int, weights_dir: Optional[Path] = None, seed: int = 42):
+        self.state_dim = state_dim
+        self.weights_dir = Path(weights_dir) if weights_dir else MAPPER_WEIGHTS_DIR
+        self.seed = seed
+        self._mappers: Dict[int, EmbeddingToState] = {}
+        self._lock = threading.Lock()
+    
+    def weights_path(self, embedding_dim: int) -> Path:
+        return self.weights_dir / f"mapper_e{embedding_dim}_d{self.state_dim}.pt"
+    
+    def get(self, embedding_dim: int) -> EmbeddingToState:
+        """Get the mapper for an embedding dimension, loading or creating it once."""
+        mapper = self._mappers.get(embedding_dim)
+        if mapper is None:
+            with self._lock:
+                mapper = self._mappers.get(embedding_dim)
+                if mapper is None:
+                    mapper = self._load_or_create(embedding_dim)
+                    self._mappers[embedding_dim] = mapper
+        return mapper
+    
+    def _load_or_create(self, embedding_dim: int) -> EmbeddingToState:
+        path = self.weights_path(embedding_dim)
+        
+        if path.exists():
+            mapper = EmbeddingToState(embedding_dim, self.state_dim)
+            mapper.load_state_dict(torch.load(path, weights_only=True))
+            logger.info(f"Loaded embedding mapper {embedding_dim} → {self.state_dim}: {path}")
+        else:
+            # Deterministic initialization, independent of global RNG state
+            with torch.random.fork_rng(devices=[]):
+                torch.manual_seed(self.seed * 1_000_003 + embedding_dim * 1009 + self.state_dim)
+                mapper = EmbeddingToState(embedding_dim, self.state_dim)
+            self._save(mapper, path)
+            logger.info(f"Initialized embedding mapper {embedding_dim} → {self.state_dim} (no saved weights)")
+        
+        return mapper.eval().requires_grad_(False)
+    
+    def _save(self, mapper: EmbeddingToState, path: Path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + ".tmp")
+            torch.save(mapper.state_dict(), tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save embedding mapper weights to {path}: {e}")
+    
+    def save(self, embedding_dim: int):
+        """Persist the current (e.g. freshly trained) weights for an embedding dimension."""
+        self._save(self.get(embedding_dim), self.weights_path(embedding_dim))
+    
+    def export_torchscript(self, embedding_dim: int, path: Optional[Path] = None) -> Path:
+        """Export the mapper as a TorchScript module for deployment without this code."""
+        path = Path(path) if path else self.weights_path(embedding_dim).with_suffix(".ts")
+        example = torch.zeros(1, embedding_dim)
+        traced = torch.jit.trace(self.get(embedding_dim), example)
+        traced.save(str(path))
+        return path
+    
+    def export_onnx(self, embedding_dim: int, path: Optional[Path] = None) -> Path:
+        """Export the mapper to ONNX with a dynamic batch axis (requires the onnx package)."""
+        path = Path(path) if path else self.weights_path(embedding_dim).with_suffix(".onnx")
+        example = torch.zeros(1, embedding_dim)
+        torch.onnx.export(
+            self.get(embedding_dim), example, str(path),
+            input_names=["embedding"], output_names=["density_matrix"],
+            dynamic_axes={"embedding": {0: "batch"}, "density_matrix": {0: "batch"}}
+        )
+        return path
+
+_mapper_registries: Dict[int, EmbeddingMapperRegistry] = {}
+
+def get_mapper_registry(state_dim: int) -> EmbeddingMapperRegistry:
+    """Get the process-wide mapper registry for a semantic dimension."""
+    if state_dim not in _mapper_registries:
+        _mapper_registries[state_dim] = EmbeddingMapperRegistry(state_dim)
+    return _mapper_registries[state_dim]
+
+def povm_artifact_path(dimension: int, seed: int) -> Path:
+    """Location of the precomputed POVM artifact for (dimension, seed)."""
+    return POVM_ARTIFACT_DIR / f"povm_d{dimension}_seed{seed}.pt"
+
+def build_povm_artifact(dimension: int, seed: int = 42, path: Optional[Path] = None) -> Path:
+    """
+    Offline step: construct, fully validate and save the canonical POVM.
+    
+    Builds the SIC-like elements, checks positivity and completeness, derives
+    the Kraus operators and checks E_i = M_i† M_i, then writes one artifact
+    that engines load without repeating any of that work.
+    """
+    path = Path(path) if path else povm_artifact_path(dimension, seed)
+    labels = [f"e{i}" for i in range(dimension ** 2)]  # Labels are supplied at load time
+    povm = MeaningPOVM.create_sic_like_povm(dimension, labels, random_seed=seed)
+    povm.validate_kraus_operators()
+    povm.save_artifact(path, seed=seed)
+    logger.info(f"Built POVM artifact d={dimension} seed={seed}: {path}")
+    return path
+
+def load_canonical_povm(dimension: int, labels: List[str], seed: int = 42) -> MeaningPOVM:
+    """Load the canonical POVM artifact, building it once if it does not exist yet."""
+    path = povm_artifact_path(dimension, seed)
+    if not path.exists():
+        logger.info(f"No POVM artifact for d={dimension} seed={seed}; building it now")
+        build_povm_artifact(dimension, seed, path)
+    return MeaningPOVM.load_artifact(path, labels)
+
 # Integration with existing LPE system
 class QuantumNarrativeEngine:
     """
@@ -508,94 +723,37 @@ class QuantumNarrativeEngine:
             semantic_labels = (base_labels * (num_labels // len(base_labels) + 1))[:num_labels]
         
         self.semantic_labels = semantic_labels
+        self.povm_seed = 42  # For reproducibility
         
-        # Initialize canonical SIC-like POVM
-        self.canonical_povm = MeaningPOVM.create_sic_like_povm(
-            dimension=semantic_dimension,
-            semantic_labels=semantic_labels,
-            random_seed=42  # For reproducibility
-        )
+        # Canonical SIC-like POVM and coherence constraint are loaded on first use
+        self._canonical_povm = None
+        self._coherence_constraint = None
         
-        # Initialize coherence constraint
-        self.coherence_constraint = NarrativeCoherenceConstraint(self.canonical_povm)
-        
-        # Neural network to map embeddings to density matrices
-        self.embedding_to_state = self._create_embedding_mapper()
+        # Neural networks mapping embeddings to density matrices, one per embedding dimension
+        self.default_embedding_dim = 384  # Common sentence transformer size
+        self.mapper_registry = get_mapper_registry(semantic_dimension)
         
         logger.info(f"Initialized QuantumNarrativeEngine with d={semantic_dimension}")
     
-    def _create_embedding_mapper(self) -> nn.Module:
-        """
-        Create neural network to map LLM embeddings to valid density matrices.
-        
-        Uses Cholesky parameterization to ensure positive semidefinite, trace-1 output.
-        Auto-detects embedding dimension from actual embeddings.
-        """
-        class EmbeddingToState(nn.Module):
-            def __init__(self, embedding_dim: int, state_dim: int):
-                super().__init__()
-                self.state_dim = state_dim
-                self.embedding_dim = embedding_dim
-                
-                # Map to Cholesky factors of density matrix
-                cholesky_dim = state_dim * (state_dim + 1) // 2  # Lower triangular elements
-                
-                self.mapper = nn.Sequential(
-                    nn.Linear(embedding_dim, 512),
-                    nn.ReLU(),
-                    nn.Linear(512, 256),
-                    nn.ReLU(),
-                    nn.Linear(256, cholesky_dim),
-                )
-            
-            def forward(self, embedding: torch.Tensor) -> torch.Tensor:
-                """Convert embedding to density matrix via Cholesky decomposition."""
-                # Handle different embedding dimensions
-                if embedding.dim() == 1:
-                    embedding = embedding.unsqueeze(0)  # Add batch dimension
-                
-                # Ensure embedding matches expected dimension
-                if embedding.shape[-1] != self.embedding_dim:
-                    # Pad or truncate to match expected dimension
-                    current_dim = embedding.shape[-1]
-                    if current_dim < self.embedding_dim:
-                        # Pad with zeros
-                        padding = torch.zeros(embedding.shape[0], self.embedding_dim - current_dim)
-                        embedding = torch.cat([embedding, padding], dim=1)
-                    else:
-                        # Truncate
-                        embedding = embedding[:, :self.embedding_dim]
-                
-                cholesky_elements = self.mapper(embedding)
-                
-                # Handle batch dimension
-                batch_size = embedding.shape[0]
-                result_matrices = []
-                
-                for b in range(batch_size):
-                    # Reconstruct lower triangular matrix
-                    L = torch.zeros(self.state_dim, self.state_dim)
-                    tril_indices = torch.tril_indices(self.state_dim, self.state_dim)
-                    L[tril_indices[0], tril_indices[1]] = cholesky_elements[b]
-                    
-                    # Ensure positive diagonal elements
-                    L.diagonal().data = torch.exp(L.diagonal()) + 1e-6
-                    
-                    # Construct density matrix: ρ = L L†
-                    rho = L @ L.T
-                    
-                    # Normalize to trace 1
-                    rho = rho / torch.trace(rho)
-                    
-                    result_matrices.append(rho)
-                
-                if batch_size == 1:
-                    return result_matrices[0]
-                else:
-                    return torch.stack(result_matrices)
-        
-        # Use flexible embedding dimension (will be updated when first used)
-        return EmbeddingToState(embedding_dim=384, state_dim=self.semantic_dimension)  # 384 is common sentence transformer size
+    @property
+    def canonical_povm(self) -> MeaningPOVM:
+        """Canonical SIC-like POVM, loaded from its precomputed artifact on first use."""
+        if self._canonical_povm is None:
+            self._canonical_povm = load_canonical_povm(
+                self.semantic_dimension, self.semantic_labels, seed=self.povm_seed
+            )
+        return self._canonical_povm
+    
+    @property
+    def coherence_constraint(self) -> NarrativeCoherenceConstraint:
+        if self._coherence_constraint is None:
+            self._coherence_constraint = NarrativeCoherenceConstraint(self.canonical_povm)
+        return self._coherence_constraint
+    
+    @property
+    def embedding_to_state(self) -> nn.Module:
+        """Mapper for the default (384-d sentence transformer) embedding size."""
+        return self.mapper_registry.get(self.default_embedding_dim)
     
     def text_to_meaning_state(self, text: str, embedding: torch.Tensor) -> MeaningState:
         """
@@ -608,65 +766,35 @@ class QuantumNarrativeEngine:
         Returns:
             MeaningState representing the subjective semantic content
         """
-        # Ensure embedding is a tensor
-        if isinstance(embedding, np.ndarray):
-            embedding = torch.tensor(embedding, dtype=torch.float32)
+        return self.texts_to_meaning_states([text], embedding)[0]
+    
+    def texts_to_meaning_states(self, texts: List[str],
+                                embeddings: Union[torch.Tensor, np.ndarray]) -> List[MeaningState]:
+        """
+        Convert a batch of embeddings (one per text) to meaning-states in one forward pass.
         
-        # Auto-update embedding mapper if dimension mismatch
-        if hasattr(self.embedding_to_state, 'embedding_dim'):
-            expected_dim = self.embedding_to_state.embedding_dim
-            actual_dim = embedding.shape[-1] if embedding.dim() > 0 else len(embedding)
-            
-            if actual_dim != expected_dim:
-                logger.info(f"Updating embedding mapper: {expected_dim} → {actual_dim} dimensions")
-                self.embedding_to_state = self._create_embedding_mapper_for_dim(actual_dim)
+        The mapper is chosen by embedding dimension, so 384-d and 768-d vectors
+        each use their own persistent weights.
+        """
+        # Ensure embeddings are a float tensor with a batch dimension
+        if isinstance(embeddings, np.ndarray):
+            embeddings = torch.from_numpy(embeddings)
+        embeddings = embeddings.to(torch.float32)
+        if embeddings.dim() == 1:
+            embeddings = embeddings.unsqueeze(0)
         
-        with torch.no_grad():
-            density_matrix = self.embedding_to_state(embedding)
+        mapper = self.mapper_registry.get(embeddings.shape[-1])
+        with torch.inference_mode():
+            density_matrices = mapper(embeddings)
         
-        return MeaningState(
-            density_matrix=density_matrix,
-            dimension=self.semantic_dimension,
-            semantic_labels=self.semantic_labels
-        )
-    
-    def _create_embedding_mapper_for_dim(self, embedding_dim: int) -> nn.Module:
-        """Create embedding mapper for specific dimension."""
-        class EmbeddingToState(nn.Module):
-            def __init__(self, embedding_dim: int, state_dim: int):
-                super().__init__()
-                self.state_dim = state_dim
-                self.embedding_dim = embedding_dim
-                
-                # Map to Cholesky factors of density matrix
-                cholesky_dim = state_dim * (state_dim + 1) // 2
-                
-                self.mapper = nn.Sequential(
-                    nn.Linear(embedding_dim, 512),
-                    nn.ReLU(),
-                    nn.Linear(512, 256),
-                    nn.ReLU(),
-                    nn.Linear(256, cholesky_dim),
-                )
-            
-            def forward(self, embedding: torch.Tensor) -> torch.Tensor:
-                if embedding.dim() == 1:
-                    embedding = embedding.unsqueeze(0)
-                
-                cholesky_elements = self.mapper(embedding)
-                
-                # Reconstruct density matrix
-                L = torch.zeros(self.state_dim, self.state_dim)
-                tril_indices = torch.tril_indices(self.state_dim, self.state_dim)
-                L[tril_indices[0], tril_indices[1]] = cholesky_elements[0]
-                
-                L.diagonal().data = torch.exp(L.diagonal()) + 1e-6
-                rho = L @ L.T
-                rho = rho / torch.trace(rho)
-                
-                return rho
-        
-        return EmbeddingToState(embedding_dim=embedding_dim, state_dim=self.semantic_dimension)
+        return [
+            MeaningState(
+                density_matrix=density_matrix.clone(),
+                dimension=self.semantic_dimension,
+                semantic_labels=self.semantic_labels
+            )
+            for density_matrix in density_matrices
+        ]
     
     def create_narrative_transformation(self, 
                                      narrative_text: str,
@@ -715,14 +843,18 @@ class QuantumNarrativeEngine:
         # Apply transformation
         final_state, measurement_probs = transformation.transform(initial_state)
         
-        # Compute analysis metrics
-        fidelity = transformation.compute_fidelity(initial_state, final_state)
-        purity_change = final_state.purity() - initial_state.purity()
-        entropy_change = final_state.von_neumann_entropy() - initial_state.von_neumann_entropy()
+        # Compute analysis metrics from one decomposition of both states
+        states = MeaningStateBatch([initial_state, final_state])
+        fidelity = states.fidelity(MeaningStateBatch(final_state.density_matrix))[0].item()
+        purity = states.purity()
+        entropy = states.von_neumann_entropy()
+        purity_change = (purity[1] - purity[0]).item()
+        entropy_change = (entropy[1] - entropy[0]).item()
         
         # Get canonical POVM measurements for both states
-        initial_canonical_probs = self.canonical_povm.measure(initial_state)
-        final_canonical_probs = self.canonical_povm.measure(final_state)
+        canonical_probs = self.canonical_povm.measure_batch(states.density)
+        initial_canonical_probs = self.canonical_povm.probabilities_by_label(canonical_probs[0])
+        final_canonical_probs = self.canonical_povm.probabilities_by_label(canonical_probs[1])
         
         return {
             "initial_state": initial_state,
@@ -766,6 +898,14 @@ class QuantumNarrativeEngine:
 
 # Example usage and testing
 if __name__ == "__main__":
+    import sys
+    
+    if sys.argv[1:2] == ["build-povm"]:
+        # Offline artifact build: python narrative_theory.py build-povm [dimension ...]
+        for dim in (int(arg) for arg in sys.argv[2:] or ["8"]):
+            print(f"Built {build_povm_artifact(dim)}")
+        sys.exit(0)
+    
     # Initialize the quantum narrative engine
     engine = QuantumNarrativeEngine(semantic_dimension=4)  # Small example
     
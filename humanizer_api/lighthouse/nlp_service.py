@@ -0,0 +1,102 @@
+"""
+Shared spaCy pipeline service for linguistic analysis.
+
+Loads the spaCy model lazily (on first use rather than at import time), keeps
+one instance per process, and processes texts in batches with nlp.pipe.
+Each task only runs the pipeline components it needs, so stylometric
+analysis skips NER and entity extraction skips the parser.
+"""
+
+import os
+import threading
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import spacy
+    SPACY_AVAILABLE = True
+except ImportError:
+    logger.warning("spaCy not installed - linguistic analysis will be limited")
+    SPACY_AVAILABLE = False
+
+# Pipeline components each analysis task can skip. Stylometry needs token
+# tags and sentence boundaries; entity extraction only needs NER.
+TASK_SKIPPED_COMPONENTS: Dict[str, List[str]] = {
+    "stylometry": ["ner", "lemmatizer"],
+    "entities": ["tagger", "parser", "senter", "attribute_ruler", "lemmatizer"],
+    "full": []
+}
+
+class NLPService:
+    """Lazily loaded, batched spaCy pipeline shared across analyzers"""
+
+    def __init__(self, model_name: str = None, batch_size: int = None, n_process: int = None,
+                 min_texts_per_process: int = 64):
+        self.model_name = model_name or os.getenv("SPACY_MODEL", "en_core_web_sm")
+        self.batch_size = batch_size or int(os.getenv("SPACY_BATCH_SIZE", "64"))
+        self.n_process = n_process or int(os.getenv("SPACY_N_PROCESS", "1"))
+        # Worker processes only pay off once there is enough text to amortize startup
+        self.min_texts_per_process = min_texts_per_process
+        self._nlp = None
+        self._load_failed = False
+        self._lock = threading.Lock()
+
+    @property
+    def nlp(self):
+        """The loaded spaCy Language, or None if the model is unavailable"""
+        if self._nlp is None and not self._load_failed:
+            with self._lock:
+                if self._nlp is None and not self._load_failed:
+                    self._load()
+        return self._nlp
+
+    def _load(self):
+        if not SPACY_AVAILABLE:
+            self._load_failed = True
+            return
+        try:
+            self._nlp = spacy.load(self.model_name)
+            logger.info(f"Loaded spaCy model {self.model_name}: {self._nlp.pipe_names}")
+        except OSError:
+            logger.warning(f"spaCy model {self.model_name} not available - linguistic analysis will be limited")
+            self._load_failed = True
+
+    def is_available(self) -> bool:
+        return self.nlp is not None
+
+    def disabled_components(self, task: str) -> List[str]:
+        """Pipeline components that can be skipped for a task"""
+        if self.nlp is None:
+            return []
+        skipped = TASK_SKIPPED_COMPONENTS.get(task, [])
+        return [name for name in self.nlp.pipe_names if name in skipped]
+
+    def pipe(self, texts: Iterable[str], task: str = "full") -> Iterator:
+        """Process texts in batches, yielding Docs in input order"""
+        if self.nlp is None:
+            raise RuntimeError("spaCy model not available")
+
+        texts = list(texts)
+        n_process = self.n_process if len(texts) >= self.n_process * self.min_texts_per_process else 1
+
+        return self.nlp.pipe(
+            texts,
+            batch_size=self.batch_size,
+            n_process=n_process,
+            disable=self.disabled_components(task)
+        )
+
+    def process(self, text: str, task: str = "full"):
+        """Process a single text"""
+        return next(iter(self.pipe([text], task)))
+
+_nlp_service: Optional[NLPService] = None
+
+def get_nlp_service() -> NLPService:
+    """Get the process-wide NLP service"""
+    global _nlp_service
+    if _nlp_service is None:
+        _nlp_service = NLPService()
+    return _nlp_service
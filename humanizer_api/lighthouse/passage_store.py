@@ -0,0 +1,100 @@
+"""
+Memory-Mapped Passage Embedding Store
+=====================================
+
+Passage embeddings kept as one contiguous float32 file, row i holding the
+vector of the passage whose `embedding_row` is i.
+
+Mining only ever appends rows (or overwrites a passage's own row when it is
+re-analyzed), and clustering reads the file through np.memmap, so the OS
+pages vectors in as they are scanned instead of the whole corpus being
+decoded from SQLite BLOBs into Python objects and then copied into an array.
+"""
+
+import json
+import os
+import threading
+import numpy as np
+from pathlib import Path
+from typing import List, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PassageEmbeddingStore:
+    """Append-mostly float32 matrix file with a JSON header recording its dimension."""
+
+    def __init__(self, path: Union[str, Path]):
+        path = Path(path)
+        self.matrix_path = path.with_suffix(".f32")
+        self.meta_path = path.with_suffix(".json")
+        self._lock = threading.Lock()
+        self._dimension: Optional[int] = None
+
+    @property
+    def dimension(self) -> Optional[int]:
+        """Vector dimension, read from the header (another process may have created it)."""
+        if self._dimension is None and self.meta_path.exists():
+            with open(self.meta_path) as f:
+                self._dimension = json.load(f)["dimension"]
+        return self._dimension
+
+    @property
+    def row_bytes(self) -> int:
+        return self.dimension * 4
+
+    def __len__(self) -> int:
+        if self.dimension is None or not self.matrix_path.exists():
+            return 0
+        return os.path.getsize(self.matrix_path) // self.row_bytes
+
+    def _set_dimension(self, dimension: int):
+        self.matrix_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.meta_path, "w") as f:
+            json.dump({"dimension": dimension, "dtype": "float32"}, f)
+        self._dimension = dimension
+
+    def write(self, vector: np.ndarray, row: Optional[int] = None) -> int:
+        """Write a vector at `row`, or append it when row is None; returns the row."""
+        return self.write_many(np.asarray(vector, dtype=np.float32).reshape(1, -1), [row])[0]
+
+    def write_many(self, vectors: np.ndarray, rows: List[Optional[int]]) -> List[int]:
+        """
+        Write a batch of vectors; entries whose row is None are appended as one block.
+
+        Returns the row of every vector, in input order.
+        """
+        vectors = np.ascontiguousarray(np.atleast_2d(vectors), dtype=np.float32)
+        if len(vectors) == 0:
+            return []
+
+        with self._lock:
+            if self.dimension is None:
+                self._set_dimension(vectors.shape[1])
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(f"Expected {self.dimension}-d embeddings, got {vectors.shape[1]}-d")
+
+            existing_rows = len(self)
+            result = list(rows)
+            overwrite = [i for i, row in enumerate(rows) if row is not None and row < existing_rows]
+            append = [i for i, row in enumerate(rows) if row is None or row >= existing_rows]
+
+            if overwrite:
+                with open(self.matrix_path, "r+b") as f:
+                    for i in overwrite:
+                        f.seek(rows[i] * self.row_bytes)
+                        f.write(vectors[i].tobytes())
+            if append:
+                with open(self.matrix_path, "ab") as f:
+                    first = f.tell() // self.row_bytes
+                    f.write(vectors[append].tobytes())
+                for offset, i in enumerate(append):
+                    result[i] = first + offset
+        return result
+
+    def matrix(self) -> np.ndarray:
+        """Read-only memory map of all rows, shape (rows, dimension)."""
+        rows = len(self)
+        if rows == 0:
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
+        return np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(rows, self.dimension))
@@ -99,6 +99,14 @@ def main():
                 print(f"  - {attr}")
             if len(attributes) > 5:
                 print(f"  ... and {len(attributes) - 5} more")
+        
+        throughput = results.get('pipeline_throughput', {})
+        if throughput:
+            print(f"\nPipeline throughput ({throughput['wall_seconds']}s wall, "
+                  f"{throughput.get('mirror_hits', 0)} texts from local mirror):")
+            for stage, stage_stats in throughput['stages'].items():
+                print(f"  {stage}: {stage_stats['items']} items in {stage_stats['seconds']}s "
+                      f"({stage_stats['items_per_second']}/s)")
     else:
         print(f"Error: {results['error']}")
 
@@ -0,0 +1,181 @@
+"""
+In-Memory Vector Index
+======================
+
+Exact cosine top-k search over a contiguous, L2-normalized float32 matrix.
+
+Vectors are normalized once when added, so a query is one matrix-vector
+product plus `np.argpartition` to select the top k without sorting every
+score. Rows can be upserted by id, which lets callers keep the index in step
+with the table it mirrors instead of reloading it. Each row's original norm
+is kept too, so Euclidean distances between the unnormalized vectors can still
+be computed. An index can be saved as a .npy matrix plus a JSON sidecar and
+memory-mapped back, so large indexes load without reading every vector up front.
+"""
+
+import json
+import os
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row as float32; zero rows stay zero."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores along the last axis, best first."""
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=-1)
+
+class VectorIndex:
+    """Cosine-similarity index of fixed-dimension vectors keyed by id."""
+
+    def __init__(self, dimension: int, initial_capacity: int = 256):
+        self.dimension = dimension
+        self._matrix = np.zeros((initial_capacity, dimension), dtype=np.float32)
+        self._norms = np.zeros(initial_capacity, dtype=np.float32)
+        self._ids: List[Hashable] = []
+        self._payloads: List[Any] = []
+        self._rows: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._rows
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Normalized vectors currently in the index, one row per id."""
+        return self._matrix[:len(self._ids)]
+
+    def add(self, item_id: Hashable, vector: np.ndarray, payload: Any = None):
+        """Insert a vector, or replace it if the id is already indexed."""
+        self.add_many([item_id], np.atleast_2d(vector), [payload])
+
+    def add_many(self, item_ids: List[Hashable], vectors: np.ndarray, payloads: Optional[List[Any]] = None):
+        """Upsert a batch of vectors in one normalization pass."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)[:, None]
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-d vectors, got {vectors.shape[1]}-d")
+        payloads = payloads if payloads is not None else [None] * len(item_ids)
+
+        with self._lock:
+            self._ensure_capacity(len(self._ids) + len(item_ids))
+            for item_id, vector, norm, payload in zip(item_ids, vectors, norms, payloads):
+                row = self._rows.get(item_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._rows[item_id] = row
+                    self._ids.append(item_id)
+                    self._payloads.append(payload)
+                else:
+                    self._payloads[row] = payload
+                self._matrix[row] = vector
+                self._norms[row] = norm
+
+    def _ensure_capacity(self, size: int):
+        """Grow the matrix geometrically; a read-only memory map is copied on first write."""
+        if size > self._matrix.shape[0] or not self._matrix.flags.writeable:
+            grown = np.zeros((max(size, 2 * self._matrix.shape[0]), self.dimension), dtype=np.float32)
+            grown[:len(self._ids)] = self._matrix[:len(self._ids)]
+            self._matrix = grown
+        if size > len(self._norms):
+            norms = np.zeros(self._matrix.shape[0], dtype=np.float32)
+            norms[:len(self._ids)] = self._norms[:len(self._ids)]
+            self._norms = norms
+
+    def search(self, query: np.ndarray, k: int = 5) -> List[Tuple[Hashable, float, Any]]:
+        """The k most similar entries to one query as (id, cosine similarity, payload)."""
+        return self.search_batch(np.atleast_2d(query), k)[0]
+
+    def search_batch(self, queries: np.ndarray, k: int = 5) -> List[List[Tuple[Hashable, float, Any]]]:
+        """Top-k results for each row of a (Q, dimension) query matrix."""
+        queries = normalize_rows(queries)
+        with self._lock:
+            scores = queries @ self.matrix.T
+            best = top_k_indices(scores, k)
+            return [
+                [(self._ids[i], float(row_scores[i]), self._payloads[i]) for i in row_best]
+                for row_scores, row_best in zip(scores, best)
+            ]
+
+    def save(self, path: Union[str, Path], metadata: Optional[Dict[str, Any]] = None):
+        """
+        Write the matrix to <path>.npy and ids/payloads to <path>.json.
+
+        Payloads must be JSON-serializable. Files are replaced atomically, so
+        readers never see a half-written index.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            matrix = np.ascontiguousarray(self.matrix)
+            meta = {
+                "dimension": self.dimension,
+                "ids": list(self._ids),
+                "payloads": list(self._payloads),
+                "norms": self._norms[:len(self._ids)].tolist(),
+                "metadata": metadata or {}
+            }
+
+        matrix_path, meta_path = path.with_suffix(".npy"), path.with_suffix(".json")
+        with open(f"{matrix_path}.tmp", "wb") as f:
+            np.save(f, matrix)
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(f"{matrix_path}.tmp", matrix_path)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> Tuple["VectorIndex", Dict[str, Any]]:
+        """Load a saved index, memory-mapping its matrix; returns (index, saved metadata)."""
+        path = Path(path)
+        with open(path.with_suffix(".json")) as f:
+            meta = json.load(f)
+
+        index = cls(meta["dimension"], initial_capacity=0)
+        index._matrix = np.load(path.with_suffix(".npy"), mmap_mode="r" if mmap else None)
+        index._ids = meta["ids"]
+        index._payloads = meta["payloads"]
+        index._norms = np.asarray(meta.get("norms", np.ones(len(index._ids))), dtype=np.float32)
+        index._rows = {item_id: row for row, item_id in enumerate(index._ids)}
+        return index, meta.get("metadata", {})
+
+    @property
+    def ids(self) -> List[Hashable]:
+        return list(self._ids)
+
+    def payload(self, item_id: Hashable) -> Any:
+        return self._payloads[self._rows[item_id]]
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """Cosine similarity of one query against every indexed vector, in row order."""
+        return self.matrix @ normalize_rows(query)[0]
+
+    def distances(self, query: np.ndarray) -> np.ndarray:
+        """Euclidean distance from one query to every indexed vector as originally added, in row order."""
+        query = np.asarray(query, dtype=np.float32).ravel()
+        query_norm = np.linalg.norm(query)
+        norms = self._norms[:len(self._ids)]
+        # |q - v|^2 = |q|^2 + |v|^2 - 2 |q| |v| cos(q, v)
+        squared = query_norm ** 2 + norms ** 2 - 2.0 * query_norm * norms * self.scores(query)
+        return np.sqrt(np.maximum(squared, 0.0))
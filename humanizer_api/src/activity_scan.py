@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Conversation Activity Scan
+Fast metadata pass over Node Archive conversation files for prioritization.
+
+Only the handful of numbers activity scoring needs (timestamps, message and
+participant counts, word and vocabulary totals) are kept per file. Files are
+parsed with orjson when it is installed, spread across a process pool, and
+the results are cached by path, mtime and size, so re-analyzing an archive
+only parses the conversations that changed.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_SCAN_CACHE = os.getenv("ACTIVITY_SCAN_CACHE", "activity_scan_cache.db")
+
+# Bump when summarize_conversation changes so cached summaries are recomputed
+SCAN_VERSION = 1
+
+# Below this many uncached files, scanning inline beats starting a process pool
+MIN_PARALLEL_FILES = 64
+
+def load_json_file(path: Union[str, Path]) -> Any:
+    """Parse a JSON file with orjson when available (several times faster than json)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def summarize_conversation(conv_data: Dict[str, Any]) -> Dict[str, Any]:
+    """The activity-relevant counts of one conversation in Node Archive / OpenAI export form."""
+    message_count = 0
+    participants = set()
+    total_words = 0
+    vocabulary = set()
+
+    for node in (conv_data.get("mapping") or {}).values():
+        message = node.get("message")
+        if not message:
+            continue
+        message_count += 1
+        participants.add((message.get("author") or {}).get("role", "unknown"))
+
+        content = message.get("content") or {}
+        if content.get("content_type") == "text":
+            for part in content.get("parts") or []:
+                if isinstance(part, str):
+                    words = part.split()
+                    total_words += len(words)
+                    vocabulary.update(word.lower() for word in words if word.isalpha())
+
+    return {
+        "create_time": conv_data.get("create_time") or 0,
+        "update_time": conv_data.get("update_time") or 0,
+        "message_count": message_count,
+        "participants": sorted(participants),
+        "total_words": total_words,
+        "vocabulary_size": len(vocabulary)
+    }
+
+def _scan_file(path: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """Process-pool worker: (path, summary, error)."""
+    try:
+        return path, summarize_conversation(load_json_file(path)), None
+    except Exception as e:
+        return path, None, str(e)
+
+class ActivityScanCache:
+    """SQLite cache of conversation summaries keyed by path, valid while mtime and size match"""
+
+    def __init__(self, path: Union[str, Path] = ACTIVITY_SCAN_CACHE):
+        self.path = str(path)
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS activity_scan (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    summary TEXT NOT NULL
+                )
+            """)
+
+    def lookup(self, stats: Dict[str, Tuple[int, int]]) -> Dict[str, Dict[str, Any]]:
+        """Cached summaries for the paths whose (mtime_ns, size) still match."""
+        hits = {}
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            for path, mtime_ns, size, version, summary in conn.execute(
+                "SELECT path, mtime_ns, size, version, summary FROM activity_scan"
+            ):
+                if path in stats and stats[path] == (mtime_ns, size) and version == SCAN_VERSION:
+                    hits[path] = json.loads(summary)
+        return hits
+
+    def store(self, entries: Iterable[Tuple[str, int, int, Dict[str, Any]]]):
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO activity_scan (path, mtime_ns, size, version, summary) VALUES (?, ?, ?, ?, ?)",
+                [(path, mtime_ns, size, SCAN_VERSION, json.dumps(summary)) for path, mtime_ns, size, summary in entries]
+            )
+
+def scan_conversation_files(paths: List[Union[str, Path]], cache: Optional[ActivityScanCache] = None,
+                            max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Summaries of every readable conversation file, keyed by path string.
+
+    Each summary also carries "file_size". Unreadable files are logged and
+    left out, as the full-parse analysis did.
+    """
+    cache = cache or ActivityScanCache()
+    stats = {}
+    for path in map(str, paths):
+        try:
+            st = os.stat(path)
+            stats[path] = (st.st_mtime_ns, st.st_size)
+        except OSError as e:
+            logger.warning(f"Failed to stat {path}: {e}")
+
+    summaries = cache.lookup(stats)
+    misses = [path for path in stats if path not in summaries]
+
+    if misses:
+        if len(misses) >= MIN_PARALLEL_FILES:
+            workers = max_workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_scan_file, misses, chunksize=max(1, len(misses) // (workers * 4))))
+        else:
+            results = [_scan_file(path) for path in misses]
+
+        scanned = []
+        for path, summary, error in results:
+            if summary is None:
+                logger.warning(f"Failed to analyze {path}: {error}")
+                continue
+            summaries[path] = summary
+            scanned.append((path, *stats[path], summary))
+        cache.store(scanned)
+
+    for path, summary in summaries.items():
+        summary["file_size"] = stats[path][1]
+
+    logger.info(f"Activity scan: {len(stats)} files, {len(stats) - len(misses)} cached, {len(misses)} parsed")
+    return summaries
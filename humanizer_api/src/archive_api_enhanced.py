@@ -3,6 +3,7 @@ Enhanced Archive API with PostgreSQL Unified Backend
 Integrates the new unified archive schema for consolidated search across all archive sources
 """
 
+import os
 import logging
 import asyncio
 import json
@@ -13,9 +14,9 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional, Union
 from io import BytesIO
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, BackgroundTasks, Depends, Query, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, validator
 import httpx
 from sentence_transformers import SentenceTransformer
@@ -28,12 +29,16 @@ from archive_unified_schema import (
     UnifiedArchiveDB, 
     ArchiveContent, 
     SourceType, 
-    ContentType
+    ContentType,
+    encode_message_cursor,
+    decode_message_cursor
 )
 from node_archive_importer import NodeArchiveImporter
 from embedding_system import AdvancedEmbeddingSystem
 from smart_archive_processor import SmartArchiveProcessor
+from activity_scan import load_json_file
 from progress_tracker import get_progress_tracker, list_active_sessions, PersistentProgressTracker
+from job_queue import JobQueue, JobWorker, Job
 from config import get_config, HumanizerConfig
 
 # Setup logging
@@ -43,6 +48,10 @@ logger = logging.getLogger(__name__)
 # Configuration
 config = get_config()
 
+# Run a job worker inside the API process; set to 0 when job_worker.py processes run instead
+JOB_WORKER_EMBEDDED = os.getenv("JOB_WORKER_EMBEDDED", "1") == "1"
+JOB_WORKER_QUEUES = ["import", "smart"]
+
 # Pydantic Models for API
 class UnifiedSearchRequest(BaseModel):
     """Search request across all archive sources"""
@@ -96,6 +105,9 @@ app.add_middleware(
 # Global components
 archive_db: Optional[UnifiedArchiveDB] = None
 embedding_system: Optional[AdvancedEmbeddingSystem] = None
+job_queue: Optional[JobQueue] = None
+embedded_worker: Optional[JobWorker] = None
+embedded_worker_task: Optional[asyncio.Task] = None
 
 # WebSocket connection manager
 class ConnectionManager:
@@ -125,10 +137,28 @@ manager = ConnectionManager()
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database and advanced embedding system on startup"""
-    global archive_db, embedding_system
+    """Initialize components and, unless disabled, the embedded job worker"""
+    global embedded_worker, embedded_worker_task
+    
+    await init_components()
+    if JOB_WORKER_EMBEDDED:
+        embedded_worker = JobWorker(job_queue, JOB_HANDLERS, JOB_WORKER_QUEUES)
+        embedded_worker_task = asyncio.create_task(embedded_worker.run())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Hand running jobs back to the queue so the next worker picks them up"""
+    if embedded_worker:
+        embedded_worker.stop()
+        await embedded_worker_task
+
+async def init_components():
+    """Initialize database, advanced embedding system and job queue (shared with job_worker.py)"""
+    global archive_db, embedding_system, job_queue
     
     try:
+        job_queue = JobQueue()
+        
         # Initialize database
         database_url = config.get_database_url()
         if "postgresql" in database_url:
@@ -284,9 +314,56 @@ async def get_conversation_thread(parent_id: int, include_metadata: bool = Query
         logger.error(f"Error getting conversation thread: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/conversation/{parent_id}/messages")
+async def get_conversation_messages(
+    parent_id: int,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    include_body: bool = Query(True),
+    max_body_chars: Optional[int] = Query(None, ge=1, description="Truncate bodies to this many characters")
+):
+    """Page through a conversation in (timestamp, id) order with keyset cursors"""
+    if not archive_db:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    
+    try:
+        after = decode_message_cursor(cursor) if cursor else None
+        messages = await asyncio.to_thread(
+            archive_db.get_conversation_messages, parent_id, after, limit,
+            include_body=include_body, max_body_chars=max_body_chars
+        )
+        
+        next_cursor = None
+        if len(messages) == limit:
+            next_cursor = encode_message_cursor(messages[-1]["timestamp"], messages[-1]["id"])
+        for message in messages:
+            message["timestamp"] = message["timestamp"].isoformat() if message["timestamp"] else None
+        
+        return {
+            "parent_id": parent_id,
+            "messages": messages,
+            "next_cursor": next_cursor
+        }
+        
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    except Exception as e:
+        logger.error(f"Error paging conversation messages: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/content/{content_id}/body")
+async def get_content_body(content_id: int):
+    """Full body of one message, for clients that paged with include_body=false or truncation"""
+    if not archive_db:
+        raise HTTPException(status_code=500, detail="Database not initialized")
+    
+    body = await asyncio.to_thread(archive_db.get_message_body, content_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+    return {"id": content_id, "body_text": body}
+
 @app.post("/import/node-archive")
 async def import_node_archive(
-    background_tasks: BackgroundTasks,
     node_archive_path: str = Form(...),
     max_conversations: Optional[int] = Form(None)
 ):
@@ -298,22 +375,22 @@ async def import_node_archive(
     if not Path(node_archive_path).exists():
         raise HTTPException(status_code=400, detail=f"Archive path not found: {node_archive_path}")
     
-    # Start background import
-    background_tasks.add_task(
-        _import_node_archive_task,
-        node_archive_path,
-        max_conversations
-    )
+    # Queue the import; a job worker runs it
+    job_id = job_queue.enqueue("import", "import_node_archive", {
+        "node_archive_path": node_archive_path,
+        "max_conversations": max_conversations
+    })
     
     return {
-        "message": "Node Archive import started",
+        "message": "Node Archive import queued",
         "archive_path": node_archive_path,
         "max_conversations": max_conversations,
-        "status": "started"
+        "job_id": job_id,
+        "status": "queued"
     }
 
-async def _import_node_archive_task(node_archive_path: str, max_conversations: Optional[int]):
-    """Background task to import Node Archive"""
+def _import_node_archive_task(node_archive_path: str, max_conversations: Optional[int]):
+    """Import a Node Archive (synchronous; the job handler runs it on a worker thread)"""
     try:
         logger.info(f"Starting Node Archive import from: {node_archive_path}")
         
@@ -321,40 +398,39 @@ async def _import_node_archive_task(node_archive_path: str, max_conversations: O
         stats = importer.import_all_conversations(max_conversations=max_conversations)
         
         logger.info(f"Node Archive import completed: {stats}")
-        
-        # Store import results (could be stored in DB for retrieval)
-        # For now, just log
+        return stats
         
     except Exception as e:
         logger.error(f"Node Archive import failed: {e}")
+        raise
 
 @app.post("/import/generic")
-async def import_generic_content(request: ContentImportRequest, background_tasks: BackgroundTasks):
+async def import_generic_content(request: ContentImportRequest):
     """Import content from various generic sources"""
     if not archive_db:
         raise HTTPException(status_code=500, detail="Database not initialized")
     
-    background_tasks.add_task(
-        _import_generic_content_task,
-        request.source_type,
-        request.source_path,
-        request.max_items,
-        request.overwrite_existing
-    )
+    job_id = job_queue.enqueue("import", "import_generic", {
+        "source_type": request.source_type,
+        "source_path": request.source_path,
+        "max_items": request.max_items,
+        "overwrite_existing": request.overwrite_existing
+    })
     
     return {
-        "message": f"Import started for {request.source_type}",
+        "message": f"Import queued for {request.source_type}",
         "source_path": request.source_path,
-        "status": "started"
+        "job_id": job_id,
+        "status": "queued"
     }
 
-async def _import_generic_content_task(
+def _import_generic_content_task(
     source_type: str, 
     source_path: str, 
     max_items: Optional[int],
     overwrite_existing: bool
 ):
-    """Background task for generic content import"""
+    """Generic content import (synchronous; the job handler runs it on a worker thread)"""
     try:
         logger.info(f"Starting {source_type} import from: {source_path}")
         
@@ -364,11 +440,13 @@ async def _import_generic_content_task(
             importer = NodeArchiveImporter(archive_db, source_path)
             stats = importer.import_all_conversations(max_conversations=max_items)
             logger.info(f"Import completed: {stats}")
+            return stats
         else:
             logger.warning(f"Unsupported source type: {source_type}")
         
     except Exception as e:
         logger.error(f"Generic import failed: {e}")
+        raise
 
 @app.put("/content/{content_id}/processing-status")
 async def update_processing_status(content_id: int, update: ProcessingStatusUpdate):
@@ -418,6 +496,7 @@ async def generate_content_embedding(content_id: int):
             content.semantic_vector = json.dumps(embedding)
             content.processing_status = "embedded"
             session.commit()
+        archive_db.invalidate_statistics()
         
         return {
             "message": "Embedding generated successfully",
@@ -456,14 +535,54 @@ async def list_archive_sources():
         logger.error(f"Error listing sources: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _export_ndjson(parent_id: int):
+    """One JSON object per line: a header, then each message as it is read"""
+    yield json.dumps({
+        "conversation_id": parent_id,
+        "exported_at": datetime.now(timezone.utc).isoformat()
+    }) + "\n"
+    for msg in archive_db.iter_conversation_messages(parent_id):
+        yield json.dumps({
+            "id": msg["id"],
+            "author": msg["author"],
+            "role": msg["role"],
+            "timestamp": msg["timestamp"].isoformat() if msg["timestamp"] else None,
+            "content": msg["body_text"]
+        }, default=str) + "\n"
+
+def _export_markdown(parent_id: int):
+    """Markdown transcript, one section per message, written as messages are read"""
+    yield f"# Conversation {parent_id}\n\n_Exported {datetime.now(timezone.utc).isoformat()}_\n\n"
+    for msg in archive_db.iter_conversation_messages(parent_id):
+        timestamp = msg["timestamp"].strftime("%Y-%m-%d %H:%M:%S") if msg["timestamp"] else "Unknown"
+        yield f"## {msg['role'] or msg['author']} — {timestamp}\n\n{msg['body_text'] or ''}\n\n"
+
 @app.get("/export/conversation/{parent_id}")
 async def export_conversation(parent_id: int, format: str = Query("json")):
-    """Export a conversation in various formats"""
+    """
+    Export a conversation in various formats
+    
+    "ndjson" and "markdown" stream the thread page by page; "json" and "text"
+    build the whole export as one response.
+    """
     if not archive_db:
         raise HTTPException(status_code=500, detail="Database not initialized")
     
+    if format in ("ndjson", "markdown"):
+        generator, media_type, extension = {
+            "ndjson": (_export_ndjson, "application/x-ndjson", "ndjson"),
+            "markdown": (_export_markdown, "text/markdown; charset=utf-8", "md")
+        }[format]
+        # Sync generator: Starlette iterates it in a worker thread
+        return StreamingResponse(
+            generator(parent_id),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="conversation_{parent_id}.{extension}"'}
+        )
+    
     try:
-        messages = archive_db.get_conversation_thread(parent_id)
+        # The json export carries each message's full source_metadata, as it always has
+        messages = list(archive_db.iter_conversation_messages(parent_id, include_metadata=(format == "json")))
         
         if format == "json":
             export_data = {
@@ -472,11 +591,11 @@ async def export_conversation(parent_id: int, format: str = Query("json")):
                 "message_count": len(messages),
                 "messages": [
                     {
-                        "id": msg.id,
-                        "author": msg.author,
-                        "timestamp": msg.timestamp.isoformat() if msg.timestamp else None,
-                        "content": msg.body_text,
-                        "metadata": msg.source_metadata
+                        "id": msg["id"],
+                        "author": msg["author"],
+                        "timestamp": msg["timestamp"].isoformat() if msg["timestamp"] else None,
+                        "content": msg["body_text"],
+                        "metadata": msg["source_metadata"]
                     }
                     for msg in messages
                 ]
@@ -487,14 +606,16 @@ async def export_conversation(parent_id: int, format: str = Query("json")):
             # Simple text format
             lines = [f"Conversation Export - {datetime.now(timezone.utc).isoformat()}", ""]
             for msg in messages:
-                timestamp = msg.timestamp.strftime("%Y-%m-%d %H:%M:%S") if msg.timestamp else "Unknown"
-                lines.append(f"[{timestamp}] {msg.author}: {msg.body_text}")
+                timestamp = msg["timestamp"].strftime("%Y-%m-%d %H:%M:%S") if msg["timestamp"] else "Unknown"
+                lines.append(f"[{timestamp}] {msg['author']}: {msg['body_text']}")
             
             return {"text_export": "\\n".join(lines)}
         
         else:
             raise HTTPException(status_code=400, detail="Unsupported export format")
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error exporting conversation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -561,20 +682,19 @@ async def analyze_archive_activity():
 @app.post("/smart-processing/process")
 async def start_smart_processing(
     max_conversations: Optional[int] = Query(None, description="Limit conversations for testing"),
-    node_archive_path: Optional[str] = Query("/Users/tem/nab/exploded_archive_node", description="Path to Node Archive"),
-    background_tasks: BackgroundTasks = None
+    node_archive_path: Optional[str] = Query("/Users/tem/nab/exploded_archive_node", description="Path to Node Archive")
 ):
-    """Start smart archive processing with activity-aware prioritization and embedding generation"""
+    """Queue smart archive processing: one job per conversation, ordered by activity-aware priority"""
     try:
         processor = SmartArchiveProcessor(config.get_database_url(), node_archive_path)
-        await processor.initialize()
-        
-        # Start processing (could be made async with background_tasks)
-        results = await processor.process_archive_smart(max_conversations)
+        analysis = await processor.analyze_archive_activity()
+        queued = processor.enqueue_jobs(job_queue, max_conversations=max_conversations)
         
         return {
-            "status": "completed",
-            "results": results,
+            "status": "queued",
+            "jobs_queued": queued,
+            "total_conversations": analysis["total_conversations"],
+            "activity_distribution": analysis["activity_distribution"],
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
         
@@ -619,6 +739,15 @@ async def get_embedding_statistics():
     
     try:
         stats = embedding_system.get_statistics()
+        if archive_db:
+            # Stored counts come from the cached archive snapshot, not a table scan
+            archive_stats = archive_db.get_statistics()
+            stats["archive_embeddings"] = {
+                "total_embeddings": archive_stats["total_embeddings"],
+                "by_content_type": archive_stats["embeddings_by_content_type"],
+                "total_chunks": archive_stats["total_chunks"],
+                "embedded_chunks": archive_stats["embedded_chunks"]
+            }
         return {
             "status": "success",
             "statistics": stats,
@@ -663,6 +792,9 @@ async def process_content_embeddings(content_id: int):
 async def websocket_progress(websocket: WebSocket, session_id: str):
     """WebSocket endpoint for real-time progress updates"""
     await manager.connect(websocket)
+    tracker = None
+    subscription = None
+    forward_task = None
     
     try:
         # Get or create progress tracker
@@ -675,17 +807,22 @@ async def websocket_progress(websocket: WebSocket, session_id: str):
             "data": initial_progress
         }))
         
-        # Subscribe to progress updates
-        async def progress_callback(progress):
-            try:
-                await websocket.send_text(json.dumps({
-                    "type": "progress_update", 
-                    "data": tracker.get_progress_summary()
-                }))
-            except:
-                pass  # Connection closed
+        # Subscribe to rate-limited progress deltas; each message also carries the full summary
+        subscription = tracker.subscribe_deltas()
         
-        tracker.subscribe(progress_callback)
+        async def forward_progress():
+            while True:
+                changes = await subscription.get()
+                try:
+                    await websocket.send_text(json.dumps({
+                        "type": "progress_update", 
+                        "data": tracker.get_progress_summary(),
+                        "changes": changes
+                    }, default=str))
+                except Exception:
+                    return  # Connection closed
+        
+        forward_task = asyncio.create_task(forward_progress())
         
         # Keep connection alive and listen for client messages
         while True:
@@ -710,6 +847,10 @@ async def websocket_progress(websocket: WebSocket, session_id: str):
     except Exception as e:
         logger.error(f"WebSocket connection error: {e}")
     finally:
+        if forward_task:
+            forward_task.cancel()
+        if tracker and subscription:
+            tracker.unsubscribe(subscription)
         manager.disconnect(websocket)
 
 @app.get("/progress/sessions")
@@ -759,7 +900,6 @@ async def cleanup_progress(session_id: str):
 # File upload endpoint for archive selection
 @app.post("/upload-archive")
 async def upload_archive(
-    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     archive_type: str = Form(...),
     max_conversations: Optional[int] = Form(None)
@@ -843,20 +983,22 @@ async def upload_archive(
         # Analyze the uploaded archive
         analysis = await analyze_uploaded_archive(archive_path, conversations_file)
         
-        # Start processing in background
-        background_tasks.add_task(
-            run_archive_upload_processing,
-            tracker,
-            archive_path,
-            archive_type,
-            max_conversations,
-            temp_dir,
-            analysis
-        )
+        # Queue processing; the upload stays in temp_dir until a worker picks it up.
+        # Failures are reported through the tracker, so only a crashed worker
+        # (expired lease) leads to a second attempt.
+        job_id = job_queue.enqueue("import", "archive_upload", {
+            "session_id": session_id,
+            "archive_path": archive_path,
+            "archive_type": archive_type,
+            "max_conversations": max_conversations,
+            "temp_dir": str(temp_dir),
+            "analysis": analysis
+        }, priority=8, max_attempts=2)
         
         return {
             "status": "started",
             "session_id": session_id,
+            "job_id": job_id,
             "websocket_url": f"/ws/progress/{session_id}",
             "progress_url": f"/progress/{session_id}",
             "message": "Archive upload processing started",
@@ -907,9 +1049,9 @@ async def analyze_uploaded_archive(archive_path: str, conversations_file: Path)
         
         # Analyze conversations.json
         try:
-            with open(conversations_file, 'r', encoding='utf-8') as f:
-                conversations_data = json.load(f)
-                
+            # orjson when available, off the event loop: exports can be hundreds of MB
+            conversations_data = await asyncio.to_thread(load_json_file, conversations_file)
+            
             if isinstance(conversations_data, list):
                 analysis["conversations_found"] = len(conversations_data)
                 analysis["archive_type"] = "openai_export"
@@ -957,7 +1099,7 @@ async def run_archive_upload_processing(
     archive_path: str,
     archive_type: str,
     max_conversations: Optional[int],
-    temp_dir: Path,
+    temp_dir: Union[str, Path],
     analysis: Dict[str, Any]
 ):
     """Process uploaded archive with progress tracking"""
@@ -1067,8 +1209,7 @@ async def run_archive_upload_processing(
 @app.post("/smart-processing/start")
 async def start_smart_processing_with_progress(
     max_conversations: Optional[int] = Query(None, description="Limit conversations for testing"),
-    node_archive_path: Optional[str] = Query("/Users/tem/nab/exploded_archive_node", description="Path to Node Archive"),
-    background_tasks: BackgroundTasks = None
+    node_archive_path: Optional[str] = Query("/Users/tem/nab/exploded_archive_node", description="Path to Node Archive")
 ):
     """Start smart archive processing with real-time progress tracking"""
     try:
@@ -1076,17 +1217,17 @@ async def start_smart_processing_with_progress(
         tracker = get_progress_tracker()
         session_id = tracker.session_id
         
-        # Start the processing in background
-        background_tasks.add_task(
-            run_smart_processing_with_progress,
-            tracker,
-            node_archive_path,
-            max_conversations
-        )
+        # Queue the processing run; a job worker runs it
+        job_id = job_queue.enqueue("smart", "smart_processing", {
+            "session_id": session_id,
+            "node_archive_path": node_archive_path,
+            "max_conversations": max_conversations
+        }, max_attempts=2)
         
         return {
             "status": "started",
             "session_id": session_id,
+            "job_id": job_id,
             "websocket_url": f"/ws/progress/{session_id}",
             "progress_url": f"/progress/{session_id}",
             "message": "Processing started in background"
@@ -1210,6 +1351,91 @@ async def process_single_job_with_progress(processor, job, tracker):
         logger.error(f"Job processing failed: {e}")
         return None
 
+# Durable job queue: handlers run by the embedded worker or job_worker.py
+_smart_processors: Dict[str, SmartArchiveProcessor] = {}
+
+async def _smart_processor(node_archive_path: str) -> SmartArchiveProcessor:
+    """Initialized processor per archive path, reused across the per-conversation jobs"""
+    if node_archive_path not in _smart_processors:
+        processor = SmartArchiveProcessor(config.get_database_url(), node_archive_path)
+        await processor.initialize()
+        _smart_processors[node_archive_path] = processor
+    return _smart_processors[node_archive_path]
+
+# The importers are synchronous; run them on a worker thread so the API loop stays responsive
+async def _run_import_node_archive_job(job: Job):
+    payload = job.payload
+    return await asyncio.to_thread(
+        _import_node_archive_task, payload["node_archive_path"], payload["max_conversations"]
+    )
+
+async def _run_import_generic_job(job: Job):
+    payload = job.payload
+    return await asyncio.to_thread(
+        _import_generic_content_task,
+        payload["source_type"], payload["source_path"], payload["max_items"], payload["overwrite_existing"]
+    )
+
+async def _run_archive_upload_job(job: Job):
+    payload = job.payload
+    await run_archive_upload_processing(
+        get_progress_tracker(payload["session_id"]),
+        payload["archive_path"],
+        payload["archive_type"],
+        payload["max_conversations"],
+        Path(payload["temp_dir"]),
+        payload["analysis"]
+    )
+    return {"session_id": payload["session_id"]}
+
+async def _run_smart_processing_job(job: Job):
+    payload = job.payload
+    await run_smart_processing_with_progress(
+        get_progress_tracker(payload["session_id"]),
+        payload["node_archive_path"],
+        payload["max_conversations"]
+    )
+    return {"session_id": payload["session_id"]}
+
+async def _run_smart_import_job(job: Job):
+    processor = await _smart_processor(job.payload["node_archive_path"])
+    return await processor.run_queued_job(job.id, job.payload)
+
+JOB_HANDLERS = {
+    "import_node_archive": _run_import_node_archive_job,
+    "import_generic": _run_import_generic_job,
+    "archive_upload": _run_archive_upload_job,
+    "smart_processing": _run_smart_processing_job,
+    "smart_import": _run_smart_import_job,
+}
+
+@app.get("/jobs")
+async def list_jobs(
+    queue: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """Queued, running and finished background jobs"""
+    jobs = await asyncio.to_thread(job_queue.list_jobs, queue, status, None, limit)
+    return {
+        "jobs": [job.to_dict() for job in jobs],
+        "counts": await asyncio.to_thread(job_queue.counts, queue)
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a job that has not started yet"""
+    if not await asyncio.to_thread(job_queue.cancel, job_id):
+        raise HTTPException(status_code=409, detail="Job is not pending")
+    return {"job_id": job_id, "status": "cancelled"}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
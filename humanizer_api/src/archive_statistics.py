@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Archive Statistics Snapshot
+Content, chunk and embedding counters for the dashboards, computed in one pass
+over archived_content (plus one over content_chunks) and served from a cached
+snapshot.
+
+This is the single statistics service: the upload server reads it over
+asyncpg and UnifiedArchiveDB over its SQLAlchemy engine, but both run the
+same queries, build the same snapshot and share StatisticsCache.
+
+Polls read the snapshot from memory. Once it is older than the TTL, or after
+an import or embedding run invalidates it, the next poll still returns the
+previous snapshot and starts a single background recompute, so request
+latency never includes a table scan.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Seconds a snapshot is served before it is recomputed in the background
+STATISTICS_TTL = float(os.getenv("ARCHIVE_STATISTICS_TTL", "30"))
+
+# GROUPING(source_type, content_type, processing_status) tells the sets apart:
+# 7 = grand total, 3 = per source type, 5 = per content type, 6 = per processing status
+STATISTICS_SQL = """
+    SELECT
+        GROUPING(source_type, content_type, processing_status) AS grouping_set,
+        source_type,
+        content_type,
+        processing_status,
+        COUNT(*) AS items,
+        COUNT(semantic_vector) AS embeddings,
+        COALESCE(SUM(word_count), 0) AS words,
+        AVG(content_quality_score) AS avg_quality
+    FROM archived_content
+    GROUP BY GROUPING SETS ((), (source_type), (content_type), (processing_status))
+"""
+
+# content_chunks only exists once hierarchical chunking has been set up
+CHUNK_TABLE_EXISTS_SQL = "SELECT to_regclass('content_chunks') IS NOT NULL"
+
+CHUNK_STATISTICS_SQL = """
+    SELECT COUNT(*) AS chunks, COUNT(embedding) AS embedded_chunks
+    FROM content_chunks
+"""
+
+def build_snapshot(rows: Iterable[Any], chunks: Optional[Any] = None) -> Dict[str, Any]:
+    """Snapshot from the STATISTICS_SQL rows and, if the table exists, the CHUNK_STATISTICS_SQL row."""
+    snapshot = {
+        "total_content": 0,
+        "total_embeddings": 0,
+        "total_words": 0,
+        "average_quality": 0.0,
+        "by_content_type": {},
+        "by_source_type": {},
+        "by_processing_status": {},
+        "embeddings_by_content_type": {},
+        "total_chunks": 0,
+        "embedded_chunks": 0
+    }
+
+    for row in rows:
+        if row["grouping_set"] == 7:
+            snapshot["total_content"] = row["items"]
+            snapshot["total_embeddings"] = row["embeddings"]
+            snapshot["total_words"] = int(row["words"])
+            snapshot["average_quality"] = float(row["avg_quality"]) if row["avg_quality"] else 0.0
+        elif row["grouping_set"] == 3:
+            snapshot["by_source_type"][row["source_type"]] = row["items"]
+        elif row["grouping_set"] == 5:
+            snapshot["by_content_type"][row["content_type"]] = row["items"]
+            snapshot["embeddings_by_content_type"][row["content_type"]] = row["embeddings"]
+        else:
+            snapshot["by_processing_status"][row["processing_status"]] = row["items"]
+
+    if chunks is not None:
+        snapshot["total_chunks"] = chunks["chunks"]
+        snapshot["embedded_chunks"] = chunks["embedded_chunks"]
+
+    snapshot["computed_at"] = datetime.now(timezone.utc).isoformat()
+    return snapshot
+
+async def compute_statistics(conn) -> Dict[str, Any]:
+    """All dashboard counters over an asyncpg connection."""
+    rows = await conn.fetch(STATISTICS_SQL)
+    chunks = None
+    if await conn.fetchval(CHUNK_TABLE_EXISTS_SQL):
+        chunks = await conn.fetchrow(CHUNK_STATISTICS_SQL)
+    return build_snapshot(rows, chunks)
+
+class StatisticsCache:
+    """
+    Stale-while-revalidate holder for the statistics snapshot.
+
+    `compute` produces a fresh snapshot and is only called when a recompute
+    is actually needed. Asyncio callers pass a coroutine function and read
+    with `get`; threaded callers pass a plain function and read with
+    `get_blocking`.
+    """
+
+    def __init__(self, compute: Callable[[], Union[Dict[str, Any], Awaitable[Dict[str, Any]]]],
+                 ttl: float = STATISTICS_TTL):
+        self.compute = compute
+        self.ttl = ttl
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._computed_at = 0.0
+        self._stale = True
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._first_read = threading.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+
+    def invalidate(self):
+        """Mark the snapshot stale; the next read schedules a recompute."""
+        self._stale = True
+
+    @property
+    def age(self) -> Optional[float]:
+        return time.monotonic() - self._computed_at if self._snapshot is not None else None
+
+    def _begin_refresh(self) -> bool:
+        """Claim the single recompute if the snapshot has expired and none is running."""
+        with self._lock:
+            expired = self._stale or time.monotonic() - self._computed_at > self.ttl
+            if not expired or self._refreshing:
+                return False
+            self._refreshing = True
+            self._stale = False
+            return True
+
+    def _store(self, snapshot: Dict[str, Any], started: float):
+        with self._lock:
+            self._snapshot = snapshot
+            self._computed_at = started
+            self._refreshing = False
+        logger.debug(f"Statistics snapshot recomputed in {time.monotonic() - started:.3f}s")
+
+    def _refresh_failed(self) -> bool:
+        """Record a failed recompute (called from its except block); True if there is no snapshot to serve."""
+        with self._lock:
+            self._refreshing = False
+            self._stale = True
+            if self._snapshot is None:
+                return True
+        logger.exception("Statistics recompute failed; serving previous snapshot")
+        return False
+
+    async def get(self) -> Dict[str, Any]:
+        """Current snapshot; only the very first call waits for the database."""
+        if self._begin_refresh():
+            self._refresh = asyncio.create_task(self._recompute_async())
+        if self._snapshot is None:
+            await asyncio.shield(self._refresh)
+        return self._snapshot
+
+    async def _recompute_async(self):
+        started = time.monotonic()
+        try:
+            snapshot = await self.compute()
+        except Exception:
+            # Keep serving the previous snapshot and retry on the next read
+            if self._refresh_failed():
+                raise
+            return
+        self._store(snapshot, started)
+
+    def get_blocking(self) -> Dict[str, Any]:
+        """Current snapshot for threaded callers; only the first read waits for the database."""
+        if self._snapshot is None:
+            with self._first_read:
+                if self._snapshot is None:
+                    self._begin_refresh()
+                    self._recompute_blocking()
+            return self._snapshot
+        if self._begin_refresh():
+            threading.Thread(target=self._recompute_blocking, daemon=True).start()
+        return self._snapshot
+
+    def _recompute_blocking(self):
+        started = time.monotonic()
+        try:
+            snapshot = self.compute()
+        except Exception:
+            if self._refresh_failed():
+                raise
+            return
+        self._store(snapshot, started)
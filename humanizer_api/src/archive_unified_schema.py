@@ -5,10 +5,11 @@ Consolidates all archive sources into a single searchable database
 
 import os
 import json
+import base64
 import logging
 import asyncio
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Iterator, Tuple, Union
 from pathlib import Path
 from dataclasses import dataclass, field
 from enum import Enum
@@ -20,13 +21,29 @@ import asyncpg
 import numpy as np
 from pydantic import BaseModel, Field
 from sqlalchemy import create_engine, text, MetaData, Table, Column, BigInteger, String, Text, DateTime, Float, Boolean, JSON
+from sqlalchemy import and_, or_, func, literal
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from pgvector.sqlalchemy import Vector
 
+from archive_statistics import (StatisticsCache, build_snapshot, STATISTICS_SQL,
+                                CHUNK_TABLE_EXISTS_SQL, CHUNK_STATISTICS_SQL)
+
 Base = declarative_base()
 
+# Messages read per round trip when paging through or streaming a conversation
+MESSAGE_PAGE_SIZE = 500
+
+def encode_message_cursor(timestamp: Optional[datetime], message_id: int) -> str:
+    """Opaque keyset cursor for the (timestamp, id) a page of messages ended on."""
+    value = [timestamp.isoformat() if timestamp else None, message_id]
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+def decode_message_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    timestamp, message_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return (datetime.fromisoformat(timestamp) if timestamp else None), int(message_id)
+
 class SourceType(str, Enum):
     """Types of archive sources"""
     NODE_CONVERSATION = "node_conversation"
@@ -129,6 +146,9 @@ class UnifiedArchiveDB:
         self.engine = create_engine(database_url)
         self.SessionLocal = sessionmaker(bind=self.engine)
         
+        # Cached get_statistics snapshot, refreshed in the background once stale
+        self._statistics = StatisticsCache(self._compute_statistics)
+        
     async def create_tables(self):
         """Create all archive tables"""
         Base.metadata.create_all(bind=self.engine)
@@ -194,6 +214,7 @@ class UnifiedArchiveDB:
             session.add(orm_content)
             session.commit()
             session.refresh(orm_content)
+            self.invalidate_statistics()
             return orm_content.id
     
     def batch_insert_content(self, contents: List[ArchiveContent]) -> List[int]:
@@ -219,6 +240,7 @@ class UnifiedArchiveDB:
             
             session.add_all(orm_contents)
             session.commit()
+            self.invalidate_statistics()
             
             return [content.id for content in orm_contents]
     
@@ -275,6 +297,75 @@ class UnifiedArchiveDB:
             
             return [self._orm_to_dataclass(result) for result in results]
     
+    def get_conversation_messages(
+        self,
+        parent_id: int,
+        after: Optional[Tuple[Optional[datetime], int]] = None,
+        limit: int = MESSAGE_PAGE_SIZE,
+        include_body: bool = True,
+        max_body_chars: Optional[int] = None,
+        include_metadata: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        One page of a thread in (timestamp, id) order, starting after the `after` key.
+        
+        Only the columns a reader needs are selected; role and create_time are
+        extracted from source_metadata by PostgreSQL rather than decoding the
+        whole document per row. Bodies can be truncated to `max_body_chars` or
+        skipped entirely and fetched later with get_message_body. The full
+        source_metadata document is only selected with include_metadata.
+        """
+        m = ArchiveContentORM
+        columns = [
+            m.id, m.source_id, m.author, m.timestamp, m.word_count,
+            m.source_metadata["role"].astext.label("role"),
+            m.source_metadata["create_time"].label("create_time")
+        ]
+        if include_body and max_body_chars:
+            columns += [
+                func.substr(m.body_text, 1, max_body_chars).label("body_text"),
+                (func.length(m.body_text) > max_body_chars).label("body_truncated")
+            ]
+        elif include_body:
+            columns += [m.body_text, literal(False).label("body_truncated")]
+        if include_metadata:
+            columns.append(m.source_metadata)
+        
+        with self.SessionLocal() as session:
+            query = session.query(*columns).filter(m.parent_id == parent_id)
+            
+            if after is not None:
+                after_timestamp, after_id = after
+                if after_timestamp is None:
+                    # Inside the trailing group of messages without timestamps
+                    query = query.filter(and_(m.timestamp.is_(None), m.id > after_id))
+                else:
+                    query = query.filter(or_(
+                        m.timestamp > after_timestamp,
+                        and_(m.timestamp == after_timestamp, m.id > after_id),
+                        m.timestamp.is_(None)
+                    ))
+            
+            rows = query.order_by(m.timestamp.asc().nulls_last(), m.id.asc()).limit(limit).all()
+            return [dict(row._mapping) for row in rows]
+    
+    def iter_conversation_messages(self, parent_id: int, batch_size: int = MESSAGE_PAGE_SIZE,
+                                   **projection) -> Iterator[Dict[str, Any]]:
+        """Stream a whole thread page by page; only one page is held in memory at a time."""
+        after = None
+        while True:
+            page = self.get_conversation_messages(parent_id, after, batch_size, **projection)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after = (page[-1]["timestamp"], page[-1]["id"])
+    
+    def get_message_body(self, message_id: int) -> Optional[str]:
+        """Full body of one message, for readers that paged without bodies"""
+        with self.SessionLocal() as session:
+            row = session.query(ArchiveContentORM.body_text).filter(ArchiveContentORM.id == message_id).first()
+            return row[0] if row else None
+    
     def update_processing_status(self, content_id: int, status: str, attributes: Dict[str, Any] = None, quality_score: float = None):
         """Update AI processing results"""
         with self.SessionLocal() as session:
@@ -287,36 +378,31 @@ class UnifiedArchiveDB:
                     content.content_quality_score = quality_score
                 content.updated_at = datetime.now(timezone.utc)
                 session.commit()
+                self.invalidate_statistics()
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Get archive statistics"""
-        with self.SessionLocal() as session:
-            total_count = session.query(ArchiveContentORM).count()
-            
-            # Count by source type
-            source_counts = session.query(
-                ArchiveContentORM.source_type,
-                session.query().count()
-            ).group_by(ArchiveContentORM.source_type).all()
-            
-            # Count by content type
-            content_counts = session.query(
-                ArchiveContentORM.content_type,
-                session.query().count()
-            ).group_by(ArchiveContentORM.content_type).all()
-            
-            # Processing status
-            processing_counts = session.query(
-                ArchiveContentORM.processing_status,
-                session.query().count()
-            ).group_by(ArchiveContentORM.processing_status).all()
-            
-            return {
-                "total_content": total_count,
-                "by_source_type": dict(source_counts),
-                "by_content_type": dict(content_counts),
-                "by_processing_status": dict(processing_counts)
-            }
+        """
+        Get archive statistics
+        
+        Served from the shared archive_statistics snapshot: once it is older
+        than ARCHIVE_STATISTICS_TTL or has been invalidated by a write, callers
+        keep getting the previous snapshot while one background thread
+        recomputes it; only the first call ever waits for the database.
+        """
+        return self._statistics.get_blocking()
+    
+    def invalidate_statistics(self):
+        """Mark the statistics snapshot stale after imports or embedding updates"""
+        self._statistics.invalidate()
+    
+    def _compute_statistics(self) -> Dict[str, Any]:
+        """Every counter from one grouped scan of archived_content, plus content_chunks if present"""
+        with self.engine.connect() as conn:
+            rows = conn.execute(text(STATISTICS_SQL)).mappings().all()
+            chunks = None
+            if conn.execute(text(CHUNK_TABLE_EXISTS_SQL)).scalar():
+                chunks = conn.execute(text(CHUNK_STATISTICS_SQL)).mappings().one()
+        return build_snapshot(rows, chunks)
     
     def _orm_to_dataclass(self, orm_obj: ArchiveContentORM) -> ArchiveContent:
         """Convert ORM object to dataclass"""
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Durable Job Queue
+SQLite-backed queue for archive imports, uploads, smart processing and
+transformations, so background work survives API restarts and can run in
+separate worker processes.
+
+- Jobs are claimed in priority order, then activity score (the same
+  ordering SmartArchiveProcessor uses), then age.
+- A claim is a lease: workers heartbeat while a job runs, and a job whose
+  lease expires (its worker died) is handed to the next worker.
+- Failures are retried with exponential backoff until max_attempts.
+- Each queue has a concurrency limit that holds across all workers, since
+  running leases are counted in the database at claim time.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "job_queue.db")
+
+# Seconds a claim stays valid without a heartbeat
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+
+# Retry delay doubles per attempt from the base, up to the cap (with jitter)
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "600"))
+
+# Jobs of one queue running at once across all workers; override with
+# JOB_QUEUE_CONCURRENCY="import=1,smart=4"
+DEFAULT_QUEUE_CONCURRENCY = {"import": 1, "smart": 2, "embed": 2, "transform": 2}
+
+def _parse_concurrency(value: str) -> Dict[str, int]:
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        queue, _, limit = item.partition("=")
+        limits[queue.strip()] = int(limit)
+    return limits
+
+QUEUE_CONCURRENCY = {**DEFAULT_QUEUE_CONCURRENCY, **_parse_concurrency(os.getenv("JOB_QUEUE_CONCURRENCY", ""))}
+
+JOB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    job_type TEXT NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 5,
+    activity_score REAL NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_after REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    result TEXT,
+    progress TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    started_at REAL,
+    completed_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_claim
+    ON jobs(queue, status, priority DESC, activity_score DESC, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(queue, status, lease_expires);
+"""
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before retry number `attempts`, with jitter so retries spread out."""
+    delay = min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+@dataclass
+class Job:
+    """One queued unit of work"""
+    id: str
+    queue: str
+    job_type: str
+    payload: Dict[str, Any]
+    priority: int
+    activity_score: float
+    status: str  # "pending", "running", "completed", "failed", "cancelled"
+    attempts: int
+    max_attempts: int
+    run_after: float
+    lease_owner: Optional[str]
+    lease_expires: Optional[float]
+    last_error: Optional[str]
+    result: Optional[Any]
+    progress: Optional[Any]
+    created_at: float
+    updated_at: float
+    started_at: Optional[float]
+    completed_at: Optional[float]
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        data = dict(row)
+        data["payload"] = json.loads(data["payload"]) if data["payload"] else {}
+        data["result"] = json.loads(data["result"]) if data["result"] else None
+        data["progress"] = json.loads(data["progress"]) if data["progress"] else None
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+class JobQueue:
+    """Durable priority queue with leases, retries and per-queue concurrency limits"""
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, concurrency: Optional[Dict[str, int]] = None):
+        self.path = path
+        self.concurrency = {**QUEUE_CONCURRENCY, **(concurrency or {})}
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(JOB_SCHEMA)
+            # Queues created before jobs could report progress
+            if "progress" not in {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN progress TEXT")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Autocommit mode; claims open their own write transaction
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, queue: str, job_type: str, payload: Optional[Dict[str, Any]] = None,
+                priority: int = 5, activity_score: float = 0.0, job_id: Optional[str] = None,
+                max_attempts: int = 3, delay: float = 0.0) -> str:
+        """
+        Add a job and return its id.
+
+        Passing a job_id makes enqueueing idempotent: a job with that id that
+        is pending, running or completed is left as it is, while one that
+        failed or was cancelled is reset to pending (with the new payload and
+        a fresh attempt budget) so it runs again.
+        """
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO jobs (id, queue, job_type, payload, priority, activity_score,
+                                  max_attempts, run_after, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    status = 'pending', attempts = 0, last_error = NULL, result = NULL,
+                    payload = excluded.payload, priority = excluded.priority,
+                    activity_score = excluded.activity_score, max_attempts = excluded.max_attempts,
+                    run_after = excluded.run_after, updated_at = excluded.updated_at,
+                    started_at = NULL, completed_at = NULL
+                WHERE jobs.status IN ('failed', 'cancelled')
+            """, (job_id, queue, job_type, json.dumps(payload or {}, default=str), priority,
+                  activity_score, max_attempts, now + delay, now, now))
+        return job_id
+
+    def claim(self, queue: str, worker_id: str, job_types: Optional[List[str]] = None,
+              limit: int = 1, lease_seconds: float = JOB_LEASE_SECONDS) -> List[Job]:
+        """Lease up to `limit` runnable jobs, never exceeding the queue's concurrency limit."""
+        now = time.time()
+        type_filter, type_params = "", []
+        if job_types:
+            type_filter = f" AND job_type IN ({', '.join('?' * len(job_types))})"
+            type_params = list(job_types)
+
+        with self._connect() as conn:
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+
+                # Expired leases whose attempts are used up fail instead of being retried
+                conn.execute("""
+                    UPDATE jobs SET status = 'failed', lease_owner = NULL, updated_at = ?,
+                           last_error = COALESCE(last_error, 'Lease expired')
+                    WHERE queue = ? AND status = 'running' AND lease_expires <= ? AND attempts >= max_attempts
+                """, (now, queue, now))
+
+                running = conn.execute("""
+                    SELECT COUNT(*) FROM jobs
+                    WHERE queue = ? AND status = 'running' AND lease_expires > ?
+                """, (queue, now)).fetchone()[0]
+                capacity = min(limit, self.concurrency.get(queue, 1) - running)
+                if capacity <= 0:
+                    conn.execute("COMMIT")
+                    return []
+
+                rows = conn.execute(f"""
+                    SELECT id FROM jobs
+                    WHERE queue = ?
+                      AND ((status = 'pending' AND run_after <= ?) OR (status = 'running' AND lease_expires <= ?))
+                      {type_filter}
+                    ORDER BY priority DESC, activity_score DESC, created_at
+                    LIMIT ?
+                """, [queue, now, now, *type_params, capacity]).fetchall()
+                ids = [row["id"] for row in rows]
+
+                claimed = []
+                for job_id in ids:
+                    conn.execute("""
+                        UPDATE jobs SET status = 'running', lease_owner = ?, lease_expires = ?,
+                               attempts = attempts + 1, started_at = COALESCE(started_at, ?), updated_at = ?
+                        WHERE id = ?
+                    """, (worker_id, now + lease_seconds, now, now, job_id))
+                    claimed.append(Job.from_row(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()))
+
+                conn.execute("COMMIT")
+                return claimed
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float = JOB_LEASE_SECONDS) -> bool:
+        """Extend a lease; False means the job is no longer held by this worker."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET lease_expires = ?, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """, (now + lease_seconds, now, job_id, worker_id))
+            return cursor.rowcount == 1
+
+    def update_progress(self, job_id: str, worker_id: str, progress: Any) -> bool:
+        """
+        Record a running job's progress (also its resume checkpoint: a retry
+        or reclaimed job starts with the last progress saved).
+
+        False means the job is no longer held by this worker.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET progress = ?, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """, (json.dumps(progress, default=str), now, job_id, worker_id))
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Any = None) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET status = 'completed', result = ?, lease_owner = NULL,
+                       lease_expires = NULL, completed_at = ?, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """, (json.dumps(result, default=str), now, now, job_id, worker_id))
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> Optional[str]:
+        """Record a failure; the job is rescheduled with backoff unless its attempts are used up.
+
+        Returns the job's new status, or None if the worker no longer held it.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return None
+
+            if retry and row["attempts"] < row["max_attempts"]:
+                status, run_after = "pending", now + retry_delay(row["attempts"])
+            else:
+                status, run_after = "failed", now
+            conn.execute("""
+                UPDATE jobs SET status = ?, run_after = ?, last_error = ?, lease_owner = NULL,
+                       lease_expires = NULL, updated_at = ?,
+                       completed_at = CASE WHEN ? = 'failed' THEN ? END
+                WHERE id = ?
+            """, (status, run_after, error, now, status, now, job_id))
+            return status
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """Hand a job back without counting the attempt (worker shutting down)."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET status = 'pending', attempts = MAX(attempts - 1, 0), lease_owner = NULL,
+                       lease_expires = NULL, run_after = ?, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """, (now, now, job_id, worker_id))
+            return cursor.rowcount == 1
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started running."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute("""
+                UPDATE jobs SET status = 'cancelled', updated_at = ?, completed_at = ?
+                WHERE id = ? AND status = 'pending'
+            """, (now, now, job_id))
+            return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return Job.from_row(row) if row else None
+
+    def list_jobs(self, queue: Optional[str] = None, status: Optional[str] = None,
+                  job_type: Optional[str] = None, limit: int = 100) -> List[Job]:
+        """Jobs in claim order (runnable work first), newest last."""
+        conditions, params = [], []
+        for column, value in (("queue", queue), ("status", status), ("job_type", job_type)):
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                SELECT * FROM jobs {where}
+                ORDER BY priority DESC, activity_score DESC, created_at
+                LIMIT ?
+            """, [*params, limit]).fetchall()
+            return [Job.from_row(row) for row in rows]
+
+    def counts(self, queue: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Number of jobs per queue and status"""
+        where, params = ("WHERE queue = ?", [queue]) if queue else ("", [])
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT queue, status, COUNT(*) AS n FROM jobs {where} GROUP BY queue, status", params
+            ).fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            counts.setdefault(row["queue"], {})[row["status"]] = row["n"]
+        return counts
+
+JobHandler = Callable[[Job], Awaitable[Any]]
+
+class JobWorker:
+    """
+    Claims jobs from the given queues and runs them with the matching handler.
+
+    Runs inside an event loop: embedded in an API process or standalone via
+    job_worker.py. Handlers are coroutines taking the Job; their return value
+    is stored as the job result and an exception marks the attempt failed.
+    If a heartbeat finds the lease lost, the handler is cancelled, so
+    handlers should run blocking work in a thread to keep heartbeats and
+    cancellation timely.
+    """
+
+    def __init__(self, job_queue: JobQueue, handlers: Dict[str, JobHandler], queues: List[str],
+                 worker_id: Optional[str] = None, poll_interval: float = 1.0,
+                 lease_seconds: float = JOB_LEASE_SECONDS):
+        self.job_queue = job_queue
+        self.handlers = handlers
+        self.queues = queues
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._running: Dict[str, Tuple[str, asyncio.Task]] = {}  # job id -> (queue, task)
+        self._stopping = asyncio.Event()
+
+    async def run(self):
+        """Poll until stop() is called, then hand unfinished jobs back to the queue."""
+        job_types = list(self.handlers)
+        logger.info(f"Job worker {self.worker_id} serving queues {self.queues}")
+        try:
+            while not self._stopping.is_set():
+                claimed = 0
+                for queue in self.queues:
+                    slots = self.job_queue.concurrency.get(queue, 1) - sum(
+                        1 for running_queue, _ in self._running.values() if running_queue == queue
+                    )
+                    if slots <= 0:
+                        continue
+                    jobs = await asyncio.to_thread(
+                        self.job_queue.claim, queue, self.worker_id, job_types, slots, self.lease_seconds
+                    )
+                    for job in jobs:
+                        self._running[job.id] = (queue, asyncio.create_task(self._execute(job)))
+                    claimed += len(jobs)
+
+                if not claimed:
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await self._release_running()
+
+    def stop(self):
+        self._stopping.set()
+
+    async def _release_running(self):
+        running = [(job_id, task) for job_id, (_, task) in self._running.items()]
+        for _, task in running:
+            task.cancel()
+        for job_id, task in running:
+            try:
+                await task
+            except asyncio.CancelledError:
+                await asyncio.to_thread(self.job_queue.release, job_id, self.worker_id)
+                logger.info(f"Released job {job_id} on shutdown")
+            except Exception:
+                pass
+
+    async def _heartbeat(self, job: Job, handler: asyncio.Task) -> bool:
+        """Keep the lease alive; once it is lost, cancel the handler and return False."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            held = await asyncio.to_thread(self.job_queue.heartbeat, job.id, self.worker_id, self.lease_seconds)
+            if not held:
+                # The job expired or was cancelled and may already be running
+                # elsewhere: stop this copy rather than race the new owner
+                logger.warning(f"Lost lease on job {job.id}; cancelling its handler")
+                handler.cancel()
+                return False
+
+    async def _execute(self, job: Job):
+        handler = asyncio.create_task(self.handlers[job.job_type](job))
+        heartbeat = asyncio.create_task(self._heartbeat(job, handler))
+        try:
+            logger.info(f"Running job {job.id} ({job.job_type}, attempt {job.attempts}/{job.max_attempts})")
+            result = await handler
+            if await asyncio.to_thread(self.job_queue.complete, job.id, self.worker_id, result):
+                logger.info(f"Job {job.id} completed")
+            else:
+                logger.warning(f"Job {job.id} finished after its lease was lost; result discarded")
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled():
+                logger.warning(f"Job {job.id} abandoned after its lease was lost")
+                return
+            # Worker shutdown: the caller releases the job
+            handler.cancel()
+            raise
+        except Exception as e:
+            status = await asyncio.to_thread(self.job_queue.fail, job.id, self.worker_id, str(e))
+            if status is None:
+                logger.warning(f"Job {job.id} failed after its lease was lost: {e}")
+            else:
+                logger.error(f"Job {job.id} failed ({status}): {e}")
+        finally:
+            heartbeat.cancel()
+            self._running.pop(job.id, None)
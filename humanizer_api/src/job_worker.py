@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Job Worker: runs queued archive jobs outside the API process
+
+Start one or more of these next to archive_api_enhanced.py (with
+JOB_WORKER_EMBEDDED=0 on the API) to move imports, uploads and smart
+processing off the web process. Workers share the SQLite job queue, so
+per-queue concurrency limits hold across all of them.
+
+    python job_worker.py --queues import,smart
+"""
+
+import asyncio
+import argparse
+import logging
+import signal
+
+import archive_api_enhanced as api
+from job_queue import JobWorker, JOB_LEASE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run queued archive jobs")
+    parser.add_argument("--queues", default=",".join(api.JOB_WORKER_QUEUES),
+                        help="Comma-separated queues to serve")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls when idle")
+    parser.add_argument("--lease-seconds", type=float, default=JOB_LEASE_SECONDS,
+                        help="Lease length; heartbeats renew it every third of this")
+    args = parser.parse_args()
+
+    await api.init_components()
+    worker = JobWorker(
+        api.job_queue,
+        api.JOB_HANDLERS,
+        [queue.strip() for queue in args.queues.split(",") if queue.strip()],
+        poll_interval=args.poll_interval,
+        lease_seconds=args.lease_seconds
+    )
+
+    # Stop claiming on SIGINT/SIGTERM; running jobs are handed back to the queue
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    await worker.run()
+    logger.info(f"Job worker {worker.worker_id} stopped")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,153 @@
+"""Single-pass keyword and lexicon matching for narrative heuristics.
+
+Many analyzers score text by counting a handful of words per category. Doing
+that with one `str.count` or `in` test per keyword rescans the text dozens of
+times. A Lexicon compiles every word list once and finds all occurrences of
+all terms in one pass, using pyahocorasick when it is installed and a single
+combined regular expression otherwise.
+"""
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+@dataclass
+class LexiconMatch:
+    """All term occurrences found in one scan, grouped by term and category."""
+    occurrences: List[Tuple[int, str]] = field(default_factory=list)  # (start offset, term), in text order
+    term_categories: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    category_terms: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+    term_counts: Dict[str, int] = field(default_factory=dict)
+    _starts: Optional[List[int]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not self.term_counts:
+            for _, term in self.occurrences:
+                self.term_counts[term] = self.term_counts.get(term, 0) + 1
+
+    def count(self, category: str) -> int:
+        """Total occurrences of all terms in a category."""
+        return sum(self.term_counts.get(term, 0) for term in self.category_terms.get(category, ()))
+
+    def has(self, category: str) -> bool:
+        """Whether any term of the category occurs."""
+        return any(term in self.term_counts for term in self.category_terms.get(category, ()))
+
+    def terms(self, category: str) -> List[str]:
+        """Distinct matched terms of a category, in lexicon order."""
+        return [term for term in self.category_terms.get(category, ()) if term in self.term_counts]
+
+    def category_counts(self) -> Dict[str, int]:
+        """Occurrence counts for every category of the lexicon."""
+        return {category: self.count(category) for category in self.category_terms}
+
+    def slice(self, start: int, end: int) -> "LexiconMatch":
+        """Matches whose start offset falls within [start, end)."""
+        if self._starts is None:
+            # Built once, so slicing per sentence stays a pair of bisections
+            self._starts = [offset for offset, _ in self.occurrences]
+        lo = bisect_right(self._starts, start - 1)
+        hi = bisect_right(self._starts, end - 1)
+        return LexiconMatch(self.occurrences[lo:hi], self.term_categories, self.category_terms)
+
+class Lexicon:
+    """A compiled set of categorized word lists matched in a single pass.
+
+    With whole_words=False, terms match anywhere in the text, the same as
+    `term in text` / `text.count(term)`. With whole_words=True a term must
+    start and end on word boundaries.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], whole_words: bool = False,
+                 case_sensitive: bool = False, use_ahocorasick: Optional[bool] = None):
+        self.whole_words = whole_words
+        self.case_sensitive = case_sensitive
+
+        category_terms: Dict[str, List[str]] = {}
+        term_categories: Dict[str, List[str]] = {}
+        for category, terms in categories.items():
+            category_terms[category] = []
+            for term in terms:
+                term = self._normalize(term)
+                if not term or term in category_terms[category]:
+                    continue
+                category_terms[category].append(term)
+                term_categories.setdefault(term, []).append(category)
+
+        self.category_terms = {c: tuple(t) for c, t in category_terms.items()}
+        self.term_categories = {t: tuple(c) for t, c in term_categories.items()}
+
+        if use_ahocorasick is None:
+            use_ahocorasick = AHOCORASICK_AVAILABLE
+        self._automaton = None
+        if use_ahocorasick and self.term_categories:
+            self._automaton = ahocorasick.Automaton()
+            for term in self.term_categories:
+                self._automaton.add_word(term, term)
+            self._automaton.make_automaton()
+        else:
+            self._compile_regex()
+
+    def _normalize(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def _compile_regex(self):
+        """Compile all terms into one lookahead alternation, longest first.
+
+        At each position the regex reports the longest term starting there;
+        every shorter term matching at the same position is a prefix of it,
+        so those are recovered from a precomputed prefix table.
+        """
+        terms = sorted(self.term_categories, key=len, reverse=True)
+        self._prefix_terms: Dict[str, List[str]] = {
+            term: [other for other in terms if len(other) < len(term) and term.startswith(other)]
+            for term in terms
+        }
+        if not terms:
+            self._regex = None
+            return
+        alternation = "|".join(re.escape(term) for term in terms)
+        # Cheap first-character guard so most positions fail before the alternation
+        first_chars = "".join(sorted({re.escape(term[0]) for term in terms}))
+        if self.whole_words:
+            self._regex = re.compile(rf"(?=[{first_chars}])(?=\b({alternation})(?!\w))")
+        else:
+            self._regex = re.compile(rf"(?=[{first_chars}])(?=({alternation}))")
+
+    def _at_word_boundaries(self, text: str, start: int, end: int) -> bool:
+        before_ok = start == 0 or not (text[start - 1].isalnum() or text[start - 1] == "_")
+        after_ok = end == len(text) or not (text[end].isalnum() or text[end] == "_")
+        return before_ok and after_ok
+
+    def scan(self, text: str) -> LexiconMatch:
+        """Find every occurrence of every term in one pass over the text."""
+        text = self._normalize(text or "")
+        occurrences: List[Tuple[int, str]] = []
+
+        if self._automaton is not None:
+            for end, term in self._automaton.iter(text):
+                start = end - len(term) + 1
+                if self.whole_words and not self._at_word_boundaries(text, start, end + 1):
+                    continue
+                occurrences.append((start, term))
+            occurrences.sort()
+        elif self._regex is not None:
+            for match in self._regex.finditer(text):
+                start = match.start()
+                longest = match.group(1)
+                occurrences.append((start, longest))
+                for term in self._prefix_terms[longest]:
+                    if self.whole_words and not self._at_word_boundaries(text, start, start + len(term)):
+                        continue
+                    occurrences.append((start, term))
+
+        return LexiconMatch(occurrences, self.term_categories, self.category_terms)
@@ -4,14 +4,17 @@ Integrated from lpe_dev project.
 """
 
 from .projection import ProjectionEngine, TranslationChain, Projection
+from .stage_scheduler import StagePipelineScheduler
 from .maieutic import MaieuticDialogue, MaieuticSession
 from .translation_roundtrip import LanguageRoundTripAnalyzer, RoundTripResult
 from .llm_provider import LLMProvider, get_llm_provider
 from .models import ProjectionStep, DialogueTurn
+from .lexicon import Lexicon, LexiconMatch
 
 __all__ = [
     'ProjectionEngine',
     'TranslationChain', 
+    'StagePipelineScheduler',
     'Projection',
     'MaieuticDialogue',
     'MaieuticSession',
@@ -20,5 +23,7 @@ __all__ = [
     'LLMProvider',
     'get_llm_provider',
     'ProjectionStep',
-    'DialogueTurn'
+    'DialogueTurn',
+    'Lexicon',
+    'LexiconMatch'
 ]
\ No newline at end of file
@@ -0,0 +1,296 @@
+"""SQLite storage backend for the Lamish knowledge base.
+
+The knowledge base used to be one indented JSON file holding every concept
+and meaning, embeddings included, rewritten in full on every save and
+reparsed in full at startup. Here each concept and meaning is its own row:
+a new meaning is a single insert, embeddings are float32 BLOB columns that
+are only read when a meaning is actually looked up, and pages left behind by
+replaced or deleted rows are returned to the filesystem by periodic
+incremental vacuums. A full VACUUM (compact) is an explicit maintenance call.
+"""
+import json
+import os
+import sqlite3
+import threading
+import logging
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS concepts (
+    id TEXT PRIMARY KEY,
+    type TEXT,
+    name TEXT,
+    description TEXT,
+    characteristics TEXT,
+    examples TEXT,
+    embedding BLOB,
+    usage_count INTEGER DEFAULT 0,
+    quality_score REAL DEFAULT 0.0,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS meanings (
+    key TEXT PRIMARY KEY,
+    source_text TEXT,
+    narrative_elements TEXT,
+    quality_indicators TEXT,
+    essence_embedding BLOB,
+    embedding_dim INTEGER,
+    transformation_signatures BLOB,
+    signature_count INTEGER,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+def _vector_blob(vector: List[float]) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+def _blob_vector(blob: Optional[bytes]) -> List[float]:
+    return np.frombuffer(blob, dtype=np.float32).tolist() if blob else []
+
+class KnowledgeBaseStore:
+    """Row-per-record SQLite store with binary embedding columns."""
+
+    def __init__(self, db_path: str, compact_every: Optional[int] = None):
+        self.db_path = db_path
+        # Writes between incremental vacuums (replaced rows leave free pages behind)
+        self.compact_every = compact_every or int(os.getenv("LPE_KB_COMPACT_EVERY", "1000"))
+        self._writes_since_reclaim = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # Takes effect for new databases; existing ones switch over at their next compact()
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            concepts = self._conn.execute("SELECT COUNT(*) FROM concepts").fetchone()[0]
+            meanings = self._conn.execute("SELECT COUNT(*) FROM meanings").fetchone()[0]
+        return concepts == 0 and meanings == 0
+
+    # Metadata
+
+    def get_metadata(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_metadata(self, values: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+                [(key, None if value is None else str(value)) for key, value in values.items()]
+            )
+
+    # Concepts
+
+    def load_concepts(self) -> List[Dict[str, Any]]:
+        """All concepts as LamishConcept keyword dicts, embeddings included."""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT id, type, name, description, characteristics, examples, embedding,
+                       usage_count, quality_score, created_at, updated_at
+                FROM concepts
+            """).fetchall()
+        return [{
+            'id': row[0],
+            'type': row[1],
+            'name': row[2],
+            'description': row[3],
+            'characteristics': json.loads(row[4] or '[]'),
+            'examples': json.loads(row[5] or '[]'),
+            'embedding': _blob_vector(row[6]),
+            'usage_count': row[7],
+            'quality_score': row[8],
+            'created_at': row[9],
+            'updated_at': row[10]
+        } for row in rows]
+
+    def put_concepts(self, concepts: List[Any]):
+        """Insert or replace concepts in one transaction."""
+        if not concepts:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT OR REPLACE INTO concepts
+                (id, type, name, description, characteristics, examples, embedding,
+                 usage_count, quality_score, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(
+                c.id, c.type, c.name, c.description,
+                json.dumps(c.characteristics), json.dumps(c.examples),
+                _vector_blob(c.embedding) if c.embedding else None,
+                c.usage_count, c.quality_score, c.created_at, c.updated_at
+            ) for c in concepts])
+        self._record_writes(len(concepts))
+
+    def delete_concepts(self, concept_ids: List[str]):
+        if not concept_ids:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM concepts WHERE id = ?", [(cid,) for cid in concept_ids])
+        self._record_writes(len(concept_ids))
+
+    # Meanings
+
+    def meaning_keys(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT key FROM meanings ORDER BY rowid")]
+
+    def get_meaning(self, key: str) -> Optional[Dict[str, Any]]:
+        """One meaning as LamishMeaning keyword dict, embeddings decoded."""
+        with self._lock:
+            row = self._conn.execute("""
+                SELECT source_text, narrative_elements, quality_indicators, essence_embedding,
+                       embedding_dim, transformation_signatures, signature_count, created_at
+                FROM meanings WHERE key = ?
+            """, (key,)).fetchone()
+        if row is None:
+            return None
+
+        signatures = []
+        if row[5] and row[6]:
+            signatures = np.frombuffer(row[5], dtype=np.float32).reshape(row[6], -1).tolist()
+        return {
+            'source_text': row[0],
+            'narrative_elements': json.loads(row[1] or '{}'),
+            'quality_indicators': json.loads(row[2] or '{}'),
+            'essence_embedding': _blob_vector(row[3]),
+            'transformation_signatures': signatures,
+            'created_at': row[7]
+        }
+
+    def meaning_summaries(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(key, fields) for every meaning without reading any embedding BLOBs."""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT key, source_text, narrative_elements, quality_indicators, embedding_dim, created_at
+                FROM meanings ORDER BY rowid
+            """).fetchall()
+        return [(row[0], {
+            'source_text': row[1],
+            'narrative_elements': json.loads(row[2] or '{}'),
+            'quality_indicators': json.loads(row[3] or '{}'),
+            'embedding_dim': row[4] or 0,
+            'created_at': row[5]
+        }) for row in rows]
+
+    def put_meaning(self, key: str, meaning: Any):
+        signatures = [s for s in meaning.transformation_signatures if s]
+        dims = {len(s) for s in signatures}
+        signature_blob = _vector_blob(np.vstack(signatures)) if signatures and len(dims) == 1 else None
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO meanings
+                (key, source_text, narrative_elements, quality_indicators, essence_embedding,
+                 embedding_dim, transformation_signatures, signature_count, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                key, meaning.source_text,
+                json.dumps(meaning.narrative_elements), json.dumps(meaning.quality_indicators),
+                _vector_blob(meaning.essence_embedding), len(meaning.essence_embedding),
+                signature_blob, len(signatures) if signature_blob else 0,
+                meaning.created_at
+            ))
+        self._record_writes(1)
+
+    def delete_meaning(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM meanings WHERE key = ?", (key,))
+        self._record_writes(1)
+
+    # Maintenance
+
+    def _record_writes(self, count: int):
+        self._writes_since_reclaim += count
+        if self._writes_since_reclaim >= self.compact_every:
+            self.reclaim()
+
+    def reclaim(self):
+        """
+        Release free pages left by replaced and deleted rows.
+
+        Incremental vacuum only moves pages off the freelist, so its cost is
+        bounded by the churn since the last call, not the size of the database.
+        """
+        with self._lock:
+            # execute() steps the pragma once, freeing a single page; executescript runs it to completion
+            self._conn.executescript("PRAGMA incremental_vacuum;")
+            self._writes_since_reclaim = 0
+
+    def compact(self):
+        """
+        Fold the WAL into the database and rewrite it without free pages.
+
+        VACUUM rewrites the whole file, so this is a maintenance operation
+        (run after an import or offline), never part of a write. It also moves
+        stores created before incremental auto-vacuum over to it.
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("VACUUM")
+            self._writes_since_reclaim = 0
+        logger.info(f"Compacted knowledge base store {self.db_path}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class LazyMeanings(MutableMapping):
+    """
+    Dict-like view of stored meanings.
+
+    Keys are loaded up front; a meaning (with its embeddings) is read from the
+    store the first time it is accessed. Assigning a meaning writes it through
+    to the store as a single row.
+    """
+
+    def __init__(self, store: KnowledgeBaseStore, factory):
+        self._store = store
+        self._factory = factory  # Builds a LamishMeaning from stored fields
+        self._keys = dict.fromkeys(store.meaning_keys())
+        self._loaded: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        if key not in self._loaded:
+            self._loaded[key] = self._factory(**self._store.get_meaning(key))
+        return self._loaded[key]
+
+    def __setitem__(self, key: str, meaning):
+        self._store.put_meaning(key, meaning)
+        self._keys[key] = None
+        self._loaded[key] = meaning
+
+    def __delitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        self._store.delete_meaning(key)
+        del self._keys[key]
+        self._loaded.pop(key, None)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._keys))
+
+    def __len__(self) -> int:
+        return len(self._keys)
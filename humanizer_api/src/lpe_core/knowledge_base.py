@@ -6,15 +6,29 @@ based on successful transformations, creating a growing understanding of
 Lamish projection elements.
 """
 import json
+import os
 import numpy as np
 import logging
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Tuple, MutableMapping
+from dataclasses import dataclass
 from datetime import datetime
 import hashlib
 
+from .lexicon import Lexicon
+from .llm_provider import get_llm_provider, embed_texts
+from .kb_store import KnowledgeBaseStore, LazyMeanings
+
 logger = logging.getLogger(__name__)
 
+# Indicator words for each narrative element, matched as substrings
+NARRATIVE_ELEMENT_LEXICON = Lexicon({
+    'character_focus': ['he', 'she', 'they', 'character', 'person', 'man', 'woman'],
+    'action_intensity': ['ran', 'jumped', 'fought', 'moved', 'action', 'quickly'],
+    'emotional_depth': ['felt', 'emotion', 'heart', 'soul', 'love', 'fear', 'joy', 'sadness'],
+    'descriptive_richness': ['beautiful', 'dark', 'bright', 'color', 'texture', 'appearance'],
+    'temporal_complexity': ['when', 'then', 'before', 'after', 'during', 'time', 'moment']
+})
+
 @dataclass
 class LamishConcept:
     """A concept in the Lamish knowledge base with embedding and examples."""
@@ -52,52 +66,104 @@ class LamishMeaning:
 class LamishKnowledgeBase:
     """RAG-enabled knowledge base for Lamish projection concepts."""
     
-    def __init__(self, data_path: str = "./data/lamish_kb.json"):
+    def __init__(self, data_path: str = "./data/lamish_kb.json", embedding_provider=None):
+        # Records live in a SQLite store next to data_path; a legacy JSON file
+        # at data_path is imported into it once
         self.data_path = data_path
+        self.store_path = os.path.splitext(data_path)[0] + ".db"
+        self.store: Optional[KnowledgeBaseStore] = None
         self.concepts: Dict[str, LamishConcept] = {}
-        self.meanings: Dict[str, LamishMeaning] = {}
+        self.meanings: MutableMapping[str, LamishMeaning] = {}
+        
+        # Concept changes not yet written by save_knowledge_base
+        self._dirty_concepts: set = set()
+        self._deleted_concepts: set = set()
+        
+        # Concept embeddings come from the configured embedding model; the
+        # model they were computed with is saved so a model change re-embeds them
+        self._embedding_provider = embedding_provider
+        self.embedding_model: Optional[str] = None
+        
+        # Normalized concept embedding matrices per concept type, rebuilt on change
+        self._concept_matrices: Dict[Optional[str], Tuple[List[str], np.ndarray]] = {}
+        self._concepts_version = 0
+        self._matrices_key = None
+        
         self.load_knowledge_base()
     
+    @property
+    def embedding_provider(self):
+        if self._embedding_provider is None:
+            self._embedding_provider = get_llm_provider()
+        return self._embedding_provider
+    
+    def _embedding_model_id(self) -> str:
+        """Identify the embedding model concept embeddings are computed with."""
+        provider = self.embedding_provider
+        return f"{provider.__class__.__name__}:{getattr(provider, 'embedding_model', '')}"
+    
     def load_knowledge_base(self):
-        """Load existing knowledge base from storage."""
-        try:
-            with open(self.data_path, 'r') as f:
-                data = json.load(f)
-                
-            # Load concepts
-            for concept_data in data.get('concepts', []):
-                concept = LamishConcept(**concept_data)
-                self.concepts[concept.id] = concept
-                
-            # Load meanings
-            for meaning_data in data.get('meanings', []):
-                meaning = LamishMeaning(**meaning_data)
-                self.meanings[meaning.source_text[:50]] = meaning
-                
-            logger.info(f"Loaded {len(self.concepts)} concepts and {len(self.meanings)} meanings")
-            
-        except FileNotFoundError:
-            logger.info("No existing knowledge base found, starting fresh")
-            self._initialize_base_concepts()
+        """
+        Load existing knowledge base from storage.
+        
+        Concepts are loaded eagerly; meanings are only indexed by key, and each
+        is read (with its embeddings) from the store on first access.
+        """
+        self.store = KnowledgeBaseStore(self.store_path)
+        
+        if self.store.is_empty():
+            if not os.path.exists(self.data_path):
+                logger.info("No existing knowledge base found, starting fresh")
+                self.meanings = LazyMeanings(self.store, LamishMeaning)
+                self._initialize_base_concepts()
+                return
+            self._import_json(self.data_path)
+        
+        for concept_data in self.store.load_concepts():
+            concept = LamishConcept(**concept_data)
+            self.concepts[concept.id] = concept
+        self.meanings = LazyMeanings(self.store, LamishMeaning)
+        
+        # Knowledge bases without a recorded model hold placeholder embeddings
+        self.embedding_model = self.store.get_metadata('embedding_model')
+        
+        logger.info(f"Loaded {len(self.concepts)} concepts and {len(self.meanings)} meanings")
+    
+    def _import_json(self, json_path: str):
+        """One-time migration of a whole-file JSON knowledge base into the store."""
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+        
+        self.store.put_concepts([LamishConcept(**concept_data) for concept_data in data.get('concepts', [])])
+        for meaning_data in data.get('meanings', []):
+            meaning = LamishMeaning(**meaning_data)
+            self.store.put_meaning(meaning.source_text[:50], meaning)
+        self.store.set_metadata({'embedding_model': data.get('metadata', {}).get('embedding_model')})
+        self.store.compact()
+        
+        logger.info(f"Imported {json_path} into {self.store_path}")
     
     def save_knowledge_base(self):
-        """Save knowledge base to storage."""
-        # Ensure directory exists
-        import os
-        os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
-        
-        data = {
-            'concepts': [asdict(concept) for concept in self.concepts.values()],
-            'meanings': [asdict(meaning) for meaning in self.meanings.values()],
-            'metadata': {
-                'total_concepts': len(self.concepts),
-                'total_meanings': len(self.meanings),
-                'last_updated': datetime.now().isoformat()
-            }
-        }
+        """
+        Save knowledge base to storage.
         
-        with open(self.data_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        Only concepts changed since the last save are written; meanings are
+        written as they are stored, so save cost does not grow with history.
+        """
+        self.store.put_concepts([self.concepts[cid] for cid in self._dirty_concepts if cid in self.concepts])
+        self.store.delete_concepts(list(self._deleted_concepts))
+        self.store.set_metadata({
+            'total_concepts': len(self.concepts),
+            'total_meanings': len(self.meanings),
+            'embedding_model': self.embedding_model,
+            'last_updated': datetime.now().isoformat()
+        })
+        self._dirty_concepts.clear()
+        self._deleted_concepts.clear()
+    
+    def list_meanings(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(key, fields) for every stored meaning, without loading embeddings."""
+        return self.store.meaning_summaries()
     
     def _initialize_base_concepts(self):
         """Initialize with core Lamish concepts."""
@@ -176,9 +242,7 @@ class LamishKnowledgeBase:
         """Create a new concept in the knowledge base."""
         concept_id = self._generate_concept_id(concept_type, data['name'])
         
-        # Generate embedding for concept (placeholder - would use actual embedding model)
-        embedding = self._generate_concept_embedding(data)
-        
+        # Embedding is computed in a batch with other pending concepts on first lookup
         concept = LamishConcept(
             id=concept_id,
             type=concept_type,
@@ -186,26 +250,84 @@ class LamishKnowledgeBase:
             description=data['description'],
             characteristics=data['characteristics'],
             examples=data['examples'],
-            embedding=embedding
+            embedding=[]
         )
         
         self.concepts[concept_id] = concept
+        self._concepts_version += 1
+        self._dirty_concepts.add(concept_id)
+        self._deleted_concepts.discard(concept_id)
+    
+    def remove_concept(self, concept_id: str) -> bool:
+        """Remove a concept; returns False if it does not exist."""
+        if concept_id not in self.concepts:
+            return False
+        del self.concepts[concept_id]
+        self._concepts_version += 1
+        self._dirty_concepts.discard(concept_id)
+        self._deleted_concepts.add(concept_id)
+        return True
     
     def _generate_concept_id(self, concept_type: str, name: str) -> str:
         """Generate unique ID for concept."""
         return hashlib.md5(f"{concept_type}:{name}".encode()).hexdigest()[:12]
     
-    def _generate_concept_embedding(self, data: Dict[str, Any]) -> List[float]:
-        """Generate embedding for concept (placeholder implementation)."""
-        # In production, this would use the actual embedding model
-        text = f"{data['description']} {' '.join(data['characteristics'])} {' '.join(data['examples'])}"
-        # Placeholder: create deterministic but meaningless embedding
-        hash_val = hashlib.md5(text.encode()).digest()
-        embedding = []
-        for i in range(0, len(hash_val), 2):
-            val = int.from_bytes(hash_val[i:i+2], 'big') / 65535.0
-            embedding.extend([val] * 48)  # Expand to 768 dimensions
-        return embedding[:768]
+    def _concept_text(self, concept: LamishConcept) -> str:
+        """Text a concept's embedding is computed from."""
+        return f"{concept.description} {' '.join(concept.characteristics)} {' '.join(concept.examples)}"
+    
+    def _embed_texts(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """
+        Embed texts with the configured embedding model in one batch.
+        
+        Returns None when the model is unreachable: placeholder vectors are
+        never stored under the model's name.
+        """
+        try:
+            vectors = embed_texts(self.embedding_provider, texts)
+        except Exception as e:
+            logger.warning(f"Embedding model {self._embedding_model_id()} unavailable: {e}")
+            return None
+        return [list(map(float, vector)) for vector in vectors]
+    
+    def _ensure_concept_embeddings(self):
+        """Embed, in one batch, every concept that has no embedding from the current model."""
+        model_id = self._embedding_model_id()
+        if self.embedding_model != model_id:
+            pending = list(self.concepts.values())  # Model changed: re-embed everything
+        else:
+            pending = [concept for concept in self.concepts.values() if not concept.embedding]
+        
+        if pending:
+            embeddings = self._embed_texts([self._concept_text(concept) for concept in pending])
+            if embeddings is None:
+                return  # Keep the current embeddings and model; retried on the next lookup
+            for concept, embedding in zip(pending, embeddings):
+                concept.embedding = embedding
+                self._dirty_concepts.add(concept.id)
+            self._concepts_version += 1
+            logger.info(f"Embedded {len(pending)} concepts with {model_id}")
+        self.embedding_model = model_id
+    
+    def _concept_matrix(self, concept_type: Optional[str]) -> Tuple[List[str], np.ndarray]:
+        """Concept ids and their L2-normalized embedding matrix for one type (None for all)."""
+        key = (self._concepts_version, len(self.concepts))
+        if self._matrices_key != key:
+            self._concept_matrices = {}
+            self._matrices_key = key
+        
+        if concept_type not in self._concept_matrices:
+            concepts = [c for c in self.concepts.values() if concept_type is None or c.type == concept_type]
+            dimension = max((len(c.embedding) for c in concepts), default=0)
+            matrix = np.zeros((len(concepts), dimension), dtype=np.float32)
+            for row, concept in enumerate(concepts):
+                if len(concept.embedding) == dimension:
+                    matrix[row] = concept.embedding
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms > 0, norms, 1.0)
+            self._concept_matrices[concept_type] = ([c.id for c in concepts], matrix)
+        
+        return self._concept_matrices[concept_type]
     
     def enrich_concept_from_projection(self, concept_type: str, name: str, 
                                      projection_result: Dict[str, Any]):
@@ -224,6 +346,7 @@ class LamishKnowledgeBase:
             # Update quality score based on transformation success
             concept.quality_score = self._calculate_quality_score(concept, projection_result)
             concept.updated_at = datetime.now().isoformat()
+            self._dirty_concepts.add(concept_id)
             
             logger.info(f"Enriched {concept_type} '{name}' with new projection data")
     
@@ -263,48 +386,37 @@ class LamishKnowledgeBase:
     def find_similar_concepts(self, query_embedding: List[float], 
                             concept_type: str = None, limit: int = 5) -> List[Tuple[LamishConcept, float]]:
         """Find concepts similar to query embedding."""
-        similarities = []
+        self._ensure_concept_embeddings()
+        concept_ids, matrix = self._concept_matrix(concept_type)
+        if not concept_ids or limit <= 0:
+            return []
         
-        for concept in self.concepts.values():
-            if concept_type and concept.type != concept_type:
-                continue
-                
-            # Calculate cosine similarity
-            similarity = self._cosine_similarity(query_embedding, concept.embedding)
-            similarities.append((concept, similarity))
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if len(query) != matrix.shape[1] or query_norm == 0:
+            # Incomparable query: every concept scores 0, as with mismatched vectors
+            return [(self.concepts[cid], 0.0) for cid in concept_ids[:limit]]
         
-        # Sort by similarity and return top results
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities[:limit]
-    
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        if len(vec1) != len(vec2):
-            return 0.0
-            
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        magnitude1 = sum(a * a for a in vec1) ** 0.5
-        magnitude2 = sum(b * b for b in vec2) ** 0.5
+        # Calculate cosine similarity against every concept of the type at once
+        similarities = matrix @ (query / query_norm)
         
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
-            
-        return dot_product / (magnitude1 * magnitude2)
+        # Select top results without sorting the whole list
+        limit = min(limit, len(concept_ids))
+        top = np.argpartition(-similarities, limit - 1)[:limit]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        return [(self.concepts[concept_ids[i]], float(similarities[i])) for i in top]
     
     def store_lamish_meaning(self, source_text: str, transformation_result: Dict[str, Any]):
         """Store the essence embedding and transformation signature."""
-        # Generate essence embedding from source text
-        essence_embedding = self._generate_concept_embedding({'description': source_text, 'characteristics': [], 'examples': []})
-        
-        # Extract transformation signatures from each step
-        transformation_signatures = []
-        for step in transformation_result.get('steps', []):
-            step_embedding = self._generate_concept_embedding({
-                'description': step.get('output_snapshot', ''),
-                'characteristics': [],
-                'examples': []
-            })
-            transformation_signatures.append(step_embedding)
+        # Embed the source text (essence) and each step's output (transformation
+        # signatures) in one batch
+        step_outputs = [step.get('output_snapshot', '') for step in transformation_result.get('steps', [])]
+        embeddings = self._embed_texts([source_text] + step_outputs)
+        if embeddings is None:
+            logger.warning(f"Not storing lamish meaning for: {source_text[:50]}... (no embeddings)")
+            return
+        essence_embedding = embeddings[0]
+        transformation_signatures = embeddings[1:]
         
         # Analyze narrative elements
         narrative_elements = self._analyze_narrative_elements(source_text)
@@ -338,38 +450,21 @@ class LamishKnowledgeBase:
         }
         
         # Simple heuristic analysis (would be more sophisticated in production)
-        text_lower = text.lower()
-        
-        # Character indicators
-        character_words = ['he', 'she', 'they', 'character', 'person', 'man', 'woman']
-        elements['character_focus'] = sum(text_lower.count(word) for word in character_words) / len(text.split())
-        
-        # Action indicators  
-        action_words = ['ran', 'jumped', 'fought', 'moved', 'action', 'quickly']
-        elements['action_intensity'] = sum(text_lower.count(word) for word in action_words) / len(text.split())
-        
-        # Emotional indicators
-        emotion_words = ['felt', 'emotion', 'heart', 'soul', 'love', 'fear', 'joy', 'sadness']
-        elements['emotional_depth'] = sum(text_lower.count(word) for word in emotion_words) / len(text.split())
-        
-        # Descriptive indicators
-        descriptive_words = ['beautiful', 'dark', 'bright', 'color', 'texture', 'appearance']
-        elements['descriptive_richness'] = sum(text_lower.count(word) for word in descriptive_words) / len(text.split())
-        
-        # Temporal indicators
-        time_words = ['when', 'then', 'before', 'after', 'during', 'time', 'moment']
-        elements['temporal_complexity'] = sum(text_lower.count(word) for word in time_words) / len(text.split())
+        word_count = len(text.split())
+        counts = NARRATIVE_ELEMENT_LEXICON.scan(text)
+        for element in elements:
+            elements[element] = counts.count(element) / word_count
         
         return elements
     
-    def suggest_optimal_configuration(self, source_text: str) -> Dict[str, str]:
+    def suggest_optimal_configuration(self, source_text: str,
+                                      source_embedding: Optional[List[float]] = None) -> Dict[str, str]:
         """Suggest optimal persona/namespace/style based on narrative analysis."""
-        # Generate embedding for source text
-        source_embedding = self._generate_concept_embedding({
-            'description': source_text,
-            'characteristics': [],
-            'examples': []
-        })
+        # Generate embedding for source text unless the caller already has one
+        if source_embedding is None:
+            embeddings = self._embed_texts([source_text])
+            # Without an embedding every concept scores 0 and the first of each type is suggested
+            source_embedding = embeddings[0] if embeddings else []
         
         # Find best matches for each concept type
         best_persona = self.find_similar_concepts(source_embedding, 'persona', 1)[0][0].name
@@ -0,0 +1,9 @@
+"""Lexicon matcher for the LPE core.
+
+The matcher lives in src/lexicon.py, outside this package, so lighthouse can
+import it without pulling in the projection engine; it is re-exported here so
+both trees share one Lexicon class.
+"""
+from lexicon import AHOCORASICK_AVAILABLE, Lexicon, LexiconMatch
+
+__all__ = ["Lexicon", "LexiconMatch", "AHOCORASICK_AVAILABLE"]
@@ -21,6 +21,25 @@ class LLMProvider(Protocol):
         """Generate embeddings for text."""
         ...
 
+def embed_texts(provider: Any, texts: List[str]) -> List[List[float]]:
+    """
+    Embed several texts, in one request when the provider supports batching.
+
+    Unlike a provider's embed(), the batch path never substitutes mock
+    vectors: it raises when the embedding model cannot be reached, so callers
+    can tell real embeddings from placeholders before storing them.
+    """
+    embed_batch = getattr(provider, "embed_batch", None)
+    if embed_batch is not None:
+        return embed_batch(texts)
+    return [provider.embed(text) for text in texts]
+
+def _require_embeddings(embeddings: List[List[float]]) -> List[List[float]]:
+    """Raise if any embedding came back empty, so batches never carry placeholders."""
+    if not all(embeddings):
+        raise ValueError("Embedding model returned an empty embedding")
+    return embeddings
+
 class LiteLLMProvider:
     """LiteLLM provider for multiple LLM services."""
     
@@ -63,6 +82,21 @@ class LiteLLMProvider:
         except Exception as e:
             logger.error(f"LiteLLM embedding error: {e}")
             raise
+    
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for several texts in one LiteLLM request."""
+        if not texts:
+            return []
+        try:
+            response = litellm.embedding(
+                model=self.embedding_model,
+                input=texts
+            )
+            return [item.embedding for item in response.data]
+            
+        except Exception as e:
+            logger.error(f"LiteLLM embedding error: {e}")
+            raise
 
 class OllamaVisionProvider:
     """Ollama provider with vision capabilities for supported models."""
@@ -184,28 +218,60 @@ class OllamaProvider:
             mock = MockLLMProvider()
             return mock.generate(prompt, system_prompt)
     
+    def _embed_single(self, text: str) -> List[float]:
+        """One embedding from the /api/embeddings endpoint; raises on request errors."""
+        url = f"{self.host}/api/embeddings"
+        
+        payload = {
+            "model": self.embedding_model,
+            "prompt": text
+        }
+        
+        response = requests.post(url, json=payload, timeout=120)
+        response.raise_for_status()
+        
+        return response.json().get("embedding", [])
+    
     def embed(self, text: str) -> List[float]:
         """Generate embeddings using Ollama API."""
         try:
-            url = f"{self.host}/api/embeddings"
+            return self._embed_single(text)
+            
+        except Exception as e:
+            logger.error(f"Ollama embedding error: {e}")
+            # Fallback to mock if Ollama fails
+            logger.info("Falling back to mock embeddings")
+            mock = MockLLMProvider()
+            return mock.embed(text)
+    
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts with one /api/embed request.
+        
+        Raises instead of falling back to mock embeddings when Ollama is unavailable.
+        """
+        if not texts:
+            return []
+        try:
+            url = f"{self.host}/api/embed"
             
             payload = {
                 "model": self.embedding_model,
-                "prompt": text
+                "input": texts
             }
             
             response = requests.post(url, json=payload, timeout=120)
             response.raise_for_status()
             
-            result = response.json()
-            return result.get("embedding", [])
+            embeddings = response.json().get("embeddings", [])
+            if len(embeddings) != len(texts):
+                raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+            return _require_embeddings(embeddings)
             
         except Exception as e:
-            logger.error(f"Ollama embedding error: {e}")
-            # Fallback to mock if Ollama fails
-            logger.info("Falling back to mock embeddings")
-            mock = MockLLMProvider()
-            return mock.embed(text)
+            # Older Ollama servers only have the single-text endpoint
+            logger.warning(f"Ollama batch embedding failed, embedding one at a time: {e}")
+            return _require_embeddings([self._embed_single(text) for text in texts])
 
 class GoogleProvider:
     """Google Gemini provider for text and vision tasks."""
@@ -304,31 +370,34 @@ class GoogleProvider:
             mock = MockLLMProvider()
             return mock.generate(prompt, system_prompt)
     
+    def _embed_single(self, text: str) -> List[float]:
+        """One text-embedding-004 embedding; raises on request errors."""
+        url = f"{self.base_url}/models/text-embedding-004:embedContent"
+        
+        payload = {
+            "content": {
+                "parts": [{"text": text}]
+            }
+        }
+        
+        headers = {
+            "Content-Type": "application/json",
+            "x-goog-api-key": self.api_key
+        }
+        
+        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response.raise_for_status()
+        
+        result = response.json()
+        if "embedding" in result and "values" in result["embedding"]:
+            return result["embedding"]["values"]
+        
+        return []
+    
     def embed(self, text: str) -> List[float]:
         """Generate embeddings using Google embedding models."""
         try:
-            # Use text-embedding-004 for embeddings
-            url = f"{self.base_url}/models/text-embedding-004:embedContent"
-            
-            payload = {
-                "content": {
-                    "parts": [{"text": text}]
-                }
-            }
-            
-            headers = {
-                "Content-Type": "application/json",
-                "x-goog-api-key": self.api_key
-            }
-            
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            result = response.json()
-            if "embedding" in result and "values" in result["embedding"]:
-                return result["embedding"]["values"]
-            
-            return []
+            return self._embed_single(text)
             
         except Exception as e:
             logger.error(f"Google embedding error: {e}")
@@ -336,6 +405,10 @@ class GoogleProvider:
             logger.info("Falling back to mock embeddings")
             mock = MockLLMProvider()
             return mock.embed(text)
+    
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for several texts; raises instead of falling back to mock embeddings."""
+        return _require_embeddings([self._embed_single(text) for text in texts])
 
 class MockLLMProvider:
     """Mock LLM provider for testing."""
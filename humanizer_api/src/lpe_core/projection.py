@@ -2,7 +2,7 @@
 import json
 import time
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
 from .models import ProjectionStep, Projection
@@ -13,6 +13,15 @@ logger = logging.getLogger(__name__)
 class TranslationChain:
     """Orchestrates the complete translation chain process."""
     
+    # Transformation pipeline: (step name, step type)
+    PIPELINE = [
+        ("Deconstructing narrative", "deconstruct"),
+        ("Mapping to namespace", "map"),
+        ("Reconstructing allegory", "reconstruct"),
+        ("Applying style", "stylize"),
+        ("Generating reflection", "reflect")
+    ]
+    
     def __init__(self, persona: str, namespace: str, style: str, verbose: bool = True):
         self.persona = persona
         self.namespace = namespace
@@ -20,9 +29,9 @@ class TranslationChain:
         self.verbose = verbose
         self.transformer = LLMTransformer(persona, namespace, style)
     
-    def run(self, source_narrative: str, show_steps: bool = True, transform_id: str = None, progress_callback = None) -> Projection:
-        """Execute the complete translation chain."""
-        projection = Projection(
+    def new_projection(self, source_narrative: str) -> Projection:
+        """Create an empty projection for this chain's configuration."""
+        return Projection(
             id=None,
             source_narrative=source_narrative,
             final_projection="",
@@ -31,23 +40,15 @@ class TranslationChain:
             namespace=self.namespace,
             style=self.style
         )
-        
-        # Define transformation pipeline
-        pipeline = [
-            ("Deconstructing narrative", "deconstruct"),
-            ("Mapping to namespace", "map"),
-            ("Reconstructing allegory", "reconstruct"),
-            ("Applying style", "stylize"),
-            ("Generating reflection", "reflect")
-        ]
+    
+    def run(self, source_narrative: str, show_steps: bool = True, transform_id: str = None, progress_callback = None) -> Projection:
+        """Execute the complete translation chain."""
+        projection = self.new_projection(source_narrative)
         
         current_text = source_narrative
         previous_step_type = None
         
-        for step_name, step_type in pipeline:
-            if self.verbose:
-                logger.info(f"Starting step: {step_name}")
-            
+        for step_name, step_type in self.PIPELINE:
             # Send progress update - step started
             if progress_callback and transform_id:
                 import asyncio
@@ -59,14 +60,8 @@ class TranslationChain:
                 except:
                     pass  # Don't fail if progress callback fails
             
-            start_time = time.time()
-            
-            # Execute step with sanity checking and retry logic
-            output_text, attempt_count = self._execute_step_with_retry(
-                current_text, step_type, previous_step_type, step_name
-            )
-            
-            duration_ms = int((time.time() - start_time) * 1000)
+            step, output_text = self.run_step(current_text, step_name, step_type, previous_step_type)
+            projection.steps.append(step)
             
             # Send progress update - step completed
             if progress_callback and transform_id:
@@ -74,38 +69,57 @@ class TranslationChain:
                 try:
                     asyncio.create_task(progress_callback(transform_id, step_type, "completed", {
                         "step_name": step_name,
-                        "duration_ms": duration_ms,
+                        "duration_ms": step.duration_ms,
                         "output_preview": output_text[:100] + "..." if len(output_text) > 100 else output_text
                     }))
                 except:
                     pass  # Don't fail if progress callback fails
             
-            # Record step
-            step = ProjectionStep(
-                name=step_name,
-                input_snapshot=current_text[:200] + "..." if len(current_text) > 200 else current_text,
-                output_snapshot=output_text[:200] + "..." if len(output_text) > 200 else output_text,
-                metadata={
-                    "step_type": step_type,
-                    "attempt_count": attempt_count,
-                    "sanity_checked": True
-                },
-                duration_ms=duration_ms
-            )
-            projection.steps.append(step)
-            
             # Update for next iteration
             if step_type != "reflect":
                 current_text = output_text
             
             # Update previous step type for next iteration
             previous_step_type = step_type
-            
-            if self.verbose:
-                logger.info(f"Completed step: {step_name} in {duration_ms}ms")
         
-        # Set final outputs
-        projection.final_projection = current_text
+        return self.finalize(projection, current_text)
+    
+    def run_step(self, current_text: str, step_name: str, step_type: str,
+                 previous_step_type: Optional[str] = None) -> Tuple[ProjectionStep, str]:
+        """Execute a single pipeline step and return its record and output."""
+        if self.verbose:
+            logger.info(f"Starting step: {step_name}")
+        
+        start_time = time.time()
+        
+        # Execute step with sanity checking and retry logic
+        output_text, attempt_count = self._execute_step_with_retry(
+            current_text, step_type, previous_step_type, step_name
+        )
+        
+        duration_ms = int((time.time() - start_time) * 1000)
+        
+        # Record step
+        step = ProjectionStep(
+            name=step_name,
+            input_snapshot=current_text[:200] + "..." if len(current_text) > 200 else current_text,
+            output_snapshot=output_text[:200] + "..." if len(output_text) > 200 else output_text,
+            metadata={
+                "step_type": step_type,
+                "attempt_count": attempt_count,
+                "sanity_checked": True
+            },
+            duration_ms=duration_ms
+        )
+        
+        if self.verbose:
+            logger.info(f"Completed step: {step_name} in {duration_ms}ms")
+        
+        return step, output_text
+    
+    def finalize(self, projection: Projection, final_text: str) -> Projection:
+        """Set final outputs and generate the projection embedding."""
+        projection.final_projection = final_text
         projection.reflection = projection.steps[-1].output_snapshot
         
         # Generate embedding for the final projection
@@ -249,6 +263,10 @@ class ProjectionEngine:
         """Create a new projection."""
         chain = TranslationChain(persona, namespace, style, verbose=show_steps)
         projection = chain.run(narrative, show_steps, transform_id, progress_callback)
+        return self.add_projection(projection)
+    
+    def add_projection(self, projection: Projection) -> Projection:
+        """Assign an id to a projection produced outside create_projection and store it."""
         projection.id = len(self.projections) + 1
         self.projections.append(projection)
         return projection
@@ -0,0 +1,135 @@
+"""Stage-pipelined scheduling of the translation chain across many narratives.
+
+Running each narrative (or chunk of a large narrative) through all five LPE
+stages before starting the next serializes the work: N chunks cost
+stages x N step-times. The scheduler instead lets chunk k+1 deconstruct
+while chunk k maps, bounding concurrency per stage and per provider, so the
+same work approaches stages + N step-times.
+"""
+import asyncio
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+import logging
+
+from .models import Projection
+from .projection import TranslationChain
+
+logger = logging.getLogger(__name__)
+
+# Called as on_stage(index, step_type, status, data) for each stage transition
+StageCallback = Callable[[int, str, str, Dict[str, Any]], Awaitable[None]]
+
+# Provider semaphores are shared by every scheduler on an event loop so that
+# concurrent narratives do not oversubscribe the same model server. They are
+# kept per loop because a semaphore binds to the loop that first waits on it,
+# and scripts and tests may call asyncio.run more than once.
+_provider_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+    weakref.WeakKeyDictionary()
+
+def provider_key(provider: Any) -> str:
+    """Identify the backend a provider talks to (class, host and model)."""
+    host = getattr(provider, "host", "")
+    model = getattr(provider, "model", "")
+    return f"{provider.__class__.__name__}:{host}:{model}"
+
+def default_provider_limit(provider: Any) -> int:
+    """Default number of in-flight requests allowed against one provider."""
+    if provider.__class__.__name__ == "OllamaProvider":
+        # Match the server's parallel slots so all model-resident stages can
+        # share one loaded model and keep it saturated.
+        return int(os.getenv("OLLAMA_NUM_PARALLEL", str(len(TranslationChain.PIPELINE))))
+    return int(os.getenv("LPE_PROVIDER_CONCURRENCY", str(len(TranslationChain.PIPELINE))))
+
+def get_provider_semaphore(provider: Any, limit: Optional[int] = None) -> asyncio.Semaphore:
+    """Get (or create) the running event loop's semaphore for a provider backend."""
+    semaphores = _provider_semaphores.setdefault(asyncio.get_running_loop(), {})
+    key = provider_key(provider)
+    if key not in semaphores:
+        semaphores[key] = asyncio.Semaphore(limit or default_provider_limit(provider))
+    return semaphores[key]
+
+class StagePipelineScheduler:
+    """Runs many inputs through one TranslationChain with stages overlapped."""
+
+    def __init__(self, chain: TranslationChain,
+                 stage_limits: Optional[Dict[str, int]] = None,
+                 provider_limit: Optional[int] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.chain = chain
+        default_limit = int(os.getenv("LPE_STAGE_CONCURRENCY", "1"))
+        stage_limits = stage_limits or {}
+        self.stage_limits = {
+            step_type: stage_limits.get(step_type, default_limit)
+            for _, step_type in chain.PIPELINE
+        }
+        self.provider_limit = provider_limit
+        self.executor = executor
+        # Stage semaphores per event loop, created on first use like the provider's
+        self._stage_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+            weakref.WeakKeyDictionary()
+
+    def _loop_semaphores(self):
+        """Stage semaphores and provider semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if loop not in self._stage_semaphores:
+            self._stage_semaphores[loop] = {
+                step_type: asyncio.Semaphore(limit) for step_type, limit in self.stage_limits.items()
+            }
+        provider_semaphore = get_provider_semaphore(self.chain.transformer.provider, self.provider_limit)
+        return self._stage_semaphores[loop], provider_semaphore
+
+    async def run_all(self, narratives: List[str],
+                      on_stage: Optional[StageCallback] = None) -> List[Any]:
+        """
+        Run every narrative through the full chain.
+
+        Returns one Projection per input, in input order; an input whose
+        pipeline raised is returned as the exception instead.
+        """
+        tasks = [self._run_one(i, narrative, on_stage) for i, narrative in enumerate(narratives)]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_one(self, index: int, narrative: str,
+                       on_stage: Optional[StageCallback]) -> Projection:
+        """Walk a single input through each stage, waiting on stage and provider slots."""
+        loop = asyncio.get_running_loop()
+        stage_semaphores, provider_semaphore = self._loop_semaphores()
+        projection = self.chain.new_projection(narrative)
+        current_text = narrative
+        previous_step_type = None
+
+        for step_name, step_type in self.chain.PIPELINE:
+            async with stage_semaphores[step_type]:
+                async with provider_semaphore:
+                    await self._notify(on_stage, index, step_type, "started", {"step_name": step_name})
+                    step, output_text = await loop.run_in_executor(
+                        self.executor, self.chain.run_step,
+                        current_text, step_name, step_type, previous_step_type
+                    )
+
+            projection.steps.append(step)
+            await self._notify(on_stage, index, step_type, "completed", {
+                "step_name": step_name,
+                "duration_ms": step.duration_ms
+            })
+
+            if step_type != "reflect":
+                current_text = output_text
+            previous_step_type = step_type
+
+        async with provider_semaphore:
+            return await loop.run_in_executor(
+                self.executor, self.chain.finalize, projection, current_text
+            )
+
+    async def _notify(self, on_stage: Optional[StageCallback], index: int,
+                      step_type: str, status: str, data: Dict[str, Any]):
+        """Forward a stage event without letting callback errors stop the pipeline."""
+        if on_stage is None:
+            return
+        try:
+            await on_stage(index, step_type, status, data)
+        except Exception as e:
+            logger.warning(f"Stage callback failed: {e}")
@@ -6,10 +6,11 @@ Provides real-time progress updates that persist across page refreshes
 
 import asyncio
 import json
+import os
 import time
 import logging
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Union
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -18,6 +19,12 @@ import threading
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Progress is written to disk at most this often; updates in between only touch memory
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL_MS", "1000")) / 1000
+
+# Subscribers receive at most one (coalesced) delta per interval
+PROGRESS_NOTIFY_INTERVAL = float(os.getenv("PROGRESS_NOTIFY_INTERVAL_MS", "250")) / 1000
+
 class ProgressStatus(str, Enum):
     """Progress status types"""
     NOT_STARTED = "not_started"
@@ -74,49 +81,161 @@ class ProcessingProgress:
             self.activity_breakdown = {"today": 0, "this_week": 0, "this_month": 0, "older": 0}
         if self.errors is None:
             self.errors = []
-        if self.details is None:
-            for step in self.steps:
-                if step.details is None:
-                    step.details = {}
+        for step in self.steps:
+            if step.details is None:
+                step.details = {}
+
+def _isoformat_fields(data: Dict[str, Any], keys: List[str]) -> Dict[str, Any]:
+    for key in keys:
+        if data.get(key):
+            data[key] = data[key].isoformat()
+    return data
+
+def _serialize_step(step: ProgressStep) -> Dict[str, Any]:
+    return _isoformat_fields(asdict(step), ['start_time', 'end_time'])
+
+def _serialize_progress(progress: ProcessingProgress) -> Dict[str, Any]:
+    """JSON-serializable copy of the whole progress tree."""
+    data = asdict(progress)
+    _isoformat_fields(data, ['start_time', 'end_time', 'estimated_completion'])
+    for step in data['steps']:
+        _isoformat_fields(step, ['start_time', 'end_time'])
+    return data
+
+def _merge_delta(target: Dict[str, Any], delta: Dict[str, Any]):
+    """Fold a newer delta into an older one (step entries are merged per step id)."""
+    for key, value in delta.items():
+        if key == 'steps':
+            target.setdefault('steps', {}).update(value)
+        else:
+            target[key] = value
+
+class ProgressSubscription:
+    """
+    A subscriber's queue of progress deltas.
+    
+    Each delta maps changed top-level fields to their current values, with
+    changed steps under "steps" keyed by step id. Deltas are produced by the
+    tracker's worker thread and handed to the subscriber's event loop; if the
+    queue is full, new deltas are merged into one pending delta instead of
+    being dropped.
+    """
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int = 64):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._pending: Dict[str, Any] = {}
+        self._pending_lock = threading.Lock()
+    
+    def offer(self, delta: Dict[str, Any]):
+        """Called from the tracker's worker thread."""
+        with self._pending_lock:
+            _merge_delta(self._pending, delta)
+        self.loop.call_soon_threadsafe(self._drain)
+    
+    def _drain(self):
+        """Runs on the subscriber's loop: move the pending delta into the queue if there is room."""
+        with self._pending_lock:
+            if self._pending and not self.queue.full():
+                self.queue.put_nowait(self._pending)
+                self._pending = {}
+    
+    async def get(self) -> Dict[str, Any]:
+        """Next delta; waits until one is available."""
+        delta = await self.queue.get()
+        self._drain()
+        return delta
+    
+    def get_nowait(self) -> Dict[str, Any]:
+        delta = self.queue.get_nowait()
+        self._drain()
+        return delta
 
 class PersistentProgressTracker:
     """
     Persistent progress tracker that maintains state across restarts
+    
+    Updates only change the in-memory progress tree. A background worker
+    writes the tree to disk at most every `flush_interval` seconds (atomically,
+    via a temp file and rename) and hands subscribers one coalesced delta per
+    `notify_interval`, so per-item updates never wait on disk or subscribers.
+    Session-level transitions (complete, fail, pause) are flushed immediately.
+    
+    A tracker that never updates its session (an API process watching a job
+    run by job_worker.py) follows the file instead: reads re-load it when it
+    has changed on disk, and subscribers get deltas from polling it.
     """
     
-    def __init__(self, session_id: str = None):
+    def __init__(self, session_id: str = None,
+                 flush_interval: Optional[float] = None,
+                 notify_interval: Optional[float] = None):
         self.session_id = session_id or f"session_{int(time.time())}"
         self.progress_file = Path(f"progress_{self.session_id}.json")
         self.subscribers: List[callable] = []
-        self.lock = threading.Lock()
+        self.lock = threading.RLock()
+        
+        self.flush_interval = PROGRESS_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.notify_interval = PROGRESS_NOTIFY_INTERVAL if notify_interval is None else notify_interval
+        
+        # Coalescing state, guarded by self.lock
+        self._dirty = False
+        self._changed_fields: Set[str] = set()
+        self._changed_steps: Set[str] = set()
+        self._last_flush = 0.0
+        self._subscriptions: List[ProgressSubscription] = []
+        self._callback_loops: Dict[int, Optional[asyncio.AbstractEventLoop]] = {}
+        
+        # Background worker, started on the first change
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._worker: Optional[threading.Thread] = None
+        
+        # Set once this process updates the session; until then it follows the file
+        self._writer = False
+        self._file_mtime: Optional[int] = None
         
         # Initialize or load progress
         self.progress = self._load_or_create_progress()
+    
+    def _file_version(self) -> Optional[int]:
+        try:
+            return self.progress_file.stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    def _read_progress_file(self) -> ProcessingProgress:
+        version = self._file_version()
+        with open(self.progress_file, 'r') as f:
+            data = json.load(f)
+        
+        # Convert datetime strings back to datetime objects
+        for key in ['start_time', 'end_time', 'estimated_completion']:
+            if data.get(key):
+                data[key] = datetime.fromisoformat(data[key])
+        
+        data['overall_status'] = ProgressStatus(data['overall_status'])
+        
+        # Convert steps
+        steps = []
+        for step_data in data.get('steps', []):
+            for key in ['start_time', 'end_time']:
+                if step_data.get(key):
+                    step_data[key] = datetime.fromisoformat(step_data[key])
+            step_data['status'] = ProgressStatus(step_data['status'])
+            
+            steps.append(ProgressStep(**step_data))
+        
+        data['steps'] = steps
+        
+        self._file_mtime = version
+        return ProcessingProgress(**data)
         
     def _load_or_create_progress(self) -> ProcessingProgress:
         """Load existing progress or create new"""
         if self.progress_file.exists():
             try:
-                with open(self.progress_file, 'r') as f:
-                    data = json.load(f)
-                
-                # Convert datetime strings back to datetime objects
-                for key in ['start_time', 'end_time', 'estimated_completion']:
-                    if data.get(key):
-                        data[key] = datetime.fromisoformat(data[key])
-                
-                # Convert steps
-                steps = []
-                for step_data in data.get('steps', []):
-                    for key in ['start_time', 'end_time']:
-                        if step_data.get(key):
-                            step_data[key] = datetime.fromisoformat(step_data[key])
-                    
-                    steps.append(ProgressStep(**step_data))
-                
-                data['steps'] = steps
-                
-                progress = ProcessingProgress(**data)
+                progress = self._read_progress_file()
                 logger.info(f"📥 Loaded existing progress for session {self.session_id}")
                 return progress
                 
@@ -164,49 +283,199 @@ class PersistentProgressTracker:
         )
     
     def save_progress(self):
-        """Save current progress to disk"""
+        """Write current progress to disk now (atomically, via temp file and rename)"""
         try:
-            with self.lock:
-                # Convert to JSON-serializable format
-                data = asdict(self.progress)
-                
-                # Convert datetime objects to ISO strings
-                for key in ['start_time', 'end_time', 'estimated_completion']:
-                    if data.get(key):
-                        data[key] = data[key].isoformat()
-                
-                # Convert step datetimes
-                for step in data['steps']:
-                    for key in ['start_time', 'end_time']:
-                        if step.get(key):
-                            step[key] = step[key].isoformat()
-                
-                with open(self.progress_file, 'w') as f:
-                    json.dump(data, f, indent=2, default=str)
+            # Snapshot under the write lock, so writes land in snapshot order and
+            # an older snapshot can never overwrite a newer one
+            with self._write_lock:
+                with self.lock:
+                    # Convert to JSON-serializable format
+                    data = _serialize_progress(self.progress)
+                    self._dirty = False
+                    self._last_flush = time.monotonic()
+
+                tmp_file = self.progress_file.with_name(self.progress_file.name + ".tmp")
+                with open(tmp_file, 'w') as f:
+                    json.dump(data, f, default=str)
+                os.replace(tmp_file, self.progress_file)
+                self._file_mtime = self._file_version()
                     
         except Exception as e:
             logger.error(f"Failed to save progress: {e}")
     
+    def reload(self) -> bool:
+        """
+        Pick up progress another process has written; returns whether anything changed
+        
+        Does nothing in the process that updates the session, whose memory is
+        always newer than the file.
+        """
+        if self._writer or self._file_version() == self._file_mtime:
+            return False
+        try:
+            progress = self._read_progress_file()
+        except (OSError, ValueError, TypeError) as e:
+            # Mid-replace or not yet written; try again on the next read
+            logger.debug(f"Could not reload progress for session {self.session_id}: {e}")
+            return False
+        
+        with self.lock:
+            if self._writer:
+                return False
+            old = _serialize_progress(self.progress)
+            new = _serialize_progress(progress)
+            old_steps = {step['id']: step for step in old.pop('steps')}
+            new_steps = {step['id']: step for step in new.pop('steps')}
+            self._changed_fields.update(key for key in new if new[key] != old.get(key))
+            self._changed_steps.update(
+                step_id for step_id, step in new_steps.items() if step != old_steps.get(step_id)
+            )
+            self.progress = progress
+            return bool(self._changed_fields or self._changed_steps)
+    
+    def flush(self):
+        """Deliver pending deltas and write progress to disk without waiting for the worker"""
+        self._publish()
+        with self.lock:
+            dirty = self._dirty
+        if dirty:
+            self.save_progress()
+    
     def subscribe(self, callback: callable):
-        """Subscribe to progress updates"""
-        self.subscribers.append(callback)
+        """
+        Subscribe to progress updates
+        
+        The callback receives the progress tree, at most once per notify
+        interval. Coroutine callbacks run on the event loop they were
+        subscribed from.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self.lock:
+            self.subscribers.append(callback)
+            self._callback_loops[id(callback)] = loop
+        self._follow()
+    
+    def subscribe_deltas(self, maxsize: int = 64) -> ProgressSubscription:
+        """Subscribe to rate-limited progress deltas; must be called from a running event loop"""
+        subscription = ProgressSubscription(asyncio.get_running_loop(), maxsize)
+        with self.lock:
+            self._subscriptions.append(subscription)
+        self._follow()
+        return subscription
+    
+    def unsubscribe(self, subscriber: Union[callable, ProgressSubscription]):
+        """Remove a callback or delta subscription"""
+        with self.lock:
+            if subscriber in self._subscriptions:
+                self._subscriptions.remove(subscriber)
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+                self._callback_loops.pop(id(subscriber), None)
+    
+    def _following(self) -> bool:
+        """Whether the worker should poll the file for subscribers (caller holds self.lock)"""
+        return not self._writer and bool(self._subscriptions or self.subscribers)
+    
+    def _follow(self):
+        """Start polling the file when subscribers watch a session another process writes"""
+        with self.lock:
+            if self._following() and not self._wake.is_set():
+                self._wake.set()
+                self._ensure_worker()
+    
+    def _mark_changed(self, *fields: str, step_id: Optional[str] = None):
+        """Record a change (caller holds self.lock) and wake the worker"""
+        self._writer = True
+        self._dirty = True
+        self._changed_fields.update(fields)
+        if step_id is not None:
+            self._changed_steps.add(step_id)
+        if not self._wake.is_set():
+            self._wake.set()
+            self._ensure_worker()
+    
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run_worker, name=f"progress-{self.session_id}", daemon=True)
+            self._worker.start()
     
-    def _notify_subscribers(self):
-        """Notify all subscribers of progress update"""
-        for callback in self.subscribers:
+    def _run_worker(self):
+        """Coalesce bursts of updates into one delta per notify interval and one write per flush interval"""
+        while True:
+            self._wake.wait()
+            if self._closed:
+                return
+            time.sleep(self.notify_interval)
+            self.reload()
+            self._publish()
+            
+            with self.lock:
+                flush_due = self._dirty and time.monotonic() - self._last_flush >= self.flush_interval
+            if flush_due:
+                self.save_progress()
+            
+            with self.lock:
+                if not (self._dirty or self._changed_fields or self._changed_steps or self._following()):
+                    self._wake.clear()
+    
+    def _take_delta(self) -> Dict[str, Any]:
+        """Current values of everything changed since the last delta (caller holds self.lock)"""
+        delta: Dict[str, Any] = {}
+        if self._changed_fields:
+            data = asdict(self.progress)
+            _isoformat_fields(data, ['start_time', 'end_time', 'estimated_completion'])
+            delta = {field: data[field] for field in self._changed_fields}
+        if self._changed_steps:
+            delta['steps'] = {
+                step.id: _serialize_step(step)
+                for step in self.progress.steps if step.id in self._changed_steps
+            }
+        self._changed_fields.clear()
+        self._changed_steps.clear()
+        return delta
+    
+    def _publish(self):
+        """Send the pending delta to every subscriber"""
+        with self.lock:
+            if not (self._changed_fields or self._changed_steps):
+                return
+            delta = self._take_delta()
+            subscriptions = list(self._subscriptions)
+            callbacks = [(callback, self._callback_loops.get(id(callback))) for callback in self.subscribers]
+        
+        for subscription in subscriptions:
+            try:
+                subscription.offer(delta)
+            except RuntimeError:
+                # Subscriber's event loop is closed
+                self.unsubscribe(subscription)
+        
+        for callback, loop in callbacks:
             try:
-                callback(self.progress)
+                if asyncio.iscoroutinefunction(callback):
+                    if loop is not None and not loop.is_closed():
+                        asyncio.run_coroutine_threadsafe(callback(self.progress), loop)
+                else:
+                    callback(self.progress)
             except Exception as e:
                 logger.error(f"Subscriber notification failed: {e}")
     
+    def close(self):
+        """Flush pending changes and stop the background worker"""
+        self.flush()
+        self._closed = True
+        self._wake.set()
+    
     def start_session(self):
         """Start a new processing session"""
         with self.lock:
             self.progress.overall_status = ProgressStatus.INITIALIZING
             self.progress.start_time = datetime.now(timezone.utc)
             self.progress.current_step = "analyze"
-            self.save_progress()
-            self._notify_subscribers()
+            self._mark_changed('overall_status', 'start_time', 'current_step')
             
         logger.info(f"🚀 Started processing session {self.session_id}")
     
@@ -221,8 +490,7 @@ class PersistentProgressTracker:
                     break
             
             self.progress.current_step = step_id
-            self.save_progress()
-            self._notify_subscribers()
+            self._mark_changed('current_step', step_id=step_id)
             
         logger.info(f"📍 Started step: {step_id}")
     
@@ -240,8 +508,7 @@ class PersistentProgressTracker:
             total_progress = sum(step.progress for step in self.progress.steps)
             self.progress.overall_progress = total_progress / len(self.progress.steps)
             
-            self.save_progress()
-            self._notify_subscribers()
+            self._mark_changed('overall_progress', step_id=step_id)
     
     def complete_step(self, step_id: str, details: Dict[str, Any] = None):
         """Mark a step as completed"""
@@ -259,8 +526,7 @@ class PersistentProgressTracker:
             total_progress = sum(step.progress for step in self.progress.steps)
             self.progress.overall_progress = total_progress / len(self.progress.steps)
             
-            self.save_progress()
-            self._notify_subscribers()
+            self._mark_changed('overall_progress', step_id=step_id)
             
         logger.info(f"✅ Completed step: {step_id}")
     
@@ -276,17 +542,19 @@ class PersistentProgressTracker:
             
             self.progress.overall_status = ProgressStatus.FAILED
             self.progress.errors.append(f"{step_id}: {error_message}")
-            self.save_progress()
-            self._notify_subscribers()
+            self._mark_changed('overall_status', 'errors', step_id=step_id)
+        self.flush()
             
         logger.error(f"❌ Failed step {step_id}: {error_message}")
     
     def update_statistics(self, **kwargs):
         """Update processing statistics"""
         with self.lock:
+            changed = []
             for key, value in kwargs.items():
                 if hasattr(self.progress, key):
                     setattr(self.progress, key, value)
+                    changed.append(key)
             
             # Update estimated completion based on progress
             if (self.progress.overall_progress > 0 and 
@@ -298,9 +566,9 @@ class PersistentProgressTracker:
                     total_estimated = elapsed / self.progress.overall_progress
                     remaining = total_estimated - elapsed
                     self.progress.estimated_completion = datetime.now(timezone.utc) + remaining
+                    changed.append('estimated_completion')
             
-            self.save_progress()
-            self._notify_subscribers()
+            self._mark_changed(*changed)
     
     def complete_session(self):
         """Mark the entire session as completed"""
@@ -316,9 +584,10 @@ class PersistentProgressTracker:
                     step.progress = 1.0
                     if not step.end_time:
                         step.end_time = datetime.now(timezone.utc)
+                    self._changed_steps.add(step.id)
             
-            self.save_progress()
-            self._notify_subscribers()
+            self._mark_changed('overall_status', 'overall_progress', 'end_time')
+        self.flush()
             
         logger.info(f"🎉 Completed processing session {self.session_id}")
     
@@ -326,13 +595,14 @@ class PersistentProgressTracker:
         """Pause the processing session"""
         with self.lock:
             self.progress.overall_status = ProgressStatus.PAUSED
-            self.save_progress()
-            self._notify_subscribers()
+            self._mark_changed('overall_status')
+        self.flush()
             
         logger.info(f"⏸️  Paused processing session {self.session_id}")
     
     def get_progress_summary(self) -> Dict[str, Any]:
         """Get a summary of current progress"""
+        self.reload()
         with self.lock:
             elapsed_time = None
             if self.progress.start_time:
@@ -375,6 +645,7 @@ class PersistentProgressTracker:
     def cleanup(self):
         """Clean up progress file after successful completion"""
         if self.progress.overall_status == ProgressStatus.COMPLETED:
+            self.close()
             try:
                 if self.progress_file.exists():
                     self.progress_file.unlink()
@@ -17,6 +17,7 @@ import hashlib
 from archive_unified_schema import UnifiedArchiveDB, ArchiveContent, SourceType, ContentType
 from node_archive_importer import NodeArchiveImporter
 from embedding_system import AdvancedEmbeddingSystem
+from activity_scan import scan_conversation_files, summarize_conversation
 from config import get_config
 
 # Setup logging
@@ -130,14 +131,17 @@ class SmartArchiveProcessor:
         week_ago = now - timedelta(days=7)
         month_ago = now - timedelta(days=30)
         
+        # Metadata-only scan: parallel, and cached by file mtime/size across runs
+        summaries = await asyncio.to_thread(scan_conversation_files, conversations)
+        
         for conv_file in conversations:
             try:
-                # Parse conversation
-                with open(conv_file, 'r', encoding='utf-8') as f:
-                    conv_data = json.load(f)
+                summary = summaries.get(str(conv_file))
+                if summary is None:
+                    continue  # Unreadable; already logged by the scan
                 
                 # Extract activity metrics
-                metrics = self._extract_activity_metrics(conv_data, conv_file)
+                metrics = self._activity_metrics_from_summary(summary)
                 conv_id = conv_file.parent.name
                 self.activity_metrics[conv_id] = metrics
                 
@@ -210,35 +214,16 @@ class SmartArchiveProcessor:
     
     def _extract_activity_metrics(self, conv_data: Dict[str, Any], conv_file: Path) -> ActivityMetrics:
         """Extract detailed activity metrics from conversation data"""
-        
-        # Extract basic metrics
-        create_time = conv_data.get("create_time", 0)
-        update_time = conv_data.get("update_time", 0)
-        mapping = conv_data.get("mapping", {})
-        
-        # Calculate metrics
-        message_count = len([msg for msg in mapping.values() if msg.get("message")])
-        
-        # Count unique participants
-        participants = set()
-        total_words = 0
-        vocab_set = set()
-        
-        for msg_data in mapping.values():
-            message = msg_data.get("message")
-            if message:
-                author = message.get("author", {}).get("role", "unknown")
-                participants.add(author)
-                
-                # Extract text content
-                content = message.get("content", {})
-                if content.get("content_type") == "text":
-                    parts = content.get("parts", [])
-                    for part in parts:
-                        if isinstance(part, str):
-                            words = part.split()
-                            total_words += len(words)
-                            vocab_set.update(word.lower() for word in words if word.isalpha())
+        return self._activity_metrics_from_summary(summarize_conversation(conv_data))
+    
+    def _activity_metrics_from_summary(self, summary: Dict[str, Any]) -> ActivityMetrics:
+        """Activity metrics from a conversation summary (see activity_scan.summarize_conversation)"""
+        create_time = summary["create_time"]
+        update_time = summary["update_time"]
+        message_count = summary["message_count"]
+        participants = summary["participants"]
+        total_words = summary["total_words"]
+        vocabulary_size = summary["vocabulary_size"]
         
         # Calculate engagement score (complex heuristic)
         engagement_score = 0.0
@@ -248,7 +233,7 @@ class SmartArchiveProcessor:
             
             # Vocabulary richness
             if total_words > 0:
-                vocab_richness = len(vocab_set) / total_words
+                vocab_richness = vocabulary_size / total_words
                 engagement_score += min(0.5, vocab_richness * 10)
             
             # Multi-participant bonus
@@ -269,7 +254,7 @@ class SmartArchiveProcessor:
             participants=len(participants),
             engagement_score=min(1.0, engagement_score),
             recency_weight=recency_weight,
-            semantic_richness=len(vocab_set) / max(1, total_words)
+            semantic_richness=vocabulary_size / max(1, total_words)
         )
     
     async def process_archive_smart(self, max_conversations: Optional[int] = None) -> Dict[str, Any]:
@@ -455,6 +440,51 @@ class SmartArchiveProcessor:
             
             return None
     
+    def enqueue_jobs(self, job_queue, queue: str = "smart", max_conversations: Optional[int] = None) -> int:
+        """
+        Persist the analyzed job queue to a durable JobQueue
+        
+        Each conversation becomes one "smart_import" job carrying its priority
+        and activity score, so workers claim the most active conversations
+        first. Job ids are stable per conversation, so re-queueing an archive
+        does not duplicate work that is already queued or done, while
+        conversations whose jobs failed or were cancelled are queued again.
+        """
+        jobs = self.job_queue[:max_conversations] if max_conversations else self.job_queue
+        for job in jobs:
+            job_queue.enqueue(
+                queue, "smart_import",
+                {
+                    "node_archive_path": str(self.node_archive_path),
+                    "source_path": job.source_path,
+                    "estimated_chunks": job.estimated_chunks
+                },
+                priority=job.priority,
+                activity_score=job.activity_score,
+                job_id=job.job_id,
+                max_attempts=self.max_retries
+            )
+        logger.info(f"📬 Queued {len(jobs)} conversations for processing")
+        return len(jobs)
+    
+    async def run_queued_job(self, job_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Process one conversation claimed from the durable queue; raises so the queue retries"""
+        job = ProcessingJob(
+            job_id=job_id,
+            job_type="import_and_embed",
+            content_id=0,
+            source_path=payload["source_path"],
+            status="pending",
+            priority=0,
+            activity_score=0.0,
+            estimated_chunks=payload.get("estimated_chunks", 0),
+            created_at=datetime.now(timezone.utc)
+        )
+        result = await self._process_single_job(job)
+        if result is None:
+            raise RuntimeError(job.error_message or f"Processing {job_id} failed")
+        return result
+    
     async def _generate_embeddings_for_content(self, content_id: int) -> Dict[str, Any]:
         """Generate embeddings for specific content"""
         
@@ -543,6 +573,7 @@ async def main():
     parser.add_argument("--max-conversations", type=int, help="Limit conversations for testing")
     parser.add_argument("--analyze-only", action="store_true", help="Only analyze activity, don't process")
     parser.add_argument("--resume", action="store_true", help="Resume from previous checkpoint")
+    parser.add_argument("--enqueue", action="store_true", help="Queue jobs for job_worker.py instead of processing here")
     
     args = parser.parse_args()
     
@@ -550,7 +581,12 @@ async def main():
     processor = SmartArchiveProcessor(args.database_url, args.node_archive_path)
     await processor.initialize()
     
-    if args.analyze_only:
+    if args.enqueue:
+        from job_queue import JobQueue
+        await processor.analyze_archive_activity()
+        queued = processor.enqueue_jobs(JobQueue(), max_conversations=args.max_conversations)
+        print(f"\n📬 Queued {queued} conversations; run job_worker.py --queues smart to process them")
+    elif args.analyze_only:
         # Just analyze activity patterns
         analysis = await processor.analyze_archive_activity()
         print("\n📊 Activity Analysis Results:")
@@ -263,18 +263,38 @@ const ConversationBrowser = ({ initialConversationId = null, initialMessageId =
       });
 
       if (response.ok) {
-        const data = await response.json();
-        console.log("Embeddings generation completed:", data);
+        const job = await response.json();
+        console.log("Embeddings generation queued:", job);
+        
+        // Follow the background job until it finishes
+        let status = null;
+        while (!status || !['completed', 'failed', 'cancelled'].includes(status.status)) {
+          await new Promise(resolve => setTimeout(resolve, 2000));
+          const progressResponse = await fetch(`${API_BASE}${job.progress_url}`);
+          if (!progressResponse.ok) {
+            throw new Error(`Progress check failed: ${progressResponse.status}`);
+          }
+          status = await progressResponse.json();
+          setEmbeddingsProgress({ ...(status.progress || {}), message: `Embedding job ${status.status}` });
+        }
         
         // Refresh embeddings stats
         await loadEmbeddingsStats();
         
-        // Show success message
-        setEmbeddingsProgress({
-          ...data,
-          completed: true,
-          message: `Successfully generated embeddings for ${data.total_processed} messages in ${data.conversations_processed} conversations`
-        });
+        const progress = status.result || status.progress || {};
+        if (status.status === 'completed') {
+          setEmbeddingsProgress({
+            ...progress,
+            completed: true,
+            message: `Successfully generated embeddings for ${progress.processed || 0} conversations`
+          });
+        } else {
+          setEmbeddingsProgress({
+            ...progress,
+            error: true,
+            message: status.error || `Embedding job ${status.status}`
+          });
+        }
       } else {
         const errorData = await response.json();
         console.error("Failed to generate embeddings:", errorData);
@@ -782,17 +802,16 @@ const ConversationBrowser = ({ initialConversationId = null, initialMessageId =
             <p className="text-sm mt-2">{embeddingsProgress.message}</p>
           )}
           
-          {embeddingsProgress.total_processed !== undefined && (
+          {embeddingsProgress.processed !== undefined && (
             <div className="mt-3">
               <div className="text-xs mb-1">
-                Progress: {embeddingsProgress.total_processed || 0} messages processed
-                {embeddingsProgress.conversations_processed && 
-                  ` in ${embeddingsProgress.conversations_processed} conversations`
-                }
+                Progress: {embeddingsProgress.processed || 0}
+                {embeddingsProgress.total ? ` / ${embeddingsProgress.total}` : ''} conversations embedded
+                {embeddingsProgress.failed > 0 && `, ${embeddingsProgress.failed} failed`}
               </div>
-              {embeddingsProgress.processing_time && (
+              {embeddingsProgress.rate_per_second && (
                 <div className="text-xs text-gray-400">
-                  Processing time: {embeddingsProgress.processing_time}
+                  Rate: {embeddingsProgress.rate_per_second} conversations/s
                 </div>
               )}
             </div>
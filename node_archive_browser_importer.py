@@ -12,6 +12,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional
 import asyncpg
+from conversation_stats import ensure_conversation_stats
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -36,6 +37,7 @@ class NodeArchiveBrowserImporter:
         """Connect to PostgreSQL database"""
         try:
             self.conn = await asyncpg.connect(self.database_url)
+            await ensure_conversation_stats(self.conn)
             logger.info("✅ Connected to PostgreSQL database")
             return True
         except Exception as e:
@@ -145,6 +147,14 @@ class NodeArchiveBrowserImporter:
             metadata["model_slug"] = message_metadata.get("model_slug")
             metadata["gizmo_id"] = message_metadata.get("gizmo_id")
         
+        # Media: attachments, or non-text content parts (images, audio, files)
+        content = message.get("content", {})
+        parts = content.get("parts", []) if isinstance(content, dict) else []
+        metadata["has_media"] = bool(
+            (isinstance(message_metadata, dict) and message_metadata.get("attachments")) or
+            any(isinstance(part, dict) and "text" not in part for part in parts if part)
+        )
+        
         return metadata
     
     async def import_conversation(self, conversation_folder: Path) -> bool:
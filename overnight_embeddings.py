@@ -35,6 +35,8 @@ from rich.console import Console
 from rich.progress import Progress, TaskID
 from rich.table import Table
 
+from vector_writes import register_vector_codec, write_content_chunks, write_metrics
+
 # Add the src directory to Python path
 sys.path.append(str(Path(__file__).parent / "humanizer_api" / "src"))
 
@@ -109,7 +111,8 @@ class OvernightEmbeddingProcessor:
                 password=db_config.get('password', ''),
                 database=db_config.get('database', 'humanizer'),
                 min_size=2,
-                max_size=10
+                max_size=10,
+                init=register_vector_codec
             )
             
             # Test database connection
@@ -265,30 +268,9 @@ class OvernightEmbeddingProcessor:
         stored_count = 0
         
         try:
+            # One executemany in one transaction; vectors are sent in pgvector's binary format
             async with self.db_pool.acquire() as conn:
-                for chunk in chunks:
-                    # Convert embedding to the format expected by pgvector
-                    embedding_vector = chunk.get('embedding')
-                    if embedding_vector:
-                        # Store chunk in database
-                        await conn.execute("""
-                            INSERT INTO content_chunks 
-                            (content_id, chunk_type, text, embedding, position, word_count, summary_level, chunk_hash)
-                            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                            ON CONFLICT (content_id, chunk_hash) DO UPDATE SET
-                                embedding = EXCLUDED.embedding,
-                                updated_at = NOW()
-                        """, 
-                        content_id,
-                        chunk.get('type', 'content'),
-                        chunk['text'],
-                        embedding_vector,
-                        chunk.get('position', 0),
-                        chunk.get('word_count', 0),
-                        chunk.get('summary_level', 0),
-                        chunk.get('hash', '')
-                        )
-                        stored_count += 1
+                stored_count = await write_content_chunks(conn, content_id, chunks)
                         
         except Exception as e:
             self.logger.error(f"Failed to store chunks for content {content_id}: {e}")
@@ -442,6 +424,11 @@ class OvernightEmbeddingProcessor:
         if self.stats['processed_items'] > 0:
             avg_time = duration.total_seconds() / self.stats['processed_items']
             table.add_row("Avg Time per Item", f"{avg_time:.2f}s")
+        
+        writes = write_metrics.snapshot()
+        table.add_row("Vector Write Time", f"{writes['write_seconds']:.2f}s "
+                      f"({writes['write_seconds'] / max(duration.total_seconds(), 1e-9):.1%} of run)")
+        table.add_row("Vector Write Rate", f"{writes['rows_per_second']:,.0f} rows/s")
             
         console.print(table)
         
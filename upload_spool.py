@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Upload Spool
+Streams archive uploads straight to disk, one session directory per upload.
+
+Three ways in, all with memory use independent of the export size:
+
+- multipart/form-data (the Lighthouse UI's file_N / path_N form): each part
+  is written to the spool as its bytes arrive instead of being parsed into
+  memory first, so there is no limit on the number of files;
+- a tar (optionally compressed) or zip body: tar members are extracted as
+  the stream arrives; a zip is spooled first, since its directory is at the
+  end, and then extracted entry by entry;
+- resumable chunked uploads: a file is sent as a series of offset-addressed
+  chunks, and the bytes already on disk tell a client where to resume after
+  a dropped connection or a server restart.
+
+Every file that lands is announced on the session's queue, so processing of
+the early files overlaps with the rest of the upload.
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import shutil
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Any, AsyncIterator, AsyncIterable, Dict, Optional
+
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+
+logger = logging.getLogger("archive_import")
+
+UPLOAD_SPOOL_DIR = Path(os.getenv("ARCHIVE_UPLOAD_SPOOL", "/tmp/humanizer_uploads"))
+
+# Chunks buffered between the request stream and the tar extraction thread
+_PIPE_DEPTH = 16
+
+ARCHIVE_CONTENT_TYPES = {
+    "application/x-tar": "tar",
+    "application/gzip": "tar",
+    "application/x-gzip": "tar",
+    "application/x-gtar": "tar",
+    "application/x-bzip2": "tar",
+    "application/x-xz": "tar",
+    "application/zip": "zip",
+    "application/x-zip-compressed": "zip"
+}
+
+class UploadError(Exception):
+    """Raised for malformed uploads; the message is safe to return to the client."""
+
+def safe_relative_path(path: str) -> PurePosixPath:
+    """A client-supplied path reduced to a relative path that stays inside the spool."""
+    parts = [part for part in PurePosixPath(path.replace("\\", "/")).parts
+             if part not in ("", ".", "..", "/")]
+    return PurePosixPath(*parts) if parts else PurePosixPath("unnamed")
+
+class UploadSession:
+    """
+    Spool directory for one upload.
+
+    Completed files live under files/ at their relative upload path; chunked
+    uploads in progress live under .incoming/ until their final chunk.
+    """
+
+    def __init__(self, session_id: str, root: Path = UPLOAD_SPOOL_DIR):
+        self.session_id = session_id
+        self.dir = Path(root) / session_id
+        self.files_dir = self.dir / "files"
+        self.incoming_dir = self.dir / ".incoming"
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+        self.incoming_dir.mkdir(parents=True, exist_ok=True)
+
+        self.files_received = 0
+        self.bytes_received = 0
+        self.finished = False
+        self._ready: "asyncio.Queue[Optional[Path]]" = asyncio.Queue()
+
+    @classmethod
+    def resume(cls, session_id: str, root: Path = UPLOAD_SPOOL_DIR) -> "UploadSession":
+        """
+        Reopen a session from its spool directory after a restart.
+
+        Files already complete are announced again, so their processing is
+        redone; a session that had finished is finished again. A session
+        whose processing succeeded is never reopened, so it cannot be
+        imported twice.
+        """
+        session_dir = Path(root) / session_id
+        if not (session_dir / "files").is_dir():
+            raise KeyError(session_id)
+        if (session_dir / ".processed").exists():
+            raise UploadError(f"Upload {session_id} was already processed")
+        session = cls(session_id, root)
+        for path in sorted(session.files_dir.rglob("*")):
+            if path.is_file():
+                session.file_ready(path)
+        if (session.dir / ".finished").exists():
+            session.finish()
+        return session
+
+    def destination(self, relative_path: str) -> Path:
+        path = self.files_dir / safe_relative_path(relative_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def file_ready(self, path: Path):
+        """Announce a completed file to the processor."""
+        self.files_received += 1
+        self.bytes_received += path.stat().st_size
+        self._ready.put_nowait(path)
+
+    def finish(self):
+        """No more files will arrive."""
+        if not self.finished:
+            self.finished = True
+            (self.dir / ".finished").touch()
+            self._ready.put_nowait(None)
+
+    def mark_processed(self):
+        """Record that every file was imported; resume refuses the session from now on."""
+        (self.dir / ".processed").touch()
+
+    async def completed_files(self) -> AsyncIterator[Path]:
+        """Completed files in arrival order, until the upload is finished."""
+        while True:
+            path = await self._ready.get()
+            if path is None:
+                return
+            yield path
+
+    def cleanup(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    # Resumable chunked uploads
+
+    def _partial_path(self, relative_path: str) -> Path:
+        path = self.incoming_dir / safe_relative_path(relative_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def chunked_status(self) -> Dict[str, Any]:
+        """Bytes held for every file, complete or not, so a client knows where to resume."""
+        files = {}
+        for base, complete in ((self.files_dir, True), (self.incoming_dir, False)):
+            for path in base.rglob("*"):
+                # Dot-files at the top of .incoming/ are multipart parts and zips being spooled
+                if path.is_file() and not (path.parent == self.incoming_dir and path.name.startswith(".")):
+                    files[path.relative_to(base).as_posix()] = {
+                        "received": path.stat().st_size,
+                        "complete": complete
+                    }
+        return files
+
+    async def write_chunk(self, relative_path: str, offset: int, chunks: AsyncIterable[bytes],
+                          final: bool = False) -> int:
+        """
+        Append one chunk of a file at `offset` and return the bytes now held.
+
+        The offset must equal the bytes already received, so a retried chunk
+        can never be written twice; `final` completes the file.
+        """
+        destination = self.files_dir / safe_relative_path(relative_path)
+        if destination.exists():
+            raise UploadError(f"{relative_path} is already complete")
+
+        partial = self._partial_path(relative_path)
+        received = partial.stat().st_size if partial.exists() else 0
+        if offset != received:
+            raise UploadError(f"Offset {offset} does not match {received} bytes received for {relative_path}")
+
+        with open(partial, "ab") as f:
+            async for chunk in chunks:
+                f.write(chunk)
+            received = f.tell()
+
+        if final:
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(partial, destination)
+            self.file_ready(destination)
+        return received
+
+class _MultipartSpooler:
+    """
+    python-multipart callbacks writing file parts straight into a session.
+
+    The UI sends each file_N before its path_N field, so a part is written
+    under a temporary name and moved to its relative path once known.
+    """
+
+    def __init__(self, session: UploadSession):
+        self.session = session
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._name = ""
+        self._filename: Optional[str] = None
+        self._value = bytearray()
+        self._file = None
+        self._pending: Dict[str, Path] = {}  # file index -> spooled part awaiting its path
+        self._filenames: Dict[str, str] = {}
+        self._paths: Dict[str, str] = {}
+        self._counter = 0
+
+    def callbacks(self) -> Dict[str, Any]:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._value = bytearray()
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = options.get(b"name", b"").decode("latin-1")
+        filename = options.get(b"filename")
+        self._filename = filename.decode("utf-8", "replace") if filename is not None else None
+        if self._filename is not None:
+            self._counter += 1
+            self._file = open(self.session.incoming_dir / f".part_{self._counter}", "wb")
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._file is not None:
+            self._file.write(data[start:end])
+        else:
+            self._value += data[start:end]
+
+    def on_part_end(self):
+        index = self._name.split("_", 1)[1] if "_" in self._name else self._name
+        if self._file is not None:
+            self._file.close()
+            spooled = Path(self._file.name)
+            self._file = None
+            if index in self._paths:
+                self._place(spooled, self._paths.pop(index))
+            else:
+                self._pending[index] = spooled
+                self._filenames[index] = self._filename or f"file_{index}"
+        elif self._name.startswith("path_"):
+            path = self._value.decode("utf-8", "replace")
+            if index in self._pending:
+                self._filenames.pop(index, None)
+                self._place(self._pending.pop(index), path)
+            else:
+                self._paths[index] = path
+
+    def _place(self, spooled: Path, relative_path: str):
+        destination = self.session.destination(relative_path)
+        os.replace(spooled, destination)
+        self.session.file_ready(destination)
+
+    def close(self):
+        """Place files whose path field never arrived under their own filename."""
+        if self._file is not None:
+            self._file.close()
+            os.unlink(self._file.name)
+            self._file = None
+        for index, spooled in list(self._pending.items()):
+            self._place(spooled, self._filenames.pop(index))
+        self._pending.clear()
+
+async def receive_multipart(stream: AsyncIterable[bytes], content_type: str, session: UploadSession):
+    """Spool a multipart/form-data body into the session as it arrives."""
+    _, params = parse_options_header(content_type)
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise UploadError("Missing multipart boundary")
+
+    spooler = _MultipartSpooler(session)
+    parser = MultipartParser(boundary, spooler.callbacks())
+    try:
+        async for chunk in stream:
+            parser.write(chunk)
+        parser.finalize()
+    except MultipartParseError as e:
+        raise UploadError(f"Malformed multipart body: {e}")
+    finally:
+        spooler.close()
+
+class _StreamPipe:
+    """Blocking file-like reader fed chunk by chunk from the event loop."""
+
+    def __init__(self):
+        self._chunks: "queue.Queue[bytes]" = queue.Queue(maxsize=_PIPE_DEPTH)
+        self._buffer = bytearray()
+        self._eof = False
+
+    def feed(self, chunk: bytes):
+        self._chunks.put(chunk)
+
+    def close(self):
+        self._chunks.put(b"")
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            chunk = self._chunks.get()
+            if not chunk:
+                self._eof = True
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def drain(self):
+        """Consume whatever the producer still sends once the reader has given up."""
+        while not self._eof:
+            if not self._chunks.get():
+                self._eof = True
+
+def _extract_tar(pipe: _StreamPipe, session: UploadSession, loop: asyncio.AbstractEventLoop):
+    try:
+        with tarfile.open(fileobj=pipe, mode="r|*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                destination = session.destination(member.name)
+                with archive.extractfile(member) as source, open(destination, "wb") as target:
+                    shutil.copyfileobj(source, target, 1 << 20)
+                loop.call_soon_threadsafe(session.file_ready, destination)
+    finally:
+        pipe.drain()
+
+def _extract_zip(path: Path, session: UploadSession, loop: asyncio.AbstractEventLoop):
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            destination = session.destination(info.filename)
+            with archive.open(info) as source, open(destination, "wb") as target:
+                shutil.copyfileobj(source, target, 1 << 20)
+            loop.call_soon_threadsafe(session.file_ready, destination)
+
+async def receive_archive(stream: AsyncIterable[bytes], archive_format: str, session: UploadSession):
+    """Extract a tar or zip request body into the session."""
+    loop = asyncio.get_running_loop()
+
+    if archive_format == "tar":
+        pipe = _StreamPipe()
+        extraction = loop.run_in_executor(None, _extract_tar, pipe, session, loop)
+        try:
+            async for chunk in stream:
+                if chunk:
+                    await asyncio.to_thread(pipe.feed, chunk)
+                if extraction.done():
+                    break
+        finally:
+            await asyncio.to_thread(pipe.close)
+        try:
+            await extraction
+        except tarfile.TarError as e:
+            raise UploadError(f"Invalid tar stream: {e}")
+
+    elif archive_format == "zip":
+        spooled = session.incoming_dir / ".upload.zip"
+        with open(spooled, "wb") as f:
+            async for chunk in stream:
+                f.write(chunk)
+        try:
+            await loop.run_in_executor(None, _extract_zip, spooled, session, loop)
+        except zipfile.BadZipFile as e:
+            raise UploadError(f"Invalid zip archive: {e}")
+        finally:
+            spooled.unlink()
+
+    else:
+        raise UploadError(f"Unsupported archive format: {archive_format}")
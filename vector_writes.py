@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Vector Writes
+Batched pgvector writes over asyncpg's binary protocol.
+
+Vectors travel in pgvector's binary wire format (dimension, a reserved word,
+then big-endian float4s) through a codec registered on the connection, so a
+768-dimension embedding is a 3 KB bytes object instead of ~8 KB of formatted
+text that Postgres parses back into floats. Rows are written a batch at a
+time in one transaction: semantic vectors are COPYed into a temporary table
+and applied with a single UPDATE ... FROM, chunk rows go through
+executemany.
+
+Every write is recorded in `write_metrics`, so embedding runs can report how
+much of their time the database took.
+"""
+
+import struct
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+_VECTOR_HEADER = struct.Struct(">HH")
+
+_SEMANTIC_VECTOR_STAGING = """
+    CREATE TEMP TABLE IF NOT EXISTS semantic_vector_updates (
+        id BIGINT NOT NULL,
+        vector vector NOT NULL
+    ) ON COMMIT DELETE ROWS
+"""
+
+_APPLY_SEMANTIC_VECTORS = """
+    UPDATE archived_content AS a
+    SET semantic_vector = u.vector
+    FROM semantic_vector_updates AS u
+    WHERE a.id = u.id
+"""
+
+_UPSERT_CHUNK = """
+    INSERT INTO content_chunks
+    (content_id, chunk_type, text, embedding, position, word_count, summary_level, chunk_hash)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+    ON CONFLICT (content_id, chunk_hash) DO UPDATE SET
+        embedding = EXCLUDED.embedding,
+        updated_at = NOW()
+"""
+
+def encode_vector(vector: Sequence[float]) -> bytes:
+    """pgvector binary format: uint16 dimension, uint16 reserved, float4 values, all big-endian."""
+    values = np.asarray(vector, dtype=">f4")
+    return _VECTOR_HEADER.pack(values.shape[0], 0) + values.tobytes()
+
+def decode_vector(data: bytes) -> List[float]:
+    dimension, _ = _VECTOR_HEADER.unpack_from(data)
+    return np.frombuffer(data, dtype=">f4", count=dimension, offset=_VECTOR_HEADER.size).tolist()
+
+async def register_vector_codec(conn, schema: str = "public"):
+    """
+    Send and receive `vector` values in binary on this connection.
+
+    Also usable as an asyncpg pool `init` callback. Parameters then take
+    plain float sequences (no str() or ::vector cast) and results come
+    back as lists of floats.
+    """
+    await conn.set_type_codec(
+        "vector", schema=schema, encoder=encode_vector, decoder=decode_vector, format="binary"
+    )
+
+class VectorWriteMetrics:
+    """Running totals of vector writes: rows, batches, payload bytes and seconds spent."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self.batches = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def record(self, rows: int, payload_bytes: int, seconds: float):
+        self.rows += rows
+        self.batches += 1
+        self.bytes += payload_bytes
+        self.seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "megabytes": round(self.bytes / (1024 * 1024), 3),
+            "write_seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows / self.seconds, 1) if self.seconds else 0.0,
+            "avg_batch_ms": round(1000 * self.seconds / self.batches, 2) if self.batches else 0.0
+        }
+
+# Process-wide totals, served by the API and printed by batch jobs
+write_metrics = VectorWriteMetrics()
+
+def _payload_bytes(vectors) -> int:
+    return sum(4 * len(vector) + _VECTOR_HEADER.size for vector in vectors)
+
+async def write_semantic_vectors(conn, rows: Sequence[Tuple[int, Sequence[float]]],
+                                 metrics: VectorWriteMetrics = write_metrics) -> int:
+    """
+    Set archived_content.semantic_vector for a batch of (id, vector) rows.
+
+    The connection must have the binary vector codec registered. Returns
+    the number of rows updated.
+    """
+    if not rows:
+        return 0
+
+    started = time.perf_counter()
+    async with conn.transaction():
+        await conn.execute(_SEMANTIC_VECTOR_STAGING)
+        await conn.copy_records_to_table(
+            "semantic_vector_updates", records=rows, columns=["id", "vector"]
+        )
+        status = await conn.execute(_APPLY_SEMANTIC_VECTORS)
+    metrics.record(len(rows), _payload_bytes(vector for _, vector in rows), time.perf_counter() - started)
+
+    return int(status.split()[-1])
+
+async def write_content_chunks(conn, content_id: int, chunks: Sequence[Dict[str, Any]],
+                               metrics: VectorWriteMetrics = write_metrics) -> int:
+    """
+    Upsert the embedded chunks of one content item in a single transaction.
+
+    Chunks without an embedding are skipped. Returns the number written.
+    """
+    records = [
+        (
+            content_id,
+            chunk.get('type', 'content'),
+            chunk['text'],
+            chunk['embedding'],
+            chunk.get('position', 0),
+            chunk.get('word_count', 0),
+            chunk.get('summary_level', 0),
+            chunk.get('hash', '')
+        )
+        for chunk in chunks if chunk.get('embedding') is not None and len(chunk['embedding'])
+    ]
+    if not records:
+        return 0
+
+    started = time.perf_counter()
+    async with conn.transaction():
+        await conn.executemany(_UPSERT_CHUNK, records)
+    metrics.record(len(records), _payload_bytes(record[3] for record in records), time.perf_counter() - started)
+
+    return len(records)